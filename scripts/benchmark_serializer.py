@@ -0,0 +1,95 @@
+"""Benchmark of the document serialization of ``create_many``.
+
+Serializes N items of a model with nested, datetime, Decimal, Enum and list
+fields through ``ManyReadWriteRepository.create_many`` into a collection that
+discards the documents, so only the time spent building the documents is
+measured. ``model_dump_keys`` is timed as well, since every update extracts
+the key fields of its items.
+
+Usage: python scripts/benchmark_serializer.py [--items 100000]
+"""
+import argparse
+import asyncio
+import datetime
+import time
+from decimal import Decimal
+from enum import Enum
+from types import SimpleNamespace
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+
+
+class Status(Enum):
+    OPEN = "open"
+    PAID = "paid"
+
+
+class Line(BaseModel):
+    sku: str
+    quantity: int
+    price: Decimal
+
+
+class Order(BaseMongoModel):
+    number: int
+    customer: str
+    status: Status
+    placed: datetime.datetime
+    due: Optional[datetime.date] = None
+    total: Decimal
+    tags: List[str] = []
+    lines: List[Line] = []
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["number"]
+
+
+class DiscardingCollection:
+    async def insert_many(self, documents, ordered=True):
+        return SimpleNamespace(inserted_ids=[document["_id"] for document in documents])
+
+
+def make_orders(count: int) -> List[Order]:
+    placed = datetime.datetime(2024, 1, 1, 12, 0)
+    return [
+        Order(
+            number=i,
+            customer=f"customer-{i % 1000}",
+            status=Status.OPEN if i % 2 else Status.PAID,
+            placed=placed + datetime.timedelta(minutes=i),
+            due=datetime.date(2024, 2, 1),
+            total=Decimal("19.90"),
+            tags=["web", "priority"],
+            lines=[Line(sku="A-1", quantity=1, price=Decimal("9.95")), Line(sku="B-2", quantity=2, price=Decimal("4.95"))],
+        )
+        for i in range(count)
+    ]
+
+
+async def run(count: int) -> None:
+    orders = make_orders(count)
+    repo = ManyReadWriteRepository(Order, collection=DiscardingCollection())
+    repo._invalidate_cache = lambda: asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await repo.create_many(orders)
+    create_many = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for order in orders:
+        order.model_dump_keys()
+    keys = time.perf_counter() - start
+
+    print(f"create_many      {count} items: {create_many:.2f}s ({count / create_many:,.0f} items/s)")
+    print(f"model_dump_keys  {count} items: {keys:.2f}s ({count / keys:,.0f} items/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    asyncio.run(run(parser.parse_args().items))
@@ -0,0 +1,86 @@
+"""Caching utilities for repository read paths.
+
+This module implements:
+- QueryCache, a read-through cache with per-model TTL for query results
+- pluggable storage backends: in-process memory or Redis shared by all workers
+- SingleFlight, which coalesces identical concurrent reads into one operation
+- ChangeStreamWatcher, which invalidates caches for writes made by any client
+- ReplicatedCollection, an indexed in-memory copy of small reference collections
+- a per-model cache registry used by the read repositories
+- invalidate_model_caches, used by the write repositories and the change streams
+
+Caching is opt-in per model via `configure_query_cache` or `configure_replica`.
+"""
+
+from .backends import (
+    CacheBackend,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    encode_value,
+    decode_value,
+)
+from .query_cache import (
+    QueryCache,
+    QueryCacheStats,
+    make_query_key,
+    set_default_cache_backend,
+    configure_query_cache,
+    get_query_cache,
+    invalidate_query_cache,
+    get_query_cache_stats,
+    clear_query_caches,
+)
+from .single_flight import SingleFlight, DEFAULT_SINGLE_FLIGHT
+from .invalidation import invalidate_model_caches
+from .change_streams import (
+    ChangeStreamWatcher,
+    ResumeTokenStore,
+    MemoryResumeTokenStore,
+    MongoResumeTokenStore,
+    DEFAULT_CHANGE_STREAM_WATCHER,
+)
+from .document_matcher import (
+    UnsupportedQueryError,
+    match_document,
+    sort_documents,
+    project_document,
+)
+from .replica import (
+    ReplicatedCollection,
+    configure_replica,
+    get_replica,
+    clear_replicas,
+)
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "encode_value",
+    "decode_value",
+    "QueryCache",
+    "QueryCacheStats",
+    "make_query_key",
+    "set_default_cache_backend",
+    "configure_query_cache",
+    "get_query_cache",
+    "invalidate_query_cache",
+    "get_query_cache_stats",
+    "clear_query_caches",
+    "SingleFlight",
+    "DEFAULT_SINGLE_FLIGHT",
+    "invalidate_model_caches",
+    "ChangeStreamWatcher",
+    "ResumeTokenStore",
+    "MemoryResumeTokenStore",
+    "MongoResumeTokenStore",
+    "DEFAULT_CHANGE_STREAM_WATCHER",
+    "UnsupportedQueryError",
+    "match_document",
+    "sort_documents",
+    "project_document",
+    "ReplicatedCollection",
+    "configure_replica",
+    "get_replica",
+    "clear_replicas",
+]
@@ -0,0 +1,385 @@
+"""
+This module provides the pluggable storage backends used by the query cache.
+
+A backend stores opaque, compactly encoded values under versioned keys. Bumping
+the version of a namespace (one namespace per model) invalidates every entry of
+that namespace at once and is broadcast to the registered invalidation listeners.
+
+Classes:
+    CacheBackend: The interface all cache backends implement.
+    MemoryCacheBackend: An in-process LRU backend with TTL.
+    RedisCacheBackend: A backend shared by all workers through a Redis server.
+
+Functions:
+    encode_value: Serializes a cache value to compact bytes.
+    decode_value: Restores a value produced by encode_value.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import bson
+
+InvalidationListener = Callable[[str], None]
+
+# Values above this size are zlib compressed before they are stored.
+COMPRESSION_THRESHOLD = 1024
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serializes a cache value to compact bytes.
+
+    Values are BSON encoded, which keeps MongoDB types such as ObjectId and
+    datetime intact, and zlib compressed when they exceed
+    :data:`COMPRESSION_THRESHOLD` bytes.
+
+    Args:
+        value (Any): A BSON encodable value.
+
+    Returns:
+        bytes: The encoded value.
+    """
+    payload = bson.encode({"v": value})
+    if len(payload) > COMPRESSION_THRESHOLD:
+        return _ZLIB + zlib.compress(payload, 1)
+    return _RAW + payload
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    Restores a value produced by :func:`encode_value`.
+
+    Args:
+        data (bytes): The encoded value.
+
+    Returns:
+        Any: A fresh copy of the original value.
+    """
+    header, payload = data[:1], data[1:]
+    if header == _ZLIB:
+        payload = zlib.decompress(payload)
+    return bson.decode(payload)["v"]
+
+
+class CacheBackend(ABC):
+    """
+    Interface for query cache storage backends.
+
+    Attributes:
+        evictions (int): Entries dropped because the backend was full.
+        expirations (int): Entries dropped because their TTL elapsed.
+    """
+
+    def __init__(self):
+        """
+        Initialize the CacheBackend.
+        """
+        self.evictions = 0
+        self.expirations = 0
+        self._listeners: List[InvalidationListener] = []
+
+    @abstractmethod
+    async def get(self, namespace: str, version: int, key: str) -> Optional[bytes]:
+        """
+        Get a stored value.
+
+        Args:
+            namespace (str): The namespace (model name) of the entry.
+            version (int): The namespace version the entry was stored under.
+            key (str): The entry key.
+
+        Returns:
+            Optional[bytes]: The stored value, or None if absent or expired.
+        """
+        pass
+
+    @abstractmethod
+    async def set(self, namespace: str, version: int, key: str, value: bytes, ttl: float) -> None:
+        """
+        Store a value.
+
+        Args:
+            namespace (str): The namespace (model name) of the entry.
+            version (int): The namespace version observed before the value was loaded.
+            key (str): The entry key.
+            value (bytes): The encoded value.
+            ttl (float): Seconds the entry stays valid.
+        """
+        pass
+
+    @abstractmethod
+    async def get_version(self, namespace: str) -> int:
+        """
+        Get the current version of a namespace.
+
+        Args:
+            namespace (str): The namespace (model name).
+
+        Returns:
+            int: The current version.
+        """
+        pass
+
+    @abstractmethod
+    async def bump_version(self, namespace: str) -> int:
+        """
+        Invalidate a namespace by starting a new version and broadcast it.
+
+        Args:
+            namespace (str): The namespace (model name).
+
+        Returns:
+            int: The new version.
+        """
+        pass
+
+    def add_invalidation_listener(self, listener: InvalidationListener) -> None:
+        """
+        Register a callback invoked with the namespace on every invalidation.
+
+        Args:
+            listener (InvalidationListener): The callback.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, namespace: str) -> None:
+        """Invoke all invalidation listeners, isolating their failures."""
+        for listener in list(self._listeners):
+            try:
+                listener(namespace)
+            except Exception as e:
+                logging.warning("Cache invalidation listener failed for %s: %s", namespace, e)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    An in-process LRU cache backend with TTL.
+
+    Each worker process holds its own copy, so this backend is only coherent
+    for single-process deployments. Use :class:`RedisCacheBackend` when running
+    several workers.
+
+    Attributes:
+        max_entries (int): Maximum number of entries before the least recently
+            used one is evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the MemoryCacheBackend.
+
+        Args:
+            max_entries (int, optional): Maximum number of entries. Defaults to 1024.
+        """
+        super().__init__()
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._keys_by_namespace: Dict[str, Set[Tuple[str, int, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, namespace: str, version: int, key: str) -> Optional[bytes]:
+        entry_key = (namespace, version, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(entry_key)
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(entry_key)
+        return value
+
+    async def set(self, namespace: str, version: int, key: str, value: bytes, ttl: float) -> None:
+        # A write happened while the value was loaded; it is already stale.
+        if version != self._versions.get(namespace, 0):
+            return
+
+        entry_key = (namespace, version, key)
+        self._entries[entry_key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(entry_key)
+        self._keys_by_namespace.setdefault(namespace, set()).add(entry_key)
+        while len(self._entries) > self.max_entries:
+            oldest, _ = self._entries.popitem(last=False)
+            self._keys_by_namespace.get(oldest[0], set()).discard(oldest)
+            self.evictions += 1
+
+    async def get_version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    async def bump_version(self, namespace: str) -> int:
+        version = self._versions.get(namespace, 0) + 1
+        self._versions[namespace] = version
+        # Entries of older versions can never be read again; free them now.
+        for entry_key in self._keys_by_namespace.pop(namespace, set()):
+            self._entries.pop(entry_key, None)
+        self._notify(namespace)
+        return version
+
+    def _drop(self, entry_key: Tuple[str, int, str]) -> None:
+        self._entries.pop(entry_key, None)
+        self._keys_by_namespace.get(entry_key[0], set()).discard(entry_key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    A cache backend shared by all worker processes through a Redis server.
+
+    Namespace versions live in Redis, so an invalidation by one worker is seen
+    by every other worker on its next lookup. Each invalidation is additionally
+    published on :attr:`channel`. While :meth:`start` is running the listener,
+    versions are kept in process and refreshed from those broadcasts, which
+    saves one round trip per lookup.
+
+    Entry size is bounded by the TTL and the server's ``maxmemory-policy``
+    (``allkeys-lru`` is recommended) rather than by a per-model entry limit.
+
+    Attributes:
+        client: A ``redis.asyncio`` compatible client.
+        prefix (str): Prefix for all keys written by the backend.
+        channel (str): The pub/sub channel invalidations are broadcast on.
+
+    Example:
+        ```python
+        backend = RedisCacheBackend.from_url("redis://localhost:6379/0")
+        await backend.start()
+        set_default_cache_backend(backend)
+        ```
+    """
+
+    def __init__(self, client: Any, prefix: str = "pydaadop:cache:", channel: Optional[str] = None):
+        """
+        Initialize the RedisCacheBackend.
+
+        Args:
+            client: A ``redis.asyncio`` compatible client.
+            prefix (str, optional): Prefix for all keys. Defaults to "pydaadop:cache:".
+            channel (Optional[str], optional): The invalidation channel. Defaults to
+                ``<prefix>invalidate``.
+        """
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.channel = channel or f"{prefix}invalidate"
+        self._local_versions: Optional[Dict[str, int]] = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCacheBackend":
+        """
+        Create a backend connected to the Redis server at *url*.
+
+        Args:
+            url (str): The Redis URL, e.g. ``redis://localhost:6379/0``.
+            **kwargs: Passed on to :class:`RedisCacheBackend`.
+
+        Returns:
+            RedisCacheBackend: The backend.
+
+        Raises:
+            ImportError: If the optional ``redis`` package is not installed.
+        """
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ImportError("RedisCacheBackend requires the 'redis' package: pip install pydaadop[redis]") from e
+        return cls(aioredis.from_url(url), **kwargs)
+
+    def _entry_key(self, namespace: str, version: int, key: str) -> str:
+        return f"{self.prefix}{namespace}:{version}:{key}"
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}{namespace}:version"
+
+    async def get(self, namespace: str, version: int, key: str) -> Optional[bytes]:
+        return await self.client.get(self._entry_key(namespace, version, key))
+
+    async def set(self, namespace: str, version: int, key: str, value: bytes, ttl: float) -> None:
+        # Entries written under an outdated version are unreachable and simply expire.
+        await self.client.set(self._entry_key(namespace, version, key), value, px=max(1, int(ttl * 1000)))
+
+    async def get_version(self, namespace: str) -> int:
+        if self._local_versions is not None and namespace in self._local_versions:
+            return self._local_versions[namespace]
+        raw = await self.client.get(self._version_key(namespace))
+        version = int(raw) if raw is not None else 0
+        if self._local_versions is not None:
+            self._local_versions[namespace] = version
+        return version
+
+    async def bump_version(self, namespace: str) -> int:
+        version = int(await self.client.incr(self._version_key(namespace)))
+        if self._local_versions is not None:
+            self._local_versions[namespace] = version
+        await self.client.publish(self.channel, namespace)
+        # A running listener receives our own broadcast and notifies then.
+        if self._listener_task is None:
+            self._notify(namespace)
+        return version
+
+    async def start(self) -> None:
+        """
+        Subscribe to the invalidation channel and keep versions in process.
+
+        Call this once per worker, e.g. from the FastAPI startup hook.
+        """
+        if self._listener_task is not None:
+            return
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._local_versions = {}
+        self._listener_task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        """Stop listening for invalidations and fall back to reading versions from Redis."""
+        task, self._listener_task = self._listener_task, None
+        self._local_versions = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                namespace = message["data"]
+                if isinstance(namespace, bytes):
+                    namespace = namespace.decode("utf-8")
+                # Forget the cached version; the next lookup reads the new one.
+                if self._local_versions is not None:
+                    self._local_versions.pop(namespace, None)
+                self._notify(namespace)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without broadcasts the local versions could go stale; stop using them.
+            logging.warning("Cache invalidation listener stopped: %s", e)
+            self._local_versions = None
+            self._listener_task = None
+        finally:
+            try:
+                await pubsub.unsubscribe(self.channel)
+            except Exception:
+                pass
@@ -0,0 +1,296 @@
+"""
+This module provides the ChangeStreamWatcher class, which follows MongoDB change
+streams of registered models and invalidates pydaadop's caches for writes made by
+any client, including other services that bypass pydaadop.
+
+Change streams require a replica set (a single-node replica set is enough).
+
+Classes:
+    ResumeTokenStore: Interface for persisting change stream resume tokens.
+    MemoryResumeTokenStore: Keeps resume tokens in process.
+    MongoResumeTokenStore: Persists resume tokens in a MongoDB collection.
+    ChangeStreamWatcher: Runs one shared change stream per registered collection.
+
+Attributes:
+    DEFAULT_CHANGE_STREAM_WATCHER (ChangeStreamWatcher): A process wide watcher.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, Union
+
+from pymongo.errors import OperationFailure
+
+from .invalidation import invalidate_model_caches
+from ..database.no_sql import BaseMongoDatabase
+from ..models.base.base_mongo_model import BaseMongoModel
+
+ChangeListener = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+ModelRef = Union[str, Type[BaseMongoModel]]
+
+# Server error codes meaning the stored resume token can no longer be used.
+_RESUME_TOKEN_LOST_CODES = {260, 280, 286}
+
+
+class ResumeTokenStore(ABC):
+    """
+    Interface for persisting change stream resume tokens by collection name.
+    """
+
+    @abstractmethod
+    async def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored resume token of a collection.
+
+        Args:
+            name (str): The collection name.
+
+        Returns:
+            Optional[Dict[str, Any]]: The resume token, or None if none is stored.
+        """
+        pass
+
+    @abstractmethod
+    async def save(self, name: str, token: Optional[Dict[str, Any]]) -> None:
+        """
+        Store the resume token of a collection.
+
+        Args:
+            name (str): The collection name.
+            token (Optional[Dict[str, Any]]): The resume token, or None to forget it.
+        """
+        pass
+
+
+class MemoryResumeTokenStore(ResumeTokenStore):
+    """
+    Keeps resume tokens in process; streams resume after errors but not restarts.
+    """
+
+    def __init__(self):
+        self.tokens: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    async def load(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.tokens.get(name)
+
+    async def save(self, name: str, token: Optional[Dict[str, Any]]) -> None:
+        self.tokens[name] = token
+
+
+class MongoResumeTokenStore(ResumeTokenStore):
+    """
+    Persists resume tokens in a MongoDB collection, one document per watched collection.
+
+    Attributes:
+        collection: The Motor collection holding the tokens.
+    """
+
+    def __init__(self, collection: Any):
+        """
+        Initialize the MongoResumeTokenStore.
+
+        Args:
+            collection: The Motor collection to store the tokens in, e.g.
+                ``db["_pydaadop_resume_tokens"]``.
+        """
+        self.collection = collection
+
+    async def load(self, name: str) -> Optional[Dict[str, Any]]:
+        document = await self.collection.find_one({"_id": name})
+        return document.get("token") if document else None
+
+    async def save(self, name: str, token: Optional[Dict[str, Any]]) -> None:
+        await self.collection.update_one({"_id": name}, {"$set": {"token": token}}, upsert=True)
+
+
+class ChangeStreamWatcher:
+    """
+    Runs one shared change stream per registered collection.
+
+    Every change invalidates the model's cached reads like a write through the
+    repositories does (see :func:`~pydaadop.cache.invalidation.invalidate_model_caches`),
+    then is handed to the listeners registered for the collection (e.g. in-memory
+    replicas of reference data). Resume tokens are persisted so a restarted
+    process continues where it stopped; if the token is no longer in the oplog,
+    the stream restarts from now and the caches are invalidated once to cover
+    the gap.
+
+    Attributes:
+        token_store (Optional[ResumeTokenStore]): Where resume tokens are stored.
+            Defaults to a MongoResumeTokenStore in the watched database.
+        retry_delay (float): Initial delay in seconds before reopening a failed stream.
+        max_retry_delay (float): Upper bound for the exponential retry delay.
+        token_save_interval (float): Minimum seconds between two token writes.
+
+    Example:
+        ```python
+        watcher = ChangeStreamWatcher()
+        watcher.register(ProductCategory)
+
+        @app.on_event("startup")
+        async def start_watcher():
+            await watcher.start()
+        ```
+    """
+
+    def __init__(
+        self,
+        token_store: Optional[ResumeTokenStore] = None,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        token_save_interval: float = 1.0,
+    ):
+        """
+        Initialize the ChangeStreamWatcher.
+
+        Args:
+            token_store (Optional[ResumeTokenStore], optional): Where resume tokens
+                are stored. Defaults to a MongoResumeTokenStore in the watched database.
+            retry_delay (float, optional): Initial retry delay in seconds. Defaults to 1.
+            max_retry_delay (float, optional): Maximum retry delay. Defaults to 30.
+            token_save_interval (float, optional): Minimum seconds between token
+                writes. Defaults to 1.
+        """
+        self.token_store = token_store
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.token_save_interval = token_save_interval
+        self._collections: Dict[str, Any] = {}
+        self._listeners: Dict[str, List[ChangeListener]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _name(model: ModelRef) -> str:
+        return model if isinstance(model, str) else model.__name__
+
+    def register(self, model: Type[BaseMongoModel], collection: Any = None) -> None:
+        """
+        Watch the collection of *model*. Registering a model twice is a no-op.
+
+        Args:
+            model (Type[BaseMongoModel]): The model whose collection is watched.
+            collection (optional): The Motor collection. Defaults to the model's
+                collection in the configured database.
+        """
+        name = self._name(model)
+        if name in self._collections:
+            return
+        if collection is None:
+            database = BaseMongoDatabase(model)
+            database._ensure_connection()
+            collection = database.collection
+        self._collections[name] = collection
+        self._listeners.setdefault(name, [])
+
+    def add_listener(self, model: ModelRef, listener: ChangeListener) -> None:
+        """
+        Register a callback receiving every change event of a watched collection.
+
+        Args:
+            model (ModelRef): The model class or its collection name.
+            listener (ChangeListener): A sync or async callable taking the event.
+        """
+        self._listeners.setdefault(self._name(model), []).append(listener)
+
+    @property
+    def running(self) -> bool:
+        """Whether the watcher has open streams."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Open a change stream for every registered collection not yet watched."""
+        for name in self._collections:
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._watch(name))
+
+    async def stop(self) -> None:
+        """Close all change streams."""
+        tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    def _token_store(self, collection: Any) -> ResumeTokenStore:
+        if self.token_store is None:
+            self.token_store = MongoResumeTokenStore(collection.database["_pydaadop_resume_tokens"])
+        return self.token_store
+
+    async def _watch(self, name: str) -> None:
+        collection = self._collections[name]
+        store = self._token_store(collection)
+        delay = self.retry_delay
+        token: Optional[Dict[str, Any]] = None
+        loaded = False
+        while True:
+            last_saved = time.monotonic()
+            try:
+                if not loaded:
+                    # Inside the retry: an unavailable store must not end the watch.
+                    token = await store.load(name)
+                    loaded = True
+                async with collection.watch(resume_after=token) as stream:
+                    delay = self.retry_delay
+                    async for change in stream:
+                        await self._handle(name, change)
+                        token = stream.resume_token
+                        if time.monotonic() - last_saved >= self.token_save_interval:
+                            await store.save(name, token)
+                            last_saved = time.monotonic()
+                # The server closed the stream (e.g. the collection was dropped);
+                # the old token cannot be resumed, so start from now.
+                token = None
+                await store.save(name, None)
+            except asyncio.CancelledError:
+                await self._save_token(store, name, token, loaded)
+                raise
+            except OperationFailure as e:
+                if e.code in _RESUME_TOKEN_LOST_CODES:
+                    logging.warning("Resume token for %s expired, restarting change stream: %s", name, e)
+                    token = None
+                    await self._save_token(store, name, None)
+                    # Changes in the gap are unknown; drop everything cached.
+                    await invalidate_model_caches(name)
+                    continue
+                logging.warning("Change stream for %s failed: %s", name, e)
+                await self._save_token(store, name, token, loaded)
+            except Exception as e:
+                logging.warning("Change stream for %s failed: %s", name, e)
+                await self._save_token(store, name, token, loaded)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    @staticmethod
+    async def _save_token(
+        store: ResumeTokenStore, name: str, token: Optional[Dict[str, Any]], loaded: bool = True
+    ) -> None:
+        """Persist the latest token without letting a store failure end the watch loop."""
+        if not loaded:
+            # The stored token was never read; keep it for the next attempt.
+            return
+        try:
+            await store.save(name, token)
+        except Exception as e:
+            logging.warning("Failed storing resume token for %s: %s", name, e)
+
+    async def _handle(self, name: str, change: Dict[str, Any]) -> None:
+        from .replica import get_replica  # local import to avoid cycle
+
+        listeners = list(self._listeners.get(name, []))
+        # A replica attached to this watcher applies the change itself.
+        replica = get_replica(name)
+        await invalidate_model_caches(name, replica=replica is None or replica.apply_change not in listeners)
+        for listener in listeners:
+            try:
+                result = listener(change)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logging.warning("Change listener for %s failed: %s", name, e)
+
+
+DEFAULT_CHANGE_STREAM_WATCHER = ChangeStreamWatcher()
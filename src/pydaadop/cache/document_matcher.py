@@ -0,0 +1,271 @@
+"""
+This module provides an in-process evaluator for the subset of MongoDB query
+syntax pydaadop generates, so small collections can be queried from memory.
+
+Classes:
+    UnsupportedQueryError: Raised for query syntax the evaluator does not implement.
+
+Functions:
+    match_document: Tests a document against a MongoDB filter.
+    sort_documents: Sorts documents by a pymongo sort specification.
+    project_document: Applies a MongoDB projection to a document.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+
+_MISSING = object()
+
+# BSON comparison order of the types that can occur in documents.
+_NUMBER, _STRING, _OBJECT, _ARRAY, _OBJECT_ID, _BOOL, _DATE = 1, 2, 3, 4, 5, 6, 7
+
+
+class UnsupportedQueryError(ValueError):
+    """
+    Raised when a query uses syntax the in-memory evaluator does not implement.
+
+    Callers fall back to running the query on MongoDB.
+    """
+
+
+def _type_rank(value: Any) -> int:
+    if value is None or value is _MISSING:
+        return 0
+    if isinstance(value, bool):
+        return _BOOL
+    if isinstance(value, (int, float)):
+        return _NUMBER
+    if isinstance(value, str):
+        return _STRING
+    if isinstance(value, dict):
+        return _OBJECT
+    if isinstance(value, (list, tuple)):
+        return _ARRAY
+    if isinstance(value, ObjectId):
+        return _OBJECT_ID
+    if isinstance(value, datetime.datetime):
+        return _DATE
+    raise UnsupportedQueryError(f"cannot compare values of type {type(value).__name__}")
+
+
+def _resolve(document: Dict[str, Any], path: str) -> Any:
+    """Return the value at a dotted *path*, or _MISSING."""
+    value: Any = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return value
+    return value
+
+
+def _candidates(value: Any) -> List[Any]:
+    """A field matches if the value or, for arrays, any of its elements matches."""
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if left is _MISSING:
+        left = None
+    if isinstance(left, bool) != isinstance(right, bool):
+        return False
+    return left == right
+
+
+def _compare(left: Any, right: Any, op: str) -> bool:
+    # Comparison operators only match values of the same type bracket.
+    if left is _MISSING or _type_rank(left) != _type_rank(right) or right is None:
+        return False
+    if op == "$gt":
+        return left > right
+    if op == "$gte":
+        return left >= right
+    if op == "$lt":
+        return left < right
+    return left <= right
+
+
+def _compile_regex(pattern: Any, options: str = "") -> "re.Pattern":
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option in options or "":
+        if option == "i":
+            flags |= re.IGNORECASE
+        elif option == "m":
+            flags |= re.MULTILINE
+        elif option == "s":
+            flags |= re.DOTALL
+        elif option == "x":
+            flags |= re.VERBOSE
+        else:
+            raise UnsupportedQueryError(f"unsupported regex option {option!r}")
+    return re.compile(pattern, flags)
+
+
+def _match_operators(value: Any, operators: Dict[str, Any]) -> bool:
+    for op, operand in operators.items():
+        if op == "$eq":
+            matched = any(_equals(v, operand) for v in _candidates(value))
+        elif op == "$ne":
+            matched = not any(_equals(v, operand) for v in _candidates(value))
+        elif op == "$in":
+            matched = any(_equals(v, o) for v in _candidates(value) for o in operand)
+        elif op == "$nin":
+            matched = not any(_equals(v, o) for v in _candidates(value) for o in operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            matched = any(_compare(v, operand, op) for v in _candidates(value))
+        elif op == "$exists":
+            matched = (value is not _MISSING) == bool(operand)
+        elif op == "$regex":
+            regex = _compile_regex(operand, operators.get("$options", ""))
+            matched = any(isinstance(v, str) and regex.search(v) for v in _candidates(value))
+        elif op == "$options":
+            if "$regex" not in operators:
+                raise UnsupportedQueryError("$options without $regex")
+            continue
+        elif op == "$not":
+            matched = not _match_value(value, operand)
+        else:
+            raise UnsupportedQueryError(f"unsupported operator {op}")
+        if not matched:
+            return False
+    return True
+
+
+def _match_value(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        return _match_operators(value, condition)
+    if isinstance(condition, re.Pattern):
+        return any(isinstance(v, str) and condition.search(v) for v in _candidates(value))
+    return any(_equals(v, condition) for v in _candidates(value))
+
+
+def match_document(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """
+    Tests a document against a MongoDB filter.
+
+    Supports field equality (including array membership and dotted paths),
+    ``$eq``, ``$ne``, ``$in``, ``$nin``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
+    ``$exists``, ``$regex``/``$options``, ``$not``, ``$and``, ``$or`` and ``$nor``.
+
+    Args:
+        document (Dict[str, Any]): The document.
+        query (Optional[Dict[str, Any]]): The filter.
+
+    Returns:
+        bool: True if the document matches.
+
+    Raises:
+        UnsupportedQueryError: If the filter uses other syntax.
+    """
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            matched = all(match_document(document, clause) for clause in condition)
+        elif key == "$or":
+            matched = any(match_document(document, clause) for clause in condition)
+        elif key == "$nor":
+            matched = not any(match_document(document, clause) for clause in condition)
+        elif key.startswith("$"):
+            raise UnsupportedQueryError(f"unsupported operator {key}")
+        else:
+            matched = _match_value(_resolve(document, key), condition)
+        if not matched:
+            return False
+    return True
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    if isinstance(value, list):
+        # MongoDB sorts arrays by their smallest element in ascending order.
+        value = min(value, key=_sort_key) if value else None
+    rank = _type_rank(value)
+    if rank == 0:
+        return rank, 0
+    if rank in (_OBJECT, _ARRAY):
+        raise UnsupportedQueryError("sorting by embedded documents is not supported")
+    return rank, value
+
+
+def sort_documents(
+    documents: Iterable[Dict[str, Any]], sort_spec: Optional[List[Tuple[str, int]]]
+) -> List[Dict[str, Any]]:
+    """
+    Sorts documents by a pymongo sort specification.
+
+    Missing values sort first in ascending order, as null does in MongoDB.
+
+    Args:
+        documents (Iterable[Dict[str, Any]]): The documents.
+        sort_spec (Optional[List[Tuple[str, int]]]): (field, direction) pairs.
+
+    Returns:
+        List[Dict[str, Any]]: The sorted documents.
+    """
+    result = list(documents)
+    # Stable sorts applied from the last key to the first give a compound order.
+    for field, direction in reversed(sort_spec or []):
+        result.sort(key=lambda doc: _sort_key(_resolve(doc, field)), reverse=direction < 0)
+    return result
+
+
+def project_document(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Applies a MongoDB inclusion or exclusion projection to a document.
+
+    Args:
+        document (Dict[str, Any]): The document.
+        projection (Optional[Dict[str, Any]]): The projection, e.g. ``{"name": 1}``.
+
+    Returns:
+        Dict[str, Any]: The projected document; the input is left unchanged.
+
+    Raises:
+        UnsupportedQueryError: If inclusion and exclusion are mixed.
+    """
+    if not projection:
+        return dict(document)
+
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: bool(value) for key, value in projection.items() if key != "_id"}
+    if not fields:
+        result = dict(document)
+        if not include_id:
+            result.pop("_id", None)
+        return result
+
+    if len(set(fields.values())) > 1:
+        raise UnsupportedQueryError("mixed inclusion and exclusion projections are not supported")
+
+    if next(iter(fields.values())):
+        result: Dict[str, Any] = {}
+        if include_id and "_id" in document:
+            result["_id"] = document["_id"]
+        for path in fields:
+            value = _resolve(document, path)
+            if value is _MISSING:
+                continue
+            target = result
+            parts = path.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        return result
+
+    result = dict(document)
+    if not include_id:
+        result.pop("_id", None)
+    for path in fields:
+        if "." in path:
+            raise UnsupportedQueryError("nested exclusion projections are not supported")
+        result.pop(path, None)
+    return result
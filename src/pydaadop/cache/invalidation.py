@@ -0,0 +1,48 @@
+"""
+This module provides the invalidation of everything pydaadop caches for a model.
+
+Writes through the repositories and changes seen on a change stream both call
+:func:`invalidate_model_caches`, so cached query results, suggestions, shared
+in-flight reads and the in-memory replica are always dropped together.
+
+Functions:
+    invalidate_model_caches: Drops the cached reads of a model after a write.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Type, Union
+
+from .query_cache import invalidate_query_cache
+from .single_flight import DEFAULT_SINGLE_FLIGHT, SingleFlight
+from ..models.base.base_mongo_model import BaseMongoModel
+
+ModelRef = Union[str, Type[BaseMongoModel]]
+
+
+async def invalidate_model_caches(
+    model: ModelRef,
+    single_flight: Optional[SingleFlight] = DEFAULT_SINGLE_FLIGHT,
+    replica: bool = True,
+) -> None:
+    """
+    Drop the cached reads of a model after its collection changed.
+
+    Args:
+        model (ModelRef): The model class or its collection name.
+        single_flight (Optional[SingleFlight], optional): Whose in-flight reads
+            of the model stop being shared. Defaults to DEFAULT_SINGLE_FLIGHT.
+        replica (bool, optional): Whether the model's replica is marked stale;
+            pass False when the replica applies the change itself. Defaults to True.
+    """
+    from .replica import get_replica  # local import to avoid cycle
+
+    name = model if isinstance(model, str) else model.__name__
+    if single_flight is not None:
+        single_flight.forget(name)
+    if replica:
+        replicated = get_replica(name)
+        if replicated is not None:
+            replicated.mark_stale()
+    await invalidate_query_cache(name)
+    await invalidate_query_cache(f"{name}:suggest")
@@ -0,0 +1,272 @@
+"""
+This module provides the QueryCache class, a read-through cache for repository
+query results, together with a per-model cache registry.
+
+Classes:
+    QueryCacheStats: Hit, miss and eviction counters of a QueryCache.
+    QueryCache: A read-through cache with TTL for the query results of one model.
+
+Functions:
+    make_query_key: Builds a normalised cache key for a repository query.
+    set_default_cache_backend: Sets the backend used by newly configured caches.
+    configure_query_cache: Enables result caching for a model.
+    get_query_cache: Returns the cache configured for a model, if any.
+    invalidate_query_cache: Drops all cached results of a model.
+    get_query_cache_stats: Returns the statistics of all configured caches.
+    clear_query_caches: Removes all cache configurations.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from bson import json_util
+
+from .backends import CacheBackend, MemoryCacheBackend, decode_value, encode_value
+from ..models.base.base_mongo_model import BaseMongoModel
+
+
+@dataclass
+class QueryCacheStats:
+    """
+    Counters describing the effectiveness of a QueryCache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to query the database.
+        evictions (int): Entries dropped because the cache was full.
+        expirations (int): Entries dropped because their TTL elapsed.
+        invalidations (int): Number of write-triggered invalidations.
+        size (int): Number of entries currently cached.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_query_key(operation: str, query: Dict[str, Any]) -> str:
+    """
+    Builds a normalised cache key for a repository query.
+
+    The query parts (filter, sort, paging, projection, ...) are rendered as
+    canonical extended JSON with sorted keys, so logically identical queries
+    built in a different key order share one key.
+
+    Args:
+        operation (str): The repository operation, e.g. ``"list"``.
+        query (Dict[str, Any]): The query parts identifying the result.
+
+    Returns:
+        str: The cache key.
+    """
+    canonical = json_util.dumps(query, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{operation}:{digest}"
+
+
+class QueryCache:
+    """
+    A read-through cache for the query results of one model.
+
+    The cache implements the policy (keys, TTL, statistics) while the storage is
+    delegated to a :class:`CacheBackend`. By default every cache uses its own
+    in-process :class:`MemoryCacheBackend`; a shared backend such as
+    :class:`RedisCacheBackend` keeps all worker processes coherent.
+
+    Entries are stored under the model's current version. A write bumps the
+    version, so all older entries become unreachable at once, and loads started
+    before the write are stored under the old version where nobody reads them.
+
+    Attributes:
+        name (str): The collection (model) name the cache belongs to.
+        ttl (float): Seconds an entry stays valid.
+        backend (CacheBackend): The storage backend.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        backend: Optional[CacheBackend] = None,
+    ):
+        """
+        Initialize the QueryCache.
+
+        Args:
+            name (str): The collection (model) name the cache belongs to.
+            ttl (float, optional): Seconds an entry stays valid. Defaults to 60.
+            max_entries (int, optional): Maximum number of entries of the default
+                in-memory backend. Defaults to 1024.
+            backend (Optional[CacheBackend], optional): The storage backend.
+                Defaults to a private MemoryCacheBackend.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_entries)
+        self._stats = QueryCacheStats()
+
+    async def version(self) -> int:
+        """
+        Return the current version of the cached data.
+
+        Returns:
+            int: The version; read it before loading a value to store.
+        """
+        return await self.backend.get_version(self.name)
+
+    async def get(self, key: str, version: int) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): The cache key.
+            version (int): The current version as returned by :meth:`version`.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found and the cached value.
+        """
+        data = await self.backend.get(self.name, version, key)
+        if data is None:
+            self._stats.misses += 1
+            return False, None
+        self._stats.hits += 1
+        return True, decode_value(data)
+
+    async def set(self, key: str, value: Any, version: int) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): The cache key.
+            value (Any): A BSON encodable value.
+            version (int): The version read before the value was loaded.
+        """
+        await self.backend.set(self.name, version, key, encode_value(value), self.ttl)
+
+    async def invalidate(self) -> None:
+        """Drop all entries by starting a new version, on every worker sharing the backend."""
+        await self.backend.bump_version(self.name)
+        self._stats.invalidations += 1
+
+    def stats(self) -> QueryCacheStats:
+        """
+        Return a snapshot of the cache statistics.
+
+        Evictions, expirations and size are reported by the backend and cover
+        all models sharing it.
+
+        Returns:
+            QueryCacheStats: The current counters.
+        """
+        snapshot = QueryCacheStats(**vars(self._stats))
+        snapshot.evictions = self.backend.evictions
+        snapshot.expirations = self.backend.expirations
+        if isinstance(self.backend, MemoryCacheBackend):
+            snapshot.size = len(self.backend)
+        return snapshot
+
+
+# Caches by collection (model) name. Models without an entry are not cached.
+_CACHE_REGISTRY: Dict[str, QueryCache] = {}
+
+# Backend shared by caches configured without an explicit backend.
+_DEFAULT_BACKEND: Optional[CacheBackend] = None
+
+ModelRef = Union[str, Type[BaseMongoModel]]
+
+
+def _cache_name(model: ModelRef) -> str:
+    return model if isinstance(model, str) else model.__name__
+
+
+def set_default_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """
+    Set the backend shared by caches configured without an explicit backend.
+
+    Args:
+        backend (Optional[CacheBackend]): The shared backend, or None to give
+            every cache its own in-memory backend again.
+
+    Example:
+        ```python
+        set_default_cache_backend(RedisCacheBackend.from_url("redis://localhost:6379/0"))
+        ```
+    """
+    global _DEFAULT_BACKEND
+    _DEFAULT_BACKEND = backend
+
+
+def configure_query_cache(
+    model: ModelRef,
+    ttl: float = 60.0,
+    max_entries: int = 1024,
+    backend: Optional[CacheBackend] = None,
+) -> QueryCache:
+    """
+    Enable read-through result caching for a model.
+
+    Reads through any repository of the model are then served from the cache
+    until the TTL elapses or a write through one of its write repositories
+    invalidates it.
+
+    Args:
+        model (ModelRef): The model class or its collection name.
+        ttl (float, optional): Seconds an entry stays valid. Defaults to 60.
+        max_entries (int, optional): Maximum number of entries when the cache
+            gets its own in-memory backend. Defaults to 1024.
+        backend (Optional[CacheBackend], optional): The storage backend. Defaults
+            to the backend set with :func:`set_default_cache_backend`, if any.
+
+    Returns:
+        QueryCache: The cache of the model.
+
+    Example:
+        ```python
+        configure_query_cache(ProductCategory, ttl=300, max_entries=256)
+        ```
+    """
+    cache = QueryCache(
+        _cache_name(model),
+        ttl=ttl,
+        max_entries=max_entries,
+        backend=backend if backend is not None else _DEFAULT_BACKEND,
+    )
+    _CACHE_REGISTRY[cache.name] = cache
+    return cache
+
+
+def get_query_cache(model: ModelRef) -> Optional[QueryCache]:
+    """Return the cache configured for *model*, or None if caching is disabled."""
+    return _CACHE_REGISTRY.get(_cache_name(model))
+
+
+async def invalidate_query_cache(model: ModelRef) -> None:
+    """Drop all cached results of *model*; a no-op if caching is disabled."""
+    cache = _CACHE_REGISTRY.get(_cache_name(model))
+    if cache is not None:
+        await cache.invalidate()
+
+
+def get_query_cache_stats() -> Dict[str, QueryCacheStats]:
+    """Return the statistics of all configured caches by model name."""
+    return {name: cache.stats() for name, cache in _CACHE_REGISTRY.items()}
+
+
+def clear_query_caches() -> None:
+    """Remove all cache configurations and the default backend, disabling caching."""
+    global _DEFAULT_BACKEND
+    _CACHE_REGISTRY.clear()
+    _DEFAULT_BACKEND = None
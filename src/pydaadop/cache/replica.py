@@ -0,0 +1,465 @@
+"""
+This module provides the ReplicatedCollection class, which keeps a complete,
+indexed copy of a small collection in memory and answers repository reads
+from it, together with a per-model replica registry.
+
+Classes:
+    ReplicatedCollection: An in-memory replica of one collection.
+
+Functions:
+    configure_replica: Enables in-memory replication for a model.
+    get_replica: Returns the replica configured for a model, if any.
+    clear_replicas: Removes all replica configurations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Type, Union
+
+import bson
+
+from .change_streams import ChangeStreamWatcher
+from .document_matcher import (
+    UnsupportedQueryError,
+    match_document,
+    project_document,
+    sort_documents,
+)
+from ..database.no_sql import BaseMongoDatabase
+from ..models.base.base_mongo_model import BaseMongoModel
+
+ModelRef = Union[str, Type[BaseMongoModel]]
+
+
+class ReplicatedCollection:
+    """
+    A complete in-memory copy of one small collection.
+
+    Documents are held by ``_id`` with optional hash indexes on further fields,
+    so id lookups and equality / ``$in`` filters on indexed fields touch only the
+    matching documents. Everything else is evaluated by scanning, which is fine
+    for the reference collections this is meant for.
+
+    The replica only serves reads while :attr:`ready`. Writes through pydaadop
+    mark it stale, so reads go to MongoDB until the background refresh has
+    completed; writes by other clients are picked up on the next periodic
+    refresh or, when attached to a :class:`ChangeStreamWatcher`, right away.
+
+    Attributes:
+        model (Type[BaseMongoModel]): The replicated model.
+        collection: The Motor collection the data is loaded from.
+        refresh_interval (Optional[float]): Seconds between full reloads, or None.
+        snapshot_path (Optional[str]): File the data is persisted to after every
+            load and read from on start, so a restart does not wait for MongoDB.
+        indexes (Sequence[str]): Fields with an equality index besides ``_id``.
+        max_documents (int): Collections with more documents are not replicated.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseMongoModel],
+        collection: Any = None,
+        refresh_interval: Optional[float] = None,
+        snapshot_path: Optional[str] = None,
+        indexes: Sequence[str] = (),
+        max_documents: int = 10000,
+    ):
+        """
+        Initialize the ReplicatedCollection.
+
+        Args:
+            model (Type[BaseMongoModel]): The replicated model.
+            collection (optional): The Motor collection. Defaults to the model's
+                collection in the configured database.
+            refresh_interval (Optional[float], optional): Seconds between full
+                reloads. Defaults to None (no periodic reload).
+            snapshot_path (Optional[str], optional): Snapshot file. Defaults to None.
+            indexes (Sequence[str], optional): Fields to index. Defaults to ().
+            max_documents (int, optional): Size limit. Defaults to 10000.
+        """
+        self.model = model
+        self.collection = collection
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = snapshot_path
+        self.indexes = tuple(indexes)
+        self.max_documents = max_documents
+        self.ready = False
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        self._positions: Dict[Any, int] = {}
+        self._field_indexes: Dict[str, Dict[Any, Set[Any]]] = {}
+        self._generation = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._periodic_task: Optional[asyncio.Task] = None
+
+    @property
+    def name(self) -> str:
+        """The collection (model) name."""
+        return self.model.__name__
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _ensure_collection(self) -> Any:
+        if self.collection is None:
+            database = BaseMongoDatabase(self.model)
+            database._ensure_connection()
+            self.collection = database.collection
+        return self.collection
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """
+        Load the replica and start the periodic refresh, if configured.
+
+        With a snapshot on disk the replica is ready immediately and the fresh
+        load from MongoDB runs in the background; otherwise this waits for it.
+        """
+        if self.load_snapshot():
+            self._schedule_refresh()
+        else:
+            await self.refresh()
+        if self.refresh_interval and self._periodic_task is None:
+            self._periodic_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        """Stop background refreshes and stop serving reads."""
+        self.ready = False
+        tasks = [task for task in (self._periodic_task, self._refresh_task) if task is not None]
+        self._periodic_task = self._refresh_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def refresh(self) -> bool:
+        """
+        Reload all documents from MongoDB.
+
+        A load overlapping with a write is repeated, so the replica never
+        becomes ready with data that predates a write.
+
+        Returns:
+            bool: True if the replica is ready afterwards; False if the collection
+            exceeded :attr:`max_documents`.
+        """
+        collection = self._ensure_collection()
+        while True:
+            generation = self._generation
+            documents = await collection.find({}).to_list(length=self.max_documents + 1)
+            if len(documents) > self.max_documents:
+                logging.warning(
+                    "Not replicating %s: more than %d documents", self.name, self.max_documents
+                )
+                self.ready = False
+                return False
+            if generation == self._generation:
+                break
+        self._replace(documents)
+        self.ready = True
+        self.save_snapshot()
+        return True
+
+    def mark_stale(self) -> None:
+        """Stop serving reads until a reload that started after this call completes."""
+        self._generation += 1
+        self.ready = False
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            # The running load notices the new generation and starts over.
+            return
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_in_background())
+        except RuntimeError:
+            self._refresh_task = None
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logging.warning("Refreshing replica of %s failed: %s", self.name, e)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.warning("Refreshing replica of %s failed: %s", self.name, e)
+
+    def _replace(self, documents: Iterable[Dict[str, Any]]) -> None:
+        self._documents = {}
+        self._positions = {}
+        self._field_indexes = {field: {} for field in self.indexes}
+        for document in documents:
+            self._put(document)
+
+    def _put(self, document: Dict[str, Any]) -> None:
+        doc_id = document["_id"]
+        if doc_id in self._documents:
+            self._unindex(self._documents[doc_id])
+        else:
+            self._positions[doc_id] = len(self._positions)
+        self._documents[doc_id] = document
+        for field, index in self._field_indexes.items():
+            for value in self._index_values(document.get(field)):
+                index.setdefault(value, set()).add(doc_id)
+
+    def _remove(self, doc_id: Any) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is not None:
+            self._unindex(document)
+            self._positions.pop(doc_id, None)
+
+    def _unindex(self, document: Dict[str, Any]) -> None:
+        for field, index in self._field_indexes.items():
+            for value in self._index_values(document.get(field)):
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(document["_id"])
+
+    @staticmethod
+    def _index_values(value: Any) -> List[Any]:
+        values = value if isinstance(value, list) else [value]
+        return [v for v in values if v is not None and not isinstance(v, (dict, list))]
+
+    # ── Change streams ────────────────────────────────────────────────────────
+
+    def attach(self, watcher: ChangeStreamWatcher) -> None:
+        """
+        Keep the replica current from a change stream.
+
+        Args:
+            watcher (ChangeStreamWatcher): The watcher; the model is registered with it.
+        """
+        watcher.register(self.model, self._ensure_collection())
+        watcher.add_listener(self.model, self.apply_change)
+
+    async def apply_change(self, change: Dict[str, Any]) -> None:
+        """
+        Apply one change stream event.
+
+        Args:
+            change (Dict[str, Any]): The change event.
+        """
+        # A full reload running concurrently may have read the old state.
+        self._generation += 1
+        operation = change.get("operationType")
+        doc_id = (change.get("documentKey") or {}).get("_id")
+        if operation == "delete" and doc_id is not None:
+            self._remove(doc_id)
+        elif operation in ("insert", "replace", "update") and doc_id is not None:
+            document = change.get("fullDocument")
+            if document is None:
+                document = await self._ensure_collection().find_one({"_id": doc_id})
+            if document is None:
+                self._remove(doc_id)
+            else:
+                self._put(document)
+        else:
+            # drop, rename, invalidate, ...: start over from the database.
+            self.mark_stale()
+            return
+        self.save_snapshot()
+
+    # ── Snapshots ─────────────────────────────────────────────────────────────
+
+    def save_snapshot(self) -> None:
+        """Write the replica to :attr:`snapshot_path`, if set."""
+        if not self.snapshot_path:
+            return
+        try:
+            data = bson.encode({"documents": list(self._documents.values())})
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logging.warning("Saving replica snapshot of %s failed: %s", self.name, e)
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the replica from :attr:`snapshot_path`.
+
+        Returns:
+            bool: True if a snapshot was loaded and the replica is ready.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                documents = bson.decode(f.read())["documents"]
+        except Exception as e:
+            logging.warning("Ignoring unreadable replica snapshot of %s: %s", self.name, e)
+            return False
+        self._replace(documents)
+        self.ready = True
+        return True
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def _indexed_ids(self, query: Dict[str, Any]) -> Optional[Set[Any]]:
+        """Narrow the candidates with the _id or a field index, if the filter allows it."""
+        for field in ("_id",) + self.indexes:
+            if field not in query:
+                continue
+            condition = query[field]
+            if isinstance(condition, dict):
+                if set(condition) != {"$in"}:
+                    continue
+                values = list(condition["$in"])
+            else:
+                values = [condition]
+            if any(isinstance(v, (dict, list)) or v is None for v in values):
+                continue
+            if field == "_id":
+                return {v for v in values if v in self._documents}
+            index = self._field_indexes.get(field, {})
+            ids: Set[Any] = set()
+            for value in values:
+                ids |= index.get(value, set())
+            return ids
+        return None
+
+    def _matching(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        query = query or {}
+        ids = self._indexed_ids(query)
+        if ids is None:
+            documents: Iterable[Dict[str, Any]] = self._documents.values()
+        else:
+            documents = [self._documents[i] for i in sorted(ids, key=self._positions.__getitem__)]
+        return [doc for doc in documents if match_document(doc, query)]
+
+    def find(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List] = None,
+        skip: int = 0,
+        limit: int = 0,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a find on the replica.
+
+        Args:
+            query (Optional[Dict[str, Any]], optional): The filter.
+            sort (Optional[List], optional): pymongo (field, direction) pairs.
+            skip (int, optional): Documents to skip. Defaults to 0.
+            limit (int, optional): Maximum documents, 0 for all. Defaults to 0.
+            projection (Optional[Dict[str, Any]], optional): The projection.
+
+        Returns:
+            List[Dict[str, Any]]: Copies of the matching documents.
+
+        Raises:
+            UnsupportedQueryError: If the query cannot be evaluated in memory.
+        """
+        documents = sort_documents(self._matching(query), sort)
+        documents = documents[skip:skip + limit] if limit else documents[skip:]
+        return [copy.deepcopy(project_document(doc, projection)) for doc in documents]
+
+    def count(self, query: Optional[Dict[str, Any]] = None) -> int:
+        """Count the documents matching *query*."""
+        return len(self._matching(query))
+
+    def execute(self, operation: str, query: Dict[str, Any]) -> Any:
+        """
+        Answer a read repository operation from the replica.
+
+        Args:
+            operation (str): The repository operation, as passed to the query cache.
+            query (Dict[str, Any]): The query parts of the operation.
+
+        Returns:
+            Any: The raw result, shaped like the MongoDB result of the operation.
+
+        Raises:
+            UnsupportedQueryError: If the operation cannot be answered in memory.
+        """
+        if operation in ("exists", "info"):
+            return self.count(query.get("filter"))
+        if operation == "get_by_id":
+            documents = self.find(query.get("filter"), limit=1)
+            return documents[0] if documents else None
+        if operation == "get_many_by_ids":
+            return self.find({"_id": {"$in": query["ids"]}}, projection=query.get("projection"))
+        if operation == "list":
+            return self.find(
+                query.get("filter"), query.get("sort"), query.get("skip", 0), query.get("limit", 0)
+            )
+        if operation == "list_keys":
+            return self.find(query.get("filter"), query.get("sort"), projection=query.get("projection"))
+        raise UnsupportedQueryError(f"unsupported operation {operation}")
+
+
+# Replicas by collection (model) name.
+_REPLICA_REGISTRY: Dict[str, ReplicatedCollection] = {}
+
+
+def configure_replica(
+    model: Type[BaseMongoModel],
+    collection: Any = None,
+    refresh_interval: Optional[float] = None,
+    snapshot_path: Optional[str] = None,
+    indexes: Sequence[str] = (),
+    max_documents: int = 10000,
+    watcher: Optional[ChangeStreamWatcher] = None,
+) -> ReplicatedCollection:
+    """
+    Serve all reads of a small, rarely written model from an in-memory replica.
+
+    The replica serves reads once :meth:`ReplicatedCollection.start` has
+    completed, so call it on application startup.
+
+    Args:
+        model (Type[BaseMongoModel]): The model to replicate.
+        collection (optional): The Motor collection. Defaults to the model's collection.
+        refresh_interval (Optional[float], optional): Seconds between full reloads.
+        snapshot_path (Optional[str], optional): File to persist the replica to.
+        indexes (Sequence[str], optional): Fields to index for equality lookups.
+        max_documents (int, optional): Size limit. Defaults to 10000.
+        watcher (Optional[ChangeStreamWatcher], optional): Applies changes as
+            they happen; remember to start the watcher as well.
+
+    Returns:
+        ReplicatedCollection: The replica of the model.
+
+    Example:
+        ```python
+        categories = configure_replica(
+            ProductCategory, indexes=["name"], watcher=DEFAULT_CHANGE_STREAM_WATCHER
+        )
+
+        @app.on_event("startup")
+        async def start_replicas():
+            await categories.start()
+            await DEFAULT_CHANGE_STREAM_WATCHER.start()
+        ```
+    """
+    replica = ReplicatedCollection(
+        model,
+        collection=collection,
+        refresh_interval=refresh_interval,
+        snapshot_path=snapshot_path,
+        indexes=indexes,
+        max_documents=max_documents,
+    )
+    if watcher is not None:
+        replica.attach(watcher)
+    _REPLICA_REGISTRY[replica.name] = replica
+    return replica
+
+
+def get_replica(model: ModelRef) -> Optional[ReplicatedCollection]:
+    """Return the replica configured for *model*, or None."""
+    return _REPLICA_REGISTRY.get(model if isinstance(model, str) else model.__name__)
+
+
+def clear_replicas() -> None:
+    """Remove all replica configurations."""
+    _REPLICA_REGISTRY.clear()
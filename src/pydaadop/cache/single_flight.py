@@ -0,0 +1,142 @@
+"""
+This module provides the SingleFlight class, which coalesces identical concurrent
+reads into a single database operation.
+
+Classes:
+    SingleFlight: Shares one in-flight operation between all callers of a key.
+
+Attributes:
+    DEFAULT_SINGLE_FLIGHT (SingleFlight): The process wide instance used by the
+        read repositories.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..utils.http import deadline_manager
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one operation.
+
+    The first caller of a key starts the operation; callers arriving while it is
+    running wait for the same result instead of starting their own. The
+    operation runs in its own task, so a cancelled caller (e.g. a disconnected
+    HTTP client) does not cancel it for the others. Once every caller of an
+    operation is cancelled, the operation is cancelled as well.
+
+    The operation runs without the request deadline of the caller that started
+    it; every caller waits at most until its own deadline and gets
+    ``DeadlineExceeded`` alone, so a short budget does not fail the others.
+
+    Keys are grouped by namespace (the model name). Writers call :meth:`forget`
+    for their namespace so reads issued after a write never join an operation
+    that started before it.
+
+    Attributes:
+        copy_result (Optional[Callable[[Any], Any]]): Applied to the result handed
+            to waiting callers, so they can mutate it independently of the
+            caller that started the operation. None shares the object itself.
+        flights (int): Number of operations started.
+        coalesced (int): Number of calls that joined a running operation.
+    """
+
+    def __init__(self, copy_result: Optional[Callable[[Any], Any]] = copy.deepcopy):
+        """
+        Initialize the SingleFlight.
+
+        Args:
+            copy_result (Optional[Callable[[Any], Any]], optional): Copies the
+                result for joining callers. Defaults to copy.deepcopy.
+        """
+        self.copy_result = copy_result
+        self.flights = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    async def do(self, namespace: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run *fn* unless an identical call is already in flight, then share its result.
+
+        Args:
+            namespace (str): The namespace (model name) of the key.
+            key (str): The normalised query key.
+            fn (Callable[[], Awaitable[Any]]): Starts the operation.
+
+        Returns:
+            Any: The result of the operation.
+
+        Raises:
+            Exception: Whatever the shared operation raised.
+        """
+        flights = self._in_flight.setdefault(namespace, {})
+        future = flights.get(key)
+        if future is not None:
+            self.coalesced += 1
+            result = await self._wait(future)
+            return self.copy_result(result) if self.copy_result else result
+
+        future = asyncio.ensure_future(self._run_shared(fn))
+        flights[key] = future
+        self.flights += 1
+        future.add_done_callback(lambda done: self._finish(namespace, key, done))
+        return await self._wait(future)
+
+    @staticmethod
+    async def _run_shared(fn: Callable[[], Awaitable[Any]]) -> Any:
+        # The task copied the starting caller's context; its deadline is not the others'.
+        with deadline_manager.without_deadline():
+            return await fn()
+
+    async def _wait(self, future: asyncio.Future) -> Any:
+        """
+        Wait for a shared operation until the caller's deadline, cancelling the
+        operation when its last caller is cancelled or runs out of time.
+        """
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            remaining = deadline_manager.remaining_ms()
+            if remaining is None:
+                return await asyncio.shield(future)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), remaining / 1000)
+            except asyncio.TimeoutError:
+                raise deadline_manager.DeadlineExceeded()
+        except (asyncio.CancelledError, deadline_manager.DeadlineExceeded):
+            if self._waiters[future] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            remaining = self._waiters.pop(future) - 1
+            if remaining:
+                self._waiters[future] = remaining
+
+    def forget(self, namespace: str) -> None:
+        """
+        Stop sharing the in-flight operations of a namespace.
+
+        Running operations complete for the callers already waiting on them, but
+        later callers start new ones.
+
+        Args:
+            namespace (str): The namespace (model name).
+        """
+        self._in_flight.pop(namespace, None)
+
+    def _finish(self, namespace: str, key: str, future: asyncio.Future) -> None:
+        flights = self._in_flight.get(namespace)
+        if flights is not None and flights.get(key) is future:
+            del flights[key]
+            if not flights:
+                del self._in_flight[namespace]
+        # Mark the exception as retrieved when every caller was cancelled.
+        if not future.cancelled():
+            future.exception()
+
+
+DEFAULT_SINGLE_FLIGHT = SingleFlight()
@@ -1 +1,2 @@
 from .mongodb import BaseMongoDatabase
+from .index_sync import IndexSynchronizer, IndexSyncReport, list_collection_indexes
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+This module provides the index synchronisation command line tool, meant to run
+during deployment before traffic is switched to a new release.
+
+Usage::
+
+    pydaadop-indexes myapp.models myapp.main --database shop --drop-undeclared
+
+Every module argument is imported. Models are the ``BaseMongoModel`` subclasses
+defined in the module (or its package) plus the models of every router created
+while importing it. The indexes of all collections are built concurrently while
+``currentOp`` is polled for progress. The exit code is 0 when every collection
+matches its declarations, 1 if conflicting indexes remain and 2 on errors.
+
+Functions:
+    discover_models: Finds the models of an application.
+    poll_index_builds: Reports the progress of running index builds.
+    sync_all_indexes: Synchronises the indexes of many collections concurrently.
+    format_reports: Renders synchronisation reports as text.
+    main: The command line entry point.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import pkgutil
+import re
+import sys
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from ...models.base import BaseMongoModel
+from .index_sync import IndexSynchronizer, IndexSyncReport
+
+logger = logging.getLogger(__name__)
+
+
+def discover_models(module_paths: Sequence[str], source: str = "all") -> List[Type[BaseMongoModel]]:
+    """
+    Import modules and collect the models they define or serve.
+
+    Args:
+        module_paths (Sequence[str]): Dotted module paths; packages are walked recursively.
+        source (str): ``"models"`` for models defined in the modules, ``"routers"`` for
+            models of routers created on import, or ``"all"`` for both.
+
+    Returns:
+        List[Type[BaseMongoModel]]: The models, one per collection name, in discovery order.
+    """
+    from ...routes.base.base_route import registered_models  # local import to avoid cycle
+
+    found: Dict[str, Type[BaseMongoModel]] = {}
+    for path in module_paths:
+        modules = [importlib.import_module(path)]
+        if hasattr(modules[0], "__path__"):
+            modules.extend(
+                importlib.import_module(info.name)
+                for info in pkgutil.walk_packages(modules[0].__path__, prefix=f"{path}.")
+            )
+        if source in ("models", "all"):
+            for module in modules:
+                for _, value in inspect.getmembers(module, inspect.isclass):
+                    if (
+                        issubclass(value, BaseMongoModel)
+                        and value is not BaseMongoModel
+                        and value.__module__ == module.__name__
+                    ):
+                        found.setdefault(value.__name__, value)
+    if source in ("routers", "all"):
+        for model in registered_models():
+            found.setdefault(model.__name__, model)
+    return list(found.values())
+
+
+async def poll_index_builds(
+    client: Any,
+    database_name: str,
+    interval: float = 5.0,
+    report: Optional[Callable[[str], None]] = None,
+) -> None:
+    """
+    Report the progress of index builds in a database until cancelled.
+
+    Args:
+        client (Any): The Motor client.
+        database_name (str): Only builds in this database are reported.
+        interval (float): Seconds between ``currentOp`` polls.
+        report (Optional[Callable[[str], None]]): Receives one line per running build;
+            defaults to the module logger.
+    """
+    report = report or logger.info
+    namespace = {"$regex": f"^{re.escape(database_name)}\\."}
+    command = {
+        "currentOp": True,
+        "$or": [
+            {"op": "command", "command.createIndexes": {"$exists": True}, "ns": namespace},
+            {"op": "none", "msg": {"$regex": "^Index Build"}, "ns": namespace},
+        ],
+    }
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await client.admin.command(command)
+        except Exception as e:
+            logger.debug("currentOp failed: %s", e)
+            continue
+        for operation in result.get("inprog", []):
+            progress = operation.get("progress") or {}
+            line = f"{operation.get('ns', '?')}: {operation.get('msg') or 'building indexes'}"
+            if progress.get("total"):
+                line += f" ({progress.get('done', 0)}/{progress['total']})"
+            report(line)
+
+
+async def sync_all_indexes(
+    models: Sequence[Type[BaseMongoModel]],
+    database: Any,
+    concurrency: int = 4,
+    dry_run: bool = False,
+    drop_undeclared: bool = False,
+    replace_conflicting: bool = False,
+) -> Dict[str, Any]:
+    """
+    Synchronise the indexes of many collections, building up to ``concurrency`` at once.
+
+    Args:
+        models (Sequence[Type[BaseMongoModel]]): The models; each uses the collection named after it.
+        database (Any): The Motor database.
+        concurrency (int): Maximum number of collections built at the same time.
+        dry_run (bool): Only compute what would change.
+        drop_undeclared (bool): Drop indexes the models do not declare.
+        replace_conflicting (bool): Drop and rebuild indexes whose options differ.
+
+    Returns:
+        Dict[str, Any]: Per collection name either its IndexSyncReport or the exception raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _sync(model: Type[BaseMongoModel]) -> IndexSyncReport:
+        async with semaphore:
+            synchronizer = IndexSynchronizer(model, database[model.__name__])
+            if dry_run:
+                return await synchronizer.plan()
+            return await synchronizer.sync(drop_undeclared=drop_undeclared, replace_conflicting=replace_conflicting)
+
+    results = await asyncio.gather(*(_sync(model) for model in models), return_exceptions=True)
+    return {model.__name__: result for model, result in zip(models, results)}
+
+
+def format_reports(results: Dict[str, Any], dry_run: bool = False) -> str:
+    """
+    Render synchronisation results, one block per collection.
+
+    Lines are prefixed with ``+`` for created, ``=`` for unchanged, ``!`` for
+    conflicting, ``~`` for replaced, ``?`` for undeclared and ``-`` for dropped indexes.
+
+    Args:
+        results (Dict[str, Any]): The result of :func:`sync_all_indexes`.
+        dry_run (bool): Whether nothing was changed, which is noted in the output.
+
+    Returns:
+        str: The report.
+    """
+    lines: List[str] = []
+    for collection, result in results.items():
+        if isinstance(result, BaseException):
+            lines.append(f"{collection}: error: {result}")
+            continue
+        replaced = set(result.replaced)
+        dropped = set(result.dropped)
+        lines.append(
+            f"{collection}: {len(result.created)} {'to create' if dry_run else 'created'}, "
+            f"{len(result.unchanged)} unchanged, {len(result.conflicting)} conflicting"
+        )
+        lines.extend(f"  + {name}" for name in result.created)
+        lines.extend(f"  = {name}" for name in result.unchanged)
+        lines.extend(f"  {'~' if name in replaced else '!'} {name}" for name in result.conflicting)
+        lines.extend(f"  {'-' if name in dropped else '?'} {name}" for name in result.undeclared)
+    return "\n".join(lines)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pydaadop-indexes",
+        description="Create the MongoDB indexes declared by the models of an application.",
+    )
+    parser.add_argument("modules", nargs="+", help="modules defining models or creating routers, e.g. myapp.main")
+    parser.add_argument("--app-dir", default=".", help="directory added to the import path")
+    parser.add_argument("--source", choices=["all", "models", "routers"], default="all", help="where to look for models")
+    parser.add_argument("--mongo-uri", default=None, help="defaults to the MONGO_* environment variables")
+    parser.add_argument("--database", default="deriven-database", help="database name")
+    parser.add_argument("--concurrency", type=int, default=4, help="collections built at the same time")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="seconds between progress reports")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--drop-undeclared", action="store_true", help="drop indexes the models do not declare")
+    parser.add_argument("--replace-conflicting", action="store_true", help="rebuild indexes whose options differ")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    return parser
+
+
+async def _run(args: argparse.Namespace, client: Any) -> Dict[str, Any]:
+    models = discover_models(args.modules, source=args.source)
+    if not models:
+        return {}
+    poller = asyncio.ensure_future(poll_index_builds(client, args.database, args.poll_interval, print))
+    try:
+        return await sync_all_indexes(
+            models,
+            client[args.database],
+            concurrency=args.concurrency,
+            dry_run=args.dry_run,
+            drop_undeclared=args.drop_undeclared,
+            replace_conflicting=args.replace_conflicting,
+        )
+    finally:
+        poller.cancel()
+        try:
+            await poller
+        except asyncio.CancelledError:
+            pass
+
+
+def main(argv: Optional[Sequence[str]] = None, client: Any = None) -> int:
+    """
+    Run the index synchronisation command.
+
+    Args:
+        argv (Optional[Sequence[str]]): The arguments; defaults to ``sys.argv[1:]``.
+        client (Any): A Motor client to use instead of connecting to ``--mongo-uri``.
+
+    Returns:
+        int: 0 if all collections match their declarations, 1 if conflicts remain, 2 on errors.
+    """
+    args = _parser().parse_args(argv)
+    app_dir = os.path.abspath(args.app_dir)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from ...utils.environment import env_manager
+
+        client = AsyncIOMotorClient(args.mongo_uri or env_manager.get_mongo_uri())
+
+    results = asyncio.run(_run(args, client))
+    if not results:
+        print("No models found", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps({
+            collection: {"error": str(result)} if isinstance(result, BaseException) else asdict(result)
+            for collection, result in results.items()
+        }, indent=2))
+    else:
+        print(format_reports(results, dry_run=args.dry_run))
+
+    if any(isinstance(result, BaseException) for result in results.values()):
+        return 2
+    if any(set(result.conflicting) - set(result.replaced) for result in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+This module provides the index synchroniser, which brings the indexes of a
+collection in line with the indexes its model declares.
+
+Classes:
+    IndexSyncReport: What a synchronisation found and changed.
+    IndexSynchronizer: Diffs declared indexes against ``list_indexes()`` and applies the difference.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Type
+
+from pymongo import IndexModel
+
+from ...models.base.index_definition import IndexDefinition, declared_indexes
+
+logger = logging.getLogger(__name__)
+
+
+async def _resolve(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+
+async def list_collection_indexes(collection: Any) -> List[Dict[str, Any]]:
+    """
+    Read the indexes of a Motor or PyMongo collection.
+
+    Args:
+        collection (Any): The collection.
+
+    Returns:
+        List[Dict[str, Any]]: The index documents, ``_id_`` included.
+    """
+    cursor = await _resolve(collection.list_indexes())
+    if hasattr(cursor, "__aiter__"):
+        return [dict(index) async for index in cursor]
+    return [dict(index) for index in cursor]
+
+
+@dataclass
+class IndexSyncReport:
+    """
+    What a synchronisation found and changed. Every list holds index names in
+    declaration order, followed by server-only indexes sorted by name.
+
+    Attributes:
+        collection (str): The collection name.
+        created (List[str]): Declared indexes that were missing and have been created.
+        unchanged (List[str]): Declared indexes that already exist as declared.
+        conflicting (List[str]): Declared indexes whose name or keys exist with different options.
+        replaced (List[str]): Conflicting indexes that were dropped and rebuilt.
+        undeclared (List[str]): Server indexes no definition mentions.
+        dropped (List[str]): Undeclared indexes that were dropped.
+    """
+
+    collection: str
+    created: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    conflicting: List[str] = field(default_factory=list)
+    replaced: List[str] = field(default_factory=list)
+    undeclared: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def in_sync(self) -> bool:
+        """bool: Whether the collection now has exactly the declared indexes."""
+        return not (set(self.conflicting) - set(self.replaced)) and not (set(self.undeclared) - set(self.dropped))
+
+
+class IndexSynchronizer:
+    """
+    Synchronises the indexes of one collection with the declarations of its model.
+
+    The diff is computed from ``list_indexes()``: declared indexes are matched by
+    name and by key pattern. Missing indexes are created in one
+    ``create_indexes`` call, so the server builds them in a single collection
+    scan. Conflicts and undeclared indexes are only reported unless
+    ``replace_conflicting`` or ``drop_undeclared`` is set; ``_id_`` is never dropped.
+
+    Attributes:
+        model (Type[Any]): The model declaring the indexes.
+        collection (Any): The Motor or PyMongo collection.
+        definitions (List[IndexDefinition]): The declared indexes.
+
+    Example:
+        ```python
+        report = await IndexSynchronizer(Ticket, collection).sync(drop_undeclared=True)
+        print(report.created, report.dropped)
+        ```
+    """
+
+    def __init__(self, model: Type[Any], collection: Any, definitions: Optional[List[IndexDefinition]] = None):
+        """
+        Initialize the IndexSynchronizer.
+
+        Args:
+            model (Type[Any]): The model declaring the indexes.
+            collection (Any): The Motor or PyMongo collection.
+            definitions (Optional[List[IndexDefinition]]): Overrides the model's declarations.
+        """
+        self.model = model
+        self.collection = collection
+        self.definitions = list(definitions) if definitions is not None else declared_indexes(model)
+
+    async def plan(self) -> IndexSyncReport:
+        """
+        Compare declared and existing indexes without changing anything.
+
+        Returns:
+            IndexSyncReport: The report; ``created`` lists the indexes that would be created.
+        """
+        existing = await list_collection_indexes(self.collection)
+        by_name = {index["name"]: index for index in existing}
+        report = IndexSyncReport(collection=self.model.__name__)
+        claimed = {"_id_"}
+
+        for definition in self.definitions:
+            same_keys = [
+                index for index in existing
+                if list(index.get("key", {}).items()) == definition.server_keys()
+            ]
+            current = by_name.get(definition.name)
+            if current is not None and definition.matches(current):
+                report.unchanged.append(definition.name)
+                claimed.add(definition.name)
+            elif current is not None or same_keys:
+                report.conflicting.append(definition.name)
+                claimed.add(definition.name)
+                claimed.update(index["name"] for index in same_keys)
+            else:
+                report.created.append(definition.name)
+
+        report.undeclared = sorted(name for name in by_name if name not in claimed)
+        return report
+
+    async def sync(self, drop_undeclared: bool = False, replace_conflicting: bool = False) -> IndexSyncReport:
+        """
+        Create missing indexes and optionally rebuild conflicting and drop undeclared ones.
+
+        Args:
+            drop_undeclared (bool): Drop indexes no definition mentions.
+            replace_conflicting (bool): Drop and rebuild conflicting indexes.
+
+        Returns:
+            IndexSyncReport: What was found and changed.
+        """
+        report = await self.plan()
+        existing = await list_collection_indexes(self.collection) if replace_conflicting else []
+        definitions = {definition.name: definition for definition in self.definitions}
+
+        if replace_conflicting:
+            for name in report.conflicting:
+                definition = definitions[name]
+                for index in existing:
+                    if index["name"] == name or list(index.get("key", {}).items()) == definition.server_keys():
+                        await _resolve(self.collection.drop_index(index["name"]))
+                report.replaced.append(name)
+
+        if drop_undeclared:
+            for name in report.undeclared:
+                await _resolve(self.collection.drop_index(name))
+                report.dropped.append(name)
+
+        to_build = [definitions[name] for name in report.created + report.replaced]
+        if to_build:
+            await _resolve(self.collection.create_indexes([
+                IndexModel(definition.keys, **definition.options()) for definition in to_build
+            ]))
+
+        for name in report.conflicting:
+            if name not in report.replaced:
+                logger.warning("Index %s of %s differs from its declaration", name, report.collection)
+        if report.created or report.replaced or report.dropped:
+            logger.info(
+                "Synchronised indexes of %s: created %s, replaced %s, dropped %s",
+                report.collection, report.created, report.replaced, report.dropped,
+            )
+        return report
@@ -1,8 +1,8 @@
 import asyncio
-import inspect
 import logging
-from typing import TypeVar, Type, Optional, List
+from typing import TypeVar, Type, Optional, List, Tuple, TYPE_CHECKING
 
+from ...diagnostics.slow_queries import DEFAULT_SLOW_QUERY_MONITOR
 from ...models.base import BaseMongoModel
 from ...utils.environment import env_manager
 
@@ -10,7 +10,9 @@ from ...utils.environment import env_manager
 logging.basicConfig(level=logging.INFO)
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
-from pymongo import ASCENDING
+
+if TYPE_CHECKING:
+    from .index_sync import IndexSyncReport
 
 T = TypeVar("T", bound=BaseMongoModel)
 
@@ -45,6 +47,8 @@ class BaseMongoDatabase:
             database_name (str): The name of the database to connect to. Defaults to "deriven-database".
         """
         self.model = model
+        self.index_sync_task: Optional[asyncio.Task] = None
+        self.sort_index_check_task: Optional[asyncio.Task] = None
 
         # If a collection is provided, use it directly (useful for tests and DI).
         if collection is not None:
@@ -70,66 +74,166 @@ class BaseMongoDatabase:
             return
 
         uri = env_manager.get_mongo_uri()
-        self.client = self._provided_client if self._provided_client is not None else AsyncIOMotorClient(uri)
+        if self._provided_client is not None:
+            self.client = self._provided_client
+        else:
+            # Listeners can only be registered when the client is created.
+            self.client = AsyncIOMotorClient(uri, event_listeners=[DEFAULT_SLOW_QUERY_MONITOR])
+            DEFAULT_SLOW_QUERY_MONITOR.attach(self.client)
         self.db = self.client[self._database_name]
         self.collection = self.db[self.model.__name__]
         # Ensure indexes after we have a real collection
         self.ensure_indexes()
+        self._schedule_sort_index_check()
 
     def ensure_indexes(self):
         """
-        Ensures that the necessary indexes are created for the collection.
+        Creates the indexes the model declares but the collection lacks.
 
-        This method retrieves the index keys from the model and creates a unique index
-        for the collection. If the only key is "id", no index is created. If "id" is
-        present among other keys, it is replaced with "_id".
+        The declarations are the unique key from ``create_index()`` plus
+        ``index_definitions()``. Without a running event loop the synchronisation
+        runs to completion; inside a loop it is started as a task stored in
+        ``index_sync_task``, which startup code can await. Nothing is dropped here;
+        use :meth:`sync_indexes` or the index CLI for that.
 
         Example:
             ```python
             db.ensure_indexes()
             ```
         """
-        # Get the index fields list from the model
-        keys = self.model.create_index() or []
-
-        # No meaningful keys to index
-        if not keys or (len(keys) == 1 and keys[0] == "id"):
-            return
-
-        # Map 'id' to MongoDB's '_id' and build the index spec as list of (field, direction)
-        index_field_names: List[str] = ["_id" if k == "id" else k for k in keys]
-        index_spec = [(field, ASCENDING) for field in index_field_names]
-
-        # Build a deterministic name for the index using the actual field names
-        index_name = f"unique_{self.model.__name__}_" + "_".join(index_field_names)
+        from .index_sync import IndexSynchronizer  # local import to avoid cycle
 
-        # Call create_index. The collection implementation may return either an awaitable
-        # (Motor) or a synchronous result (pymongo). If it's synchronous, nothing to do.
         try:
-            maybe_awaitable = self.collection.create_index(index_spec, unique=True, name=index_name)
+            synchronizer = IndexSynchronizer(self.model, self.collection)
         except Exception as e:
-            logging.warning("Failed initiating index creation for %s: %s", self.model.__name__, e)
+            logging.warning("Invalid index declarations for %s: %s", self.model.__name__, e)
             return
-
-        # If the result is not awaitable (synchronous driver), return early
-        if not inspect.isawaitable(maybe_awaitable):
+        if not synchronizer.definitions:
             return
 
-        # If it's awaitable (Motor), schedule or run it depending on loop state. Use
-        # asyncio.ensure_future which accepts both coroutines and futures when a loop
-        # is running; fall back to asyncio.run when no loop is present.
+        async def _sync():
+            try:
+                return await synchronizer.sync()
+            except Exception as e:  # don't let index errors break initialization
+                logging.warning("Failed creating indexes for %s: %s", self.model.__name__, e)
+                return None
+
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
-            # No running loop: run the awaitable synchronously so indexes are created now
-            try:
-                asyncio.run(maybe_awaitable)
-            except Exception as e:  # don't let index errors break initialization
-                logging.warning("Failed creating index for %s synchronously: %s", self.model.__name__, e)
+            # No running loop: synchronise now so the indexes exist before first use
+            asyncio.run(_sync())
         else:
+            self.index_sync_task = loop.create_task(_sync())
+
+    async def sync_indexes(self, drop_undeclared: bool = False, replace_conflicting: bool = False) -> "IndexSyncReport":
+        """
+        Synchronise the collection's indexes with the model's declarations.
+
+        Args:
+            drop_undeclared (bool): Drop indexes the model does not declare (``_id_`` is kept).
+            replace_conflicting (bool): Drop and rebuild indexes whose options differ.
+
+        Returns:
+            IndexSyncReport: The created, unchanged, conflicting and dropped indexes.
+
+        Example:
+            ```python
+            @asynccontextmanager
+            async def lifespan(app):
+                await BaseMongoDatabase(Ticket).sync_indexes(drop_undeclared=True)
+                yield
+            ```
+        """
+        from .index_sync import IndexSynchronizer  # local import to avoid cycle
+
+        self._ensure_connection()
+        return await IndexSynchronizer(self.model, self.collection).sync(
+            drop_undeclared=drop_undeclared, replace_conflicting=replace_conflicting
+        )
+
+    @staticmethod
+    def _index_supports_sort(index_keys: List[Tuple[str, object]], sort_spec: List[Tuple[str, int]]) -> bool:
+        """
+        Check whether an index can return documents in the order of a sort.
+
+        The sort fields must be a prefix of the index keys with either the same
+        or all inverted directions (the index is then walked backwards).
+
+        Args:
+            index_keys (List[Tuple[str, object]]): The index key specification.
+            sort_spec (List[Tuple[str, int]]): The (field, direction) sort keys.
+
+        Returns:
+            bool: True if the index provides the sort order.
+        """
+        keys = list(index_keys)[:len(sort_spec)]
+        if [field for field, _ in keys] != [field for field, _ in sort_spec]:
+            return False
+        same = all(direction == wanted for (_, direction), (_, wanted) in zip(keys, sort_spec))
+        inverted = all(direction == -wanted for (_, direction), (_, wanted) in zip(keys, sort_spec))
+        return same or inverted
+
+    async def check_sort_indexes(self) -> List[List[Tuple[str, int]]]:
+        """
+        Warn about sort combinations declared by the model that no index can serve.
+
+        Sorted reads end with ``_id`` as a tiebreaker, so the matching compound
+        index has to end with ``_id`` as well.
+
+        Returns:
+            List[List[Tuple[str, int]]]: The sort specifications without a matching index.
+
+        Example:
+            ```python
+            class Ticket(BaseMongoModel):
+                @staticmethod
+                def sort_combinations() -> List[str]:
+                    return ["status,-created"]
+            ```
+        """
+        from ...queries.base.base_sort import parse_sort  # local import to avoid cycle
+
+        combinations = getattr(self.model, "sort_combinations", lambda: [])() or []
+        if not combinations:
+            return []
+
+        self._ensure_connection()
+        indexes = [list(index["key"].items()) async for index in self.collection.list_indexes()]
+
+        missing: List[List[Tuple[str, int]]] = []
+        for combination in combinations:
+            spec = parse_sort(combination)
+            if all(field != "_id" for field, _ in spec):
+                spec.append(("_id", 1))
+            if not any(self._index_supports_sort(keys, spec) for keys in indexes):
+                missing.append(spec)
+                logging.warning(
+                    "No index of %s supports sorting by %r; sorted reads need an in-memory sort. "
+                    "Add the compound index %s",
+                    self.model.__name__,
+                    combination,
+                    spec,
+                )
+        return missing
+
+    def _schedule_sort_index_check(self):
+        """
+        Run :meth:`check_sort_indexes` in the background if the model declares
+        sorts, as a task stored in ``sort_index_check_task``.
+        """
+        if not getattr(self.model, "sort_combinations", lambda: [])():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Checked on the first connection from within the event loop instead.
+            return
+
+        async def _check():
             try:
-                # ensure_future schedules the awaitable on the running loop and accepts
-                # coroutines or Future-like objects (avoids 'coroutine expected, got Future')
-                asyncio.ensure_future(maybe_awaitable)
+                await self.check_sort_indexes()
             except Exception as e:
-                logging.warning("Failed scheduling index creation for %s: %s", self.model.__name__, e)
+                logging.warning("Failed checking sort indexes for %s: %s", self.model.__name__, e)
+
+        self.sort_index_check_task = loop.create_task(_check())
@@ -0,0 +1,48 @@
+"""Diagnostics for the queries pydaadop sends to MongoDB.
+
+This module implements:
+- QueryShapeRecorder, which counts the query shapes of repository reads with latency histograms
+- IndexAdvisor, which explains the top shapes and suggests ESR ordered compound indexes
+- SlowQueryMonitor, a command listener logging slow commands with sampled explains
+
+Shapes are recorded by every read repository through `BaseReadRepository.shape_recorder`;
+the slow query monitor is registered on the clients pydaadop creates.
+"""
+
+from .query_shapes import (
+    LATENCY_BUCKETS_MS,
+    QueryShapeStats,
+    QueryShapeRecorder,
+    normalize_filter,
+    DEFAULT_QUERY_SHAPE_RECORDER,
+)
+from .index_advisor import (
+    PlanSummary,
+    IndexAdvice,
+    IndexAdvisor,
+    summarize_plan,
+    suggest_index,
+)
+from .slow_queries import (
+    SlowQuery,
+    SlowQueryMonitor,
+    current_route,
+    DEFAULT_SLOW_QUERY_MONITOR,
+)
+
+__all__ = [
+    "LATENCY_BUCKETS_MS",
+    "QueryShapeStats",
+    "QueryShapeRecorder",
+    "normalize_filter",
+    "DEFAULT_QUERY_SHAPE_RECORDER",
+    "PlanSummary",
+    "IndexAdvice",
+    "IndexAdvisor",
+    "summarize_plan",
+    "suggest_index",
+    "SlowQuery",
+    "SlowQueryMonitor",
+    "current_route",
+    "DEFAULT_SLOW_QUERY_MONITOR",
+]
@@ -0,0 +1,258 @@
+"""
+This module provides the index advisor, which explains the most used query
+shapes and suggests compound indexes for the ones MongoDB cannot serve from an
+index.
+
+Suggestions follow the ESR rule: fields compared for equality first, then the
+sort keys, then fields compared with ranges.
+
+Classes:
+    PlanSummary: The stages of a winning plan that matter for indexing.
+    IndexAdvice: The explain result and index suggestion for one shape.
+    IndexAdvisor: Explains recorded shapes and collects advice.
+
+Functions:
+    summarize_plan: Finds collection scans and blocking sorts in an explain result.
+    suggest_index: Builds an ESR ordered index for a query shape.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..models.base.index_definition import IndexDefinition
+from .query_shapes import DEFAULT_QUERY_SHAPE_RECORDER, QueryShapeRecorder, QueryShapeStats
+
+logger = logging.getLogger(__name__)
+
+# Operators that select a single value or a set of values, which an index
+# serves like an equality match.
+_EQUALITY = {"$eq", "$in"}
+
+
+@dataclass
+class PlanSummary:
+    """
+    The stages of a winning plan that matter for indexing.
+
+    Attributes:
+        collection_scan (bool): The plan reads the whole collection.
+        blocking_sort (bool): The plan sorts in memory.
+        indexes (List[str]): The indexes the plan uses.
+    """
+
+    collection_scan: bool = False
+    blocking_sort: bool = False
+    indexes: List[str] = field(default_factory=list)
+
+
+def summarize_plan(explain: Dict[str, Any]) -> PlanSummary:
+    """
+    Walk the winning plan of an ``explain`` result.
+
+    Args:
+        explain (Dict[str, Any]): The explain output, classic or slot based engine.
+
+    Returns:
+        PlanSummary: What the plan does.
+    """
+    summary = PlanSummary()
+    planner = explain.get("queryPlanner") or {}
+    plan = planner.get("winningPlan") or {}
+    plan = plan.get("queryPlan", plan)
+    stack = [plan]
+    while stack:
+        stage = stack.pop()
+        name = stage.get("stage")
+        if name == "COLLSCAN":
+            summary.collection_scan = True
+        elif name == "SORT":
+            summary.blocking_sort = True
+        elif name == "IXSCAN" and stage.get("indexName"):
+            summary.indexes.append(stage["indexName"])
+        if stage.get("inputStage"):
+            stack.append(stage["inputStage"])
+        stack.extend(stage.get("inputStages") or [])
+    return summary
+
+
+def suggest_index(filter_shape: Dict[str, Any], sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """
+    Build an ESR ordered compound index for a query shape.
+
+    Top level conditions and ``$and`` branches are used; ``$or`` branches need
+    an index each and are left out.
+
+    Args:
+        filter_shape (Dict[str, Any]): The filter shape, see :func:`normalize_filter`.
+        sort (List[Tuple[str, int]]): The sort keys.
+
+    Returns:
+        List[Tuple[str, int]]: The index keys, empty if the shape has no indexable field.
+    """
+    conditions: List[Tuple[str, str]] = []
+    pending = [filter_shape]
+    while pending:
+        shape = pending.pop(0)
+        for key, operators in shape.items():
+            if key == "$and":
+                pending.extend(operators)
+            elif not key.startswith("$"):
+                conditions.append((key, operators))
+
+    keys: List[Tuple[str, int]] = []
+
+    def add(name: str, direction: int) -> None:
+        if all(existing != name for existing, _ in keys):
+            keys.append((name, direction))
+
+    for name, operators in conditions:
+        if set(operators.split(",")) <= _EQUALITY:
+            add(name, 1)
+    for name, direction in sort:
+        add(name, direction)
+    for name, _ in conditions:
+        add(name, 1)
+    return keys
+
+
+@dataclass
+class IndexAdvice:
+    """
+    The explain result and index suggestion for one query shape.
+
+    Attributes:
+        shape (QueryShapeStats): The shape.
+        plan (PlanSummary): The winning plan.
+        suggestion (List[Tuple[str, int]]): Suggested index keys; empty if the plan is fine.
+    """
+
+    shape: QueryShapeStats
+    plan: PlanSummary
+    suggestion: List[Tuple[str, int]]
+
+    @property
+    def problems(self) -> List[str]:
+        """List[str]: ``COLLSCAN`` and ``SORT`` for collection scans and blocking sorts."""
+        return (["COLLSCAN"] if self.plan.collection_scan else []) + (["SORT"] if self.plan.blocking_sort else [])
+
+    def definition(self) -> Optional[IndexDefinition]:
+        """
+        Get the suggestion as a declarative index definition.
+
+        Returns:
+            Optional[IndexDefinition]: The definition, or None without suggestion.
+        """
+        if not self.suggestion:
+            return None
+        return IndexDefinition(*self.suggestion)
+
+    def to_code(self) -> Optional[str]:
+        """
+        Get the suggestion as source code for ``index_definitions()``.
+
+        Returns:
+            Optional[str]: E.g. ``IndexDefinition("status", "-created", "id")``, or None.
+        """
+        if not self.suggestion:
+            return None
+        keys = [("id" if name == "_id" else name) for name, _ in self.suggestion]
+        args = ", ".join(f'"{"-" if direction < 0 else ""}{name}"' for name, (_, direction) in zip(keys, self.suggestion))
+        return f"IndexDefinition({args})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a JSON serialisable summary.
+
+        Returns:
+            Dict[str, Any]: The shape summary, problems, used indexes and suggestion.
+        """
+        return {
+            **self.shape.to_dict(),
+            "problems": self.problems,
+            "indexes": self.plan.indexes,
+            "suggestion": [list(key) for key in self.suggestion],
+            "definition": self.to_code(),
+        }
+
+
+class IndexAdvisor:
+    """
+    Explains the top recorded query shapes and suggests indexes for collection
+    scans and blocking sorts.
+
+    Each shape is explained with the first query recorded for it, using the
+    ``queryPlanner`` verbosity, so no query is actually executed.
+
+    Attributes:
+        recorder (QueryShapeRecorder): The recorder holding the shapes.
+        collection_for (Callable[[str], Any]): Returns the collection for a collection name.
+
+    Example:
+        ```python
+        advisor = IndexAdvisor(lambda name: database[name])
+        for advice in await advisor.advise(top=10):
+            print(advice.problems, advice.to_code())
+        ```
+    """
+
+    def __init__(self, collection_for: Callable[[str], Any], recorder: Optional[QueryShapeRecorder] = None):
+        """
+        Initialize the IndexAdvisor.
+
+        Args:
+            collection_for (Callable[[str], Any]): Returns the collection for a collection name.
+            recorder (Optional[QueryShapeRecorder]): Defaults to the recorder used by the repositories.
+        """
+        self.collection_for = collection_for
+        self.recorder = recorder if recorder is not None else DEFAULT_QUERY_SHAPE_RECORDER
+
+    async def explain(self, shape: QueryShapeStats) -> Dict[str, Any]:
+        """
+        Explain the sample query of a shape.
+
+        Args:
+            shape (QueryShapeStats): The shape.
+
+        Returns:
+            Dict[str, Any]: The explain output.
+        """
+        sample = shape.sample or {}
+        filter_query = sample.get("filter")
+        if filter_query is None and "ids" in sample:
+            filter_query = {"_id": {"$in": sample["ids"]}}
+        cursor = self.collection_for(shape.collection).find(filter_query or {})
+        if shape.sort:
+            cursor = cursor.sort(list(shape.sort))
+        if sample.get("limit"):
+            cursor = cursor.limit(sample["limit"])
+        result = cursor.explain()
+        return await result if inspect.isawaitable(result) else result
+
+    async def advise(self, top: int = 10, collection: Optional[str] = None, by: str = "count") -> List[IndexAdvice]:
+        """
+        Explain the top shapes and suggest indexes for the problematic ones.
+
+        Args:
+            top (int): Number of shapes to explain.
+            collection (Optional[str]): Only shapes of this collection.
+            by (str): Ranking of the shapes, see :meth:`QueryShapeRecorder.top`.
+
+        Returns:
+            List[IndexAdvice]: The advice, in ranking order; shapes failing to explain are skipped.
+        """
+        advice: List[IndexAdvice] = []
+        for shape in self.recorder.top(top, collection=collection, by=by):
+            try:
+                plan = summarize_plan(await self.explain(shape))
+            except Exception as e:
+                logger.warning("Failed explaining a %s query on %s: %s", shape.operation, shape.collection, e)
+                continue
+            suggestion: List[Tuple[str, int]] = []
+            if plan.collection_scan or plan.blocking_sort:
+                suggestion = suggest_index(shape.filter, shape.sort)
+            advice.append(IndexAdvice(shape, plan, suggestion))
+        return advice
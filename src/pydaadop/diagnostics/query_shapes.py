@@ -0,0 +1,263 @@
+"""
+This module provides the query shape recorder used by the read repositories.
+
+A query shape is a read with its values removed: the operation, the filtered
+fields with their operators and the sort keys. The recorder counts how often
+each shape is requested and keeps a latency histogram of the reads that reached
+MongoDB, so the shapes worth indexing can be found from real traffic.
+
+Classes:
+    QueryShapeStats: Counters and latency histogram of one shape.
+    QueryShapeRecorder: Records shapes per collection.
+
+Functions:
+    normalize_filter: Replaces the values of a MongoDB filter by their operators.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds of the latency histogram buckets in milliseconds.
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_LOGICAL = ("$and", "$or", "$nor")
+
+
+def normalize_filter(query: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Replace the values of a MongoDB filter by the operators applied to them.
+
+    Plain values become ``"$eq"``, operator documents the sorted, comma joined
+    operator names and the branches of ``$and``/``$or``/``$nor`` are normalised
+    and put into a canonical order.
+
+    Args:
+        query (Optional[Dict[str, Any]]): The filter.
+
+    Returns:
+        Dict[str, Any]: The filter shape.
+
+    Example:
+        ```python
+        normalize_filter({"status": "new", "price": {"$lt": 5, "$gte": 1}})
+        # {"status": "$eq", "price": "$gte,$lt"}
+        ```
+    """
+    shape: Dict[str, Any] = {}
+    for key, value in (query or {}).items():
+        if key in _LOGICAL and isinstance(value, list):
+            branches = [normalize_filter(branch) for branch in value if isinstance(branch, dict)]
+            shape[key] = sorted(branches, key=lambda branch: json.dumps(branch, sort_keys=True))
+        elif key.startswith("$"):
+            shape[key] = "?"
+        elif isinstance(value, dict) and value and all(str(op).startswith("$") for op in value):
+            shape[key] = ",".join(sorted(op for op in value if op != "$options"))
+        else:
+            shape[key] = "$eq"
+    return shape
+
+
+@dataclass
+class QueryShapeStats:
+    """
+    Counters and latency histogram of one query shape.
+
+    Attributes:
+        collection (str): The collection name.
+        operation (str): The repository operation, e.g. ``list`` or ``info``.
+        filter (Dict[str, Any]): The filter shape, see :func:`normalize_filter`.
+        sort (List[Tuple[str, int]]): The sort keys.
+        count (int): Reads requested with this shape, including cache hits.
+        executions (int): Reads that reached MongoDB.
+        total_time (float): Seconds spent in MongoDB reads.
+        max_time (float): Slowest MongoDB read in seconds.
+        buckets (List[int]): Read counts per :data:`LATENCY_BUCKETS_MS` bucket, plus overflow.
+        sample (Optional[Dict[str, Any]]): The first query seen, kept for ``explain`` and never reported.
+    """
+
+    collection: str
+    operation: str
+    filter: Dict[str, Any]
+    sort: List[Tuple[str, int]]
+    count: int = 0
+    executions: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    sample: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    def observe(self, seconds: float) -> None:
+        """
+        Add the duration of one MongoDB read.
+
+        Args:
+            seconds (float): The duration.
+        """
+        self.executions += 1
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def timed(self, loader: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        """
+        Wrap a loader so its duration is observed.
+
+        Args:
+            loader (Callable[[], Awaitable[Any]]): The MongoDB read.
+
+        Returns:
+            Callable[[], Awaitable[Any]]: The timed loader.
+        """
+        async def _timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return await loader()
+            finally:
+                self.observe(time.perf_counter() - started)
+
+        return _timed
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Estimate a latency percentile from the histogram.
+
+        Args:
+            fraction (float): The percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            Optional[float]: The upper bound of the bucket holding the percentile in
+                milliseconds, the maximum for the overflow bucket, or None without reads.
+        """
+        if not self.executions:
+            return None
+        wanted = fraction * self.executions
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted:
+                break
+        if index < len(LATENCY_BUCKETS_MS):
+            return float(LATENCY_BUCKETS_MS[index])
+        return self.max_time * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a JSON serialisable summary without the sample values.
+
+        Returns:
+            Dict[str, Any]: The shape, counters, latency percentiles and histogram.
+        """
+        labels = [f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "collection": self.collection,
+            "operation": self.operation,
+            "filter": self.filter,
+            "sort": [list(key) for key in self.sort],
+            "count": self.count,
+            "executions": self.executions,
+            "mean_ms": self.total_time * 1000 / self.executions if self.executions else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_time * 1000,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class QueryShapeRecorder:
+    """
+    Records the query shapes of repository reads per collection.
+
+    At most ``max_shapes`` shapes are tracked; reads of further shapes are only
+    counted in ``overflow`` so unusual clients cannot grow the recorder unbounded.
+
+    Attributes:
+        max_shapes (int): Maximum number of distinct shapes.
+        overflow (int): Reads whose shape was not tracked.
+
+    Example:
+        ```python
+        BaseReadRepository.shape_recorder = QueryShapeRecorder(max_shapes=200)
+        ...
+        for stats in BaseReadRepository.shape_recorder.top(10, by="total_time"):
+            print(stats.to_dict())
+        ```
+    """
+
+    def __init__(self, max_shapes: int = 1000):
+        """
+        Initialize the QueryShapeRecorder.
+
+        Args:
+            max_shapes (int): Maximum number of distinct shapes.
+        """
+        self.max_shapes = max_shapes
+        self.overflow = 0
+        self._shapes: Dict[str, QueryShapeStats] = {}
+
+    def record(self, collection: str, operation: str, query: Dict[str, Any]) -> Optional[QueryShapeStats]:
+        """
+        Count one read.
+
+        Args:
+            collection (str): The collection name.
+            operation (str): The repository operation.
+            query (Dict[str, Any]): The query parts as passed to ``_read_through``.
+
+        Returns:
+            Optional[QueryShapeStats]: The shape's stats, or None if the shape is not tracked.
+        """
+        filter_query = query.get("filter")
+        if filter_query is None and "ids" in query:
+            filter_query = {"_id": {"$in": query["ids"]}}
+        shape = normalize_filter(filter_query)
+        sort = [tuple(key) for key in (query.get("sort") or [])]
+        key = json.dumps([collection, operation, shape, sort], sort_keys=True)
+
+        stats = self._shapes.get(key)
+        if stats is None:
+            if len(self._shapes) >= self.max_shapes:
+                self.overflow += 1
+                return None
+            stats = QueryShapeStats(collection, operation, shape, sort, sample=query)
+            self._shapes[key] = stats
+        stats.count += 1
+        return stats
+
+    def shapes(self, collection: Optional[str] = None) -> List[QueryShapeStats]:
+        """
+        Get the recorded shapes.
+
+        Args:
+            collection (Optional[str]): Only shapes of this collection.
+
+        Returns:
+            List[QueryShapeStats]: The shapes in the order they were first seen.
+        """
+        return [stats for stats in self._shapes.values() if collection is None or stats.collection == collection]
+
+    def top(self, limit: int = 10, collection: Optional[str] = None, by: str = "count") -> List[QueryShapeStats]:
+        """
+        Get the most frequent or most expensive shapes.
+
+        Args:
+            limit (int): Maximum number of shapes.
+            collection (Optional[str]): Only shapes of this collection.
+            by (str): ``"count"``, ``"total_time"`` or ``"max_time"``.
+
+        Returns:
+            List[QueryShapeStats]: The shapes in descending order.
+        """
+        return sorted(self.shapes(collection), key=lambda stats: getattr(stats, by), reverse=True)[:limit]
+
+    def reset(self) -> None:
+        """Forget all recorded shapes."""
+        self._shapes.clear()
+        self.overflow = 0
+
+
+DEFAULT_QUERY_SHAPE_RECORDER = QueryShapeRecorder()
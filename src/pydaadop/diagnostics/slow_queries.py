@@ -0,0 +1,316 @@
+"""
+This module provides the slow query monitor, a pymongo command listener that
+logs MongoDB commands slower than a threshold and captures ``executionStats``
+explains for a sample of them.
+
+The route serving the request is taken from :data:`current_route`, which the
+pydaadop route class sets for every request. Motor runs commands with a copy of
+the calling context, so the listener sees it.
+
+Classes:
+    SlowQuery: One slow command.
+    SlowQueryMonitor: The command listener with a bounded ring buffer of slow commands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from .index_advisor import summarize_plan
+from .query_shapes import normalize_filter
+
+logger = logging.getLogger(__name__)
+
+current_route: ContextVar[Optional[str]] = ContextVar("pydaadop_current_route", default=None)
+"""ContextVar[Optional[str]]: Method and path template of the request being served."""
+
+# Commands that read or write documents by filter.
+_TRACKED = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+# Command fields added by the driver, which an explained command must not repeat.
+_DRIVER_FIELDS = {"$db", "lsid", "$clusterTime", "txnNumber", "$readPreference", "readConcern", "apiVersion"}
+
+
+def _command_filter(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if command_name in ("find", "count", "distinct"):
+        return command.get("filter", command.get("query"))
+    if command_name == "findAndModify":
+        return command.get("query")
+    if command_name == "aggregate":
+        for stage in command.get("pipeline") or []:
+            if "$match" in stage:
+                return stage["$match"]
+        return None
+    statements = command.get("updates" if command_name == "update" else "deletes") or []
+    return statements[0].get("q") if statements else None
+
+
+def _returned(command_name: str, reply: Dict[str, Any]) -> Optional[int]:
+    if "cursor" in reply:
+        return len(reply["cursor"].get("firstBatch") or [])
+    if command_name == "distinct":
+        return len(reply.get("values") or [])
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return reply.get("n")
+
+
+@dataclass
+class SlowQuery:
+    """
+    One command slower than the threshold.
+
+    Attributes:
+        timestamp (float): Completion time as a UNIX timestamp.
+        database (str): The database name.
+        collection (Optional[str]): The collection name.
+        command_name (str): The command, e.g. ``find``.
+        shape (Dict[str, Any]): The filter shape, without values.
+        sort (List[str]): The sort keys.
+        duration_ms (float): The command duration.
+        returned (Optional[int]): Documents returned or affected.
+        route (Optional[str]): The route that issued the command.
+        error (Optional[str]): The failure message for failed commands.
+        explain (Optional[Dict[str, Any]]): Execution statistics, when sampled and captured.
+    """
+
+    timestamp: float
+    database: str
+    collection: Optional[str]
+    command_name: str
+    shape: Dict[str, Any]
+    sort: List[str]
+    duration_ms: float
+    returned: Optional[int] = None
+    route: Optional[str] = None
+    error: Optional[str] = None
+    explain: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a JSON serialisable copy.
+
+        Returns:
+            Dict[str, Any]: The fields of the entry.
+        """
+        return {
+            "timestamp": self.timestamp,
+            "database": self.database,
+            "collection": self.collection,
+            "command": self.command_name,
+            "shape": self.shape,
+            "sort": self.sort,
+            "duration_ms": self.duration_ms,
+            "returned": self.returned,
+            "route": self.route,
+            "error": self.error,
+            "explain": self.explain,
+        }
+
+
+@dataclass
+class _Started:
+    command_name: str
+    database: str
+    collection: Optional[str]
+    command: Dict[str, Any]
+    route: Optional[str]
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """
+    Logs MongoDB commands slower than ``threshold_ms`` and keeps the latest in a ring buffer.
+
+    A fraction ``sample_rate`` of the slow commands is explained with
+    ``executionStats`` verbosity to show documents examined against documents
+    returned; each shape is explained at most once per ``explain_interval``
+    seconds. Explains need the client and event loop given to :meth:`attach`.
+
+    Attributes:
+        threshold_ms (float): Commands at least this slow are recorded.
+        sample_rate (float): Fraction of slow commands to explain, 0 disables explains.
+        explain_interval (float): Minimum seconds between explains of the same shape.
+        enabled (bool): Whether commands are timed at all.
+
+    Example:
+        ```python
+        monitor = SlowQueryMonitor(threshold_ms=50, sample_rate=0.1)
+        client = AsyncIOMotorClient(uri, event_listeners=[monitor])
+        monitor.attach(client)
+        ```
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        sample_rate: float = 1.0,
+        max_entries: int = 100,
+        explain_interval: float = 60.0,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the SlowQueryMonitor.
+
+        Args:
+            threshold_ms (float): Commands at least this slow are recorded.
+            sample_rate (float): Fraction of slow commands to explain.
+            max_entries (int): Size of the ring buffer.
+            explain_interval (float): Minimum seconds between explains of the same shape.
+            enabled (bool): Whether commands are timed at all.
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_interval = explain_interval
+        self.enabled = enabled
+        self._entries: Deque[SlowQuery] = deque(maxlen=max_entries)
+        self._pending: Dict[Tuple[Any, int], _Started] = {}
+        self._explained: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._client: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, client: Any) -> None:
+        """
+        Use a client and the running event loop for explains.
+
+        Args:
+            client (Any): A Motor client created with this monitor as event listener.
+        """
+        self._client = client
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        """Remember a tracked command until it finishes."""
+        if not self.enabled or event.command_name not in _TRACKED:
+            return
+        collection = event.command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = _Started(
+            command_name=event.command_name,
+            database=event.database_name,
+            collection=collection if isinstance(collection, str) else None,
+            command=event.command,
+            route=current_route.get(),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        """Record a tracked command if it was slow."""
+        started = self._pending.pop((event.connection_id, event.request_id), None)
+        if started is not None and event.duration_micros / 1000 >= self.threshold_ms:
+            self._record(started, event.duration_micros / 1000, _returned(started.command_name, event.reply), None)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        """Record a tracked command if it was slow before failing."""
+        started = self._pending.pop((event.connection_id, event.request_id), None)
+        if started is not None and event.duration_micros / 1000 >= self.threshold_ms:
+            self._record(started, event.duration_micros / 1000, None, str(event.failure.get("errmsg", event.failure)))
+
+    def _record(self, started: _Started, duration_ms: float, returned: Optional[int], error: Optional[str]) -> None:
+        shape = normalize_filter(_command_filter(started.command_name, started.command))
+        entry = SlowQuery(
+            timestamp=time.time(),
+            database=started.database,
+            collection=started.collection,
+            command_name=started.command_name,
+            shape=shape,
+            sort=list((started.command.get("sort") or {}).keys()),
+            duration_ms=duration_ms,
+            returned=returned,
+            route=started.route,
+            error=error,
+        )
+        self._entries.append(entry)
+        logger.warning(
+            "Slow %s on %s.%s took %.1f ms (returned %s, route %s): shape %s sort %s%s",
+            entry.command_name, entry.database, entry.collection, duration_ms, returned,
+            entry.route, entry.shape, entry.sort, f" error {error}" if error else "",
+        )
+        if error is None and self._should_explain(entry):
+            self._loop.call_soon_threadsafe(self._start_explain, entry, started.command)
+
+    def _should_explain(self, entry: SlowQuery) -> bool:
+        if self._client is None or self._loop is None or self._loop.is_closed():
+            return False
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        key = f"{entry.database}.{entry.collection}:{entry.command_name}:{entry.shape}:{entry.sort}"
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(key, -self.explain_interval) < self.explain_interval:
+                return False
+            self._explained[key] = now
+        return True
+
+    def _start_explain(self, entry: SlowQuery, command: Dict[str, Any]) -> None:
+        self._loop.create_task(self.explain(entry, command))
+
+    async def explain(self, entry: SlowQuery, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Run ``explain`` with ``executionStats`` verbosity for a recorded command.
+
+        Args:
+            entry (SlowQuery): The entry receiving the statistics.
+            command (Dict[str, Any]): The command as sent by the driver.
+
+        Returns:
+            Optional[Dict[str, Any]]: The captured statistics, or None if explain failed.
+        """
+        explained = {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+        try:
+            result = await self._client[entry.database].command(
+                {"explain": explained, "verbosity": "executionStats"}
+            )
+        except Exception as e:
+            logger.debug("Explaining slow %s on %s failed: %s", entry.command_name, entry.collection, e)
+            return None
+
+        stats = result.get("executionStats") or {}
+        plan = summarize_plan(result)
+        entry.explain = {
+            "docs_examined": stats.get("totalDocsExamined"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "returned": stats.get("nReturned"),
+            "execution_ms": stats.get("executionTimeMillis"),
+            "collection_scan": plan.collection_scan,
+            "blocking_sort": plan.blocking_sort,
+            "indexes": plan.indexes,
+        }
+        logger.warning(
+            "Slow %s on %s.%s examined %s documents and %s keys for %s returned (indexes %s%s%s)",
+            entry.command_name, entry.database, entry.collection,
+            entry.explain["docs_examined"], entry.explain["keys_examined"], entry.explain["returned"],
+            plan.indexes, ", COLLSCAN" if plan.collection_scan else "", ", SORT" if plan.blocking_sort else "",
+        )
+        return entry.explain
+
+    def entries(self) -> List[SlowQuery]:
+        """
+        Get the buffered slow commands.
+
+        Returns:
+            List[SlowQuery]: The entries, newest first.
+        """
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        """Empty the ring buffer."""
+        self._entries.clear()
+
+
+DEFAULT_SLOW_QUERY_MONITOR = SlowQueryMonitor(
+    threshold_ms=float(os.getenv("PYDAADOP_SLOW_QUERY_MS", "100")),
+    sample_rate=float(os.getenv("PYDAADOP_SLOW_QUERY_EXPLAIN_RATE", "0.1")),
+)
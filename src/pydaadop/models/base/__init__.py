@@ -1 +1,2 @@
-from .base_mongo_model import BaseMongoModel
\ No newline at end of file
+from .base_mongo_model import BaseMongoModel
+from .index_definition import IndexDefinition, declared_indexes
\ No newline at end of file
@@ -1,13 +1,13 @@
-from datetime import datetime
-
 from pydantic import BaseModel, ConfigDict, Field
 from bson import ObjectId
-from typing import Optional, List, Dict, Any
-import base64
-import uuid
-from decimal import Decimal
-from enum import Enum
-from datetime import date, time
+from typing import Optional, List, Dict, Any, Set, TYPE_CHECKING
+
+from .bson_storage import from_bson, to_bson, uses_native_storage
+from .id_storage import stored_id
+from .model_serializer import dump_json_safe
+
+if TYPE_CHECKING:
+    from .index_definition import IndexDefinition
 
 
 class BaseMongoModel(BaseModel):
@@ -16,7 +16,8 @@ class BaseMongoModel(BaseModel):
 
     Attributes:
         id (Optional[str]): The unique identifier for the document, mapped from MongoDB's _id.
-            By default a new ObjectId hex string is generated.
+            By default a new ObjectId hex string is generated. It is stored as
+            configured by ``id_storage()``.
     """
 
     model_config = ConfigDict(
@@ -38,129 +39,74 @@ class BaseMongoModel(BaseModel):
 
     def model_dump(self, *args, **kwargs) -> Dict[str, Any]:
         """
-        Serialize the model to a dictionary, with special handling for datetime and ObjectId fields.
+        Serialize the model to a dictionary of JSON-safe values, with the id as ``_id``.
+
+        Datetimes, dates and times become ISO strings, Decimal, UUID and unknown
+        types such as ObjectId strings, bytes base64 and enums their values. The
+        serializer is compiled once per model class, see
+        :mod:`pydaadop.models.base.model_serializer`.
 
         Args:
             *args: Variable length argument list.
-            **kwargs: Arbitrary keyword arguments.
+            **kwargs: Arbitrary keyword arguments. ``ignore_id=True`` leaves out
+                the ``_id``; ``include``, ``exclude``, ``exclude_none`` and the
+                other pydantic dump options are honoured, ``mode`` is ignored.
 
         Returns:
             Dict[str, Any]: The serialized model as a dictionary.
         """
-        # Pull out our special flag, pass the rest through to pydantic
+        # Pull out our special flag, pass the rest through to the serializer
         ignore_id = kwargs.pop("ignore_id", False)
-        # Let pydantic perform its dump respecting caller kwargs
-        try:
-            data = super().model_dump(*args, **kwargs)
-        except TypeError:
-            # Older pydantic signatures? fall back without args
-            data = super().model_dump()
-
-        # Sanitize recursively to ensure JSON-safe primitives and detect cycles
-        def _sanitize(obj, _seen=None, _depth=0):
-            if _seen is None:
-                _seen = set()
-            # protect against pathological recursion
-            if _depth > 200:
-                return str(obj)
-
-            # simple primitives
-            if obj is None or isinstance(obj, (str, bool, int, float)):
-                return obj
-
-            # avoid revisiting same container
-            oid = id(obj)
-            if oid in _seen:
-                return str(obj)
-            _seen.add(oid)
-
-            # pydantic models -> dict
-            if isinstance(obj, BaseModel):
-                try:
-                    sub = obj.model_dump()
-                except Exception:
-                    _seen.discard(oid)
-                    return str(obj)
-                res = _sanitize(sub, _seen=_seen, _depth=_depth + 1)
-                _seen.discard(oid)
-                return res
-
-            # dict -> sanitize keys and values
-            if isinstance(obj, dict):
-                out = {}
-                for k, v in obj.items():
-                    try:
-                        key = str(k)
-                    except Exception:
-                        key = repr(k)
-                    out[key] = _sanitize(v, _seen=_seen, _depth=_depth + 1)
-                _seen.discard(oid)
-                return out
-
-            # sequences -> list
-            if isinstance(obj, (list, tuple, set, frozenset)):
-                out = [_sanitize(v, _seen=_seen, _depth=_depth + 1) for v in obj]
-                _seen.discard(oid)
-                return out
-
-            # datetime/date/time -> iso
-            if isinstance(obj, (datetime, date, time)):
-                _seen.discard(oid)
-                try:
-                    return obj.isoformat()
-                except Exception:
-                    return str(obj)
-
-            # bson ObjectId
-            if isinstance(obj, ObjectId):
-                _seen.discard(oid)
-                return str(obj)
-
-            # bytes -> base64
-            if isinstance(obj, (bytes, bytearray)):
-                try:
-                    out = base64.b64encode(bytes(obj)).decode("ascii")
-                except Exception:
-                    out = str(obj)
-                _seen.discard(oid)
-                return out
-
-            # Decimal -> string to avoid float precision loss
-            if isinstance(obj, Decimal):
-                _seen.discard(oid)
-                return str(obj)
-
-            # UUID -> string
-            if isinstance(obj, uuid.UUID):
-                _seen.discard(oid)
-                return str(obj)
-
-            # Enum -> value or name
-            if isinstance(obj, Enum):
-                _seen.discard(oid)
-                return obj.value if hasattr(obj, "value") else str(obj)
-
-            # fallback to string representation
-            try:
-                out = str(obj)
-            except Exception:
-                out = repr(obj)
-            _seen.discard(oid)
-            return out
-
-        sanitized = _sanitize(data)
+        kwargs.pop("mode", None)
+        data = dump_json_safe(self, **kwargs)
 
         # Ensure we always return a mapping
-        if not isinstance(sanitized, dict):
-            sanitized = {"value": sanitized}
+        if not isinstance(data, dict):
+            data = {"value": data}
 
         # If id exists and caller didn't ask to ignore it, expose as _id
         if self.id is not None and not ignore_id:
-            sanitized["_id"] = str(self.id)
+            data["_id"] = str(self.id)
         # remove the plain 'id' key to keep API surface stable
-        sanitized.pop("id", None)
+        data.pop("id", None)
+
+        return data
+
+    def model_dump_storage(self, ignore_id: bool = False, include: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Serialize the model into the document the repositories store.
+
+        Args:
+            ignore_id (bool): Leave out the ``_id``, e.g. for ``$set`` updates.
+            include (Optional[Set[str]]): Serialize only these fields.
 
-        return sanitized
+        Returns:
+            Dict[str, Any]: The document; equal to ``model_dump`` unless the
+                model uses ``native_storage``, with the ``_id`` of ``id_storage``.
+        """
+        if uses_native_storage(type(self)):
+            document = to_bson(super().model_dump(include=include))
+            document.pop("id", None)
+        else:
+            document = self.model_dump(ignore_id=True, include=include)
+        if self.id is not None and not ignore_id:
+            document["_id"] = stored_id(type(self), self.id)
+        return document
+
+    @classmethod
+    def model_validate_storage(cls, document: Dict[str, Any]) -> "BaseMongoModel":
+        """
+        Create a model from a stored document.
+
+        Args:
+            document (Dict[str, Any]): The document read from MongoDB.
+
+        Returns:
+            BaseMongoModel: The model, with native BSON values converted back.
+        """
+        if uses_native_storage(cls):
+            document = from_bson(document)
+        return cls(**document)
 
     @staticmethod
     def create_index() -> List[str]:
@@ -172,26 +118,130 @@ class BaseMongoModel(BaseModel):
         """
         return ["id"]
 
+    @staticmethod
+    def index_definitions() -> List["IndexDefinition"]:
+        """
+        Declare the secondary indexes of the collection.
+
+        The unique key index from ``create_index()`` is added automatically. The
+        index synchroniser creates missing indexes at startup or from the CLI.
+
+        Returns:
+            List[IndexDefinition]: The index definitions.
+        """
+        return []
+
+    @staticmethod
+    def search_weights() -> Dict[str, int]:
+        """
+        Opt into index-backed full-text search.
+
+        The fields are covered by a MongoDB text index with the given weights,
+        and the ``search`` query parameter becomes a ``$text`` search whose
+        results are ranked by relevance. Without fields, a search matches every
+        token case-insensitively as a substring of any field, which scans the
+        collection.
+
+        Returns:
+            Dict[str, int]: The weight by field name, e.g. ``{"name": 10, "description": 1}``.
+        """
+        return {}
+
+    @staticmethod
+    def trigram_fields() -> List[str]:
+        """
+        Mark string fields whose substring filters should use an index.
+
+        The repositories store the lowercase trigrams of these fields in the
+        ``_trigrams`` sub document, and contains filters on them are answered
+        from a multikey index, see :mod:`pydaadop.queries.base.trigram_index`.
+        Documents written before a field was marked need ``backfill_trigrams``.
+
+        Returns:
+            List[str]: The field names.
+        """
+        return []
+
+    @staticmethod
+    def suggest_fields() -> List[str]:
+        """
+        Enable typeahead suggestions for string fields.
+
+        Each field gets a case-insensitive collation index, and the read router
+        adds a ``suggest/`` endpoint completing prefixes of these fields.
+
+        Returns:
+            List[str]: The field names.
+        """
+        return []
+
+    @staticmethod
+    def id_storage() -> str:
+        """
+        Choose how ``_id`` is stored.
+
+        ``"string"`` (the default) stores ids as strings, like collections
+        written by earlier versions. New models can return ``"objectid"`` to
+        store ObjectId hex strings as native ObjectIds, which halves the size of
+        the primary index; existing collections need ``migrate_string_ids``
+        first. The API sees string ids either way, see
+        :mod:`pydaadop.models.base.id_storage`.
+
+        Returns:
+            str: ``"objectid"`` or ``"string"``.
+        """
+        return "string"
+
+    @staticmethod
+    def native_storage() -> bool:
+        """
+        Opt into storing native BSON types.
+
+        The repositories then store datetimes, dates, Decimals, UUIDs and bytes
+        as BSON dates, Decimal128 and binary values instead of the JSON-safe
+        strings of ``model_dump``, and convert them back on reads, see
+        :mod:`pydaadop.models.base.bson_storage`.
+
+        Returns:
+            bool: Whether the model is stored with native BSON types.
+        """
+        return False
+
+    @staticmethod
+    def sort_combinations() -> List[str]:
+        """
+        Declare the compound sorts clients are expected to use.
+
+        Each entry uses the ``sort`` query syntax, e.g. ``"status,-created"``. A
+        warning is logged at startup for every combination no index can serve.
+
+        Returns:
+            List[str]: The sort combinations.
+        """
+        return []
+
     def model_dump_keys(self, *args: dict, **kwargs: dict) -> Dict[str, Any]:
         """
         Serialize the model and filter only the indexed fields.
 
         Args:
             *args: Variable length argument list.
-            **kwargs: Arbitrary keyword arguments.
+            **kwargs: Arbitrary keyword arguments. ``storage=True`` serializes
+                the keys the way the repositories store them, for key filters.
 
         Returns:
             Dict[str, Any]: The serialized model with only the indexed fields.
         """
         # Get the index fields from the model's create_index method
-        index_keys = self.create_index()
-
-        if "id" in index_keys:
-            index_keys.remove("id")
-            index_keys.append("_id")
-
-        # Serialize the model and filter only the indexed fields
-        serialized_data = self.model_dump(*args, **kwargs)
+        index_keys = ["_id" if key == "id" else key for key in self.create_index()]
+        # Serialize only the indexed fields; the id is added as _id anyway
+        fields = {key for key in index_keys if key != "_id"}
+
+        if kwargs.pop("storage", False):
+            serialized_data = self.model_dump_storage(include=fields)
+        else:
+            kwargs.setdefault("include", fields)
+            serialized_data = self.model_dump(*args, **kwargs)
 
         # Select only the indexed fields
         filtered_data = {
@@ -0,0 +1,167 @@
+"""
+This module provides the native BSON storage mode of models.
+
+By default ``BaseMongoModel.model_dump`` produces JSON-safe values, and that is
+what the repositories store: datetimes as ISO strings, Decimal and UUID as
+strings and bytes as base64. Models whose ``native_storage()`` returns True are
+stored with native BSON types instead, which keeps documents small and lets
+range queries and sorts compare dates and numbers by value:
+
+- ``datetime`` becomes a BSON date (UTC, millisecond precision),
+- ``date`` a BSON date at midnight,
+- ``Decimal`` a Decimal128,
+- ``UUID`` binary subtype 4 and ``bytes`` binary subtype 0.
+
+Values without a BSON type (``time``, enums) are stored like in the JSON mode.
+Reads convert the stored values back before the model is validated, so the
+API still sees the declared types. Documents written in the JSON mode stay
+readable after a model switches, but only rewritten documents get native
+values, and queries compare native values against native values only.
+
+Functions:
+    uses_native_storage: Whether a model is stored with native BSON types.
+    to_bson: Converts a value to its native BSON representation.
+    from_bson: Converts stored BSON values back to Python values.
+    storage_value: Encodes a query value the way a model stores it.
+    storage_fields: Encodes a partial update of a model for storage.
+"""
+
+import base64
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, Type
+
+from bson import Binary, Decimal128
+from bson.binary import UUID_SUBTYPE
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+def uses_native_storage(model: Type[Any]) -> bool:
+    """
+    Check whether a model is stored with native BSON types.
+
+    Args:
+        model (Type[Any]): The model class.
+
+    Returns:
+        bool: What the model's ``native_storage()`` returns.
+    """
+    return bool(getattr(model, "native_storage", lambda: False)())
+
+
+def to_bson(value: Any) -> Any:
+    """
+    Convert a value to its native BSON representation.
+
+    Args:
+        value (Any): A Python value, as produced by ``BaseModel.model_dump()``.
+
+    Returns:
+        Any: The value with datetimes, dates, Decimals, UUIDs and bytes
+            converted, recursively for dicts, lists and models.
+    """
+    if value is None or isinstance(value, (str, bool, int, float, datetime, Binary, Decimal128)):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    if isinstance(value, Decimal):
+        return Decimal128(value)
+    if isinstance(value, uuid.UUID):
+        return Binary.from_uuid(value)
+    if isinstance(value, (bytes, bytearray)):
+        return Binary(bytes(value))
+    if isinstance(value, time):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return to_bson(value.model_dump())
+    if isinstance(value, dict):
+        return {str(key): to_bson(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_bson(item) for item in value]
+    return value
+
+
+def from_bson(value: Any) -> Any:
+    """
+    Convert stored BSON values back to Python values.
+
+    Args:
+        value (Any): A document or value read from MongoDB.
+
+    Returns:
+        Any: The value with Decimal128 and binary UUIDs converted, recursively
+            for dicts and lists; dates stay datetimes, the model narrows them.
+    """
+    if isinstance(value, dict):
+        return {key: from_bson(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_bson(item) for item in value]
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    if isinstance(value, Binary):
+        return value.as_uuid() if value.subtype == UUID_SUBTYPE else bytes(value)
+    return value
+
+
+def storage_value(model: Type[Any], value: Any) -> Any:
+    """
+    Encode a query value the way a model stores it.
+
+    Args:
+        model (Type[Any]): The model class.
+        value (Any): The value, coerced to the field's type.
+
+    Returns:
+        Any: The native BSON value for models with native storage, otherwise
+            the JSON-safe value ``BaseMongoModel.model_dump`` would store.
+    """
+    if uses_native_storage(model):
+        return to_bson(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return value
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Type[BaseModel], field: str) -> TypeAdapter:
+    return TypeAdapter(model.model_fields[field].annotation)
+
+
+def storage_fields(model: Type[Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Encode the ``$set`` data of a partial update for storage.
+
+    With native storage the values of model fields are validated against the
+    field types first, so JSON input such as ISO strings is stored natively.
+
+    Args:
+        model (Type[Any]): The model class.
+        data (Dict[str, Any]): The field values.
+
+    Returns:
+        Dict[str, Any]: The encoded data, or *data* itself without native storage.
+
+    Raises:
+        ValueError: If a value does not match its field's type.
+    """
+    if not uses_native_storage(model):
+        return data
+    fields = getattr(model, "model_fields", {})
+    encoded: Dict[str, Any] = {}
+    for key, value in data.items():
+        if key in fields and key != "id":
+            try:
+                value = _adapter(model, key).validate_python(value)
+            except ValidationError as e:
+                raise ValueError(f"invalid value for field {key!r}: {e}") from e
+        encoded[key] = to_bson(value)
+    return encoded
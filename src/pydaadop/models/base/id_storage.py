@@ -0,0 +1,174 @@
+"""
+This module provides the id storage strategies of models.
+
+The API always sees ``id`` as a string. What is stored in ``_id`` depends on the
+model's ``id_storage()``:
+
+- ``"string"`` (the default) stores every id as a string, as earlier
+  versions did.
+- ``"objectid"`` stores ObjectId hex strings as native 12 byte ObjectIds,
+  which halves the size of the ``_id`` index compared to 24 character
+  strings. Ids that are no ObjectId hex string stay strings.
+
+The repositories convert the ids of written documents and of ``_id``
+conditions in filters, and models convert stored ObjectIds back to strings.
+``migrate_string_ids`` moves a collection written with string ids to
+ObjectIds; run it before switching the model of an existing collection to
+``"objectid"``.
+
+Attributes:
+    OBJECT_ID (str): Store ids as native ObjectIds.
+    STRING (str): Store ids as strings.
+
+Functions:
+    id_storage: Returns the id storage strategy of a model.
+    stored_id: Converts an id to the value stored in ``_id``.
+    stored_id_filter: Converts the ``_id`` conditions of a filter.
+    migrate_string_ids: Replaces string ids of a collection by ObjectIds.
+"""
+
+from typing import Any, Dict, List, Optional, Type
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteMany, ReplaceOne
+
+OBJECT_ID = "objectid"
+STRING = "string"
+
+# Operators whose operand is an id or a list of ids.
+_VALUE_OPERATORS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte")
+_LIST_OPERATORS = ("$in", "$nin")
+
+
+def id_storage(model: Optional[Type[Any]]) -> str:
+    """
+    Get the id storage strategy of a model.
+
+    Args:
+        model (Optional[Type[Any]]): The model class.
+
+    Returns:
+        str: ``OBJECT_ID`` or ``STRING``; models without ``id_storage()`` use ``STRING``.
+    """
+    strategy = getattr(model, "id_storage", lambda: STRING)()
+    if strategy not in (OBJECT_ID, STRING):
+        raise ValueError(f"unknown id storage {strategy!r} of {getattr(model, '__name__', model)}")
+    return strategy
+
+
+def _object_id(value: Any) -> Optional[ObjectId]:
+    """The ObjectId of an ObjectId hex string, or None."""
+    if isinstance(value, str) and len(value) == 24:
+        try:
+            return ObjectId(value)
+        except InvalidId:
+            return None
+    return None
+
+
+def stored_id(model: Optional[Type[Any]], value: Any) -> Any:
+    """
+    Convert an id to the value stored in ``_id``.
+
+    Args:
+        model (Optional[Type[Any]]): The model class.
+        value (Any): The id, as string or ObjectId.
+
+    Returns:
+        Any: An ObjectId for ObjectId hex strings of ``OBJECT_ID`` models, a
+            string for ObjectIds of ``STRING`` models, otherwise *value*.
+    """
+    if id_storage(model) == OBJECT_ID:
+        object_id = _object_id(value)
+        return value if object_id is None else object_id
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+def _stored_condition(model: Optional[Type[Any]], condition: Any) -> Any:
+    if not isinstance(condition, dict):
+        return stored_id(model, condition)
+    if not all(key.startswith("$") for key in condition):
+        return condition
+    converted = dict(condition)
+    for operator, operand in condition.items():
+        if operator in _VALUE_OPERATORS:
+            converted[operator] = stored_id(model, operand)
+        elif operator in _LIST_OPERATORS and isinstance(operand, (list, tuple)):
+            converted[operator] = [stored_id(model, value) for value in operand]
+        elif operator == "$not":
+            converted[operator] = _stored_condition(model, operand)
+    return converted
+
+
+def stored_id_filter(model: Optional[Type[Any]], filter_query: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert the ``_id`` conditions of a filter to the stored ids.
+
+    Equality, comparison, ``$in``/``$nin`` and ``$not`` conditions are
+    converted, also inside ``$and``, ``$or`` and ``$nor``.
+
+    Args:
+        model (Optional[Type[Any]]): The model class.
+        filter_query (Optional[Dict[str, Any]]): The filter.
+
+    Returns:
+        Optional[Dict[str, Any]]: The converted filter, or *filter_query* itself
+            if it has no ``_id`` conditions.
+    """
+    if not filter_query:
+        return filter_query
+    converted: Optional[Dict[str, Any]] = None
+    for key, value in filter_query.items():
+        if key == "_id":
+            new_value = _stored_condition(model, value)
+        elif key in ("$and", "$or", "$nor") and isinstance(value, list):
+            new_value = [stored_id_filter(model, clause) for clause in value]
+        else:
+            continue
+        if new_value != value or type(new_value) is not type(value):
+            if converted is None:
+                converted = dict(filter_query)
+            converted[key] = new_value
+    return filter_query if converted is None else converted
+
+
+async def migrate_string_ids(collection: Any, batch_size: int = 500) -> int:
+    """
+    Replace the ObjectId hex string ids of a collection by native ObjectIds.
+
+    ``_id`` cannot be changed in place, so every document is written again
+    under its ObjectId and the string copy is deleted afterwards. The upsert
+    makes the migration safe to run again after an interruption. References to
+    the ids in other collections are not changed. Run it while nothing writes
+    to the collection, then switch the model to ``OBJECT_ID``.
+
+    Args:
+        collection (Any): The collection.
+        batch_size (int): Documents replaced per bulk write.
+
+    Returns:
+        int: The number of migrated documents.
+    """
+    migrated = 0
+    batch: List[Dict[str, Any]] = []
+
+    async def flush() -> int:
+        operations: List[Any] = [
+            ReplaceOne({"_id": ObjectId(document["_id"])}, {k: v for k, v in document.items() if k != "_id"}, upsert=True)
+            for document in batch
+        ]
+        operations.append(DeleteMany({"_id": {"$in": [document["_id"] for document in batch]}}))
+        await collection.bulk_write(operations, ordered=True)
+        return len(batch)
+
+    async for document in collection.find({"_id": {"$type": "string"}}):
+        if _object_id(document["_id"]) is None:
+            continue
+        batch.append(document)
+        if len(batch) >= batch_size:
+            migrated += await flush()
+            batch = []
+    if batch:
+        migrated += await flush()
+    return migrated
@@ -0,0 +1,275 @@
+"""
+This module provides the declarative index API for models.
+
+Models list their indexes in ``index_definitions()``; the index synchroniser
+creates missing ones and reports drift against the indexes on the server.
+
+Classes:
+    IndexDefinition: One secondary, compound, TTL, partial, sparse, collation or text index.
+
+Functions:
+    declared_indexes: All indexes a model declares, including its unique key index.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+IndexKey = Union[str, Tuple[str, Any]]
+
+# Keys MongoDB reports for every text index instead of the indexed fields.
+_TEXT_KEYS = [("_fts", "text"), ("_ftsx", 1)]
+
+
+def _parse_key(key: IndexKey) -> Tuple[str, Any]:
+    if isinstance(key, tuple):
+        field, direction = key
+    else:
+        key = key.strip()
+        field, direction = key.lstrip("+-").strip(), -1 if key.startswith("-") else 1
+    if not field:
+        raise ValueError(f"invalid index key {key!r}")
+    return ("_id" if field == "id" else field), direction
+
+
+class IndexDefinition:
+    """
+    Declaration of one MongoDB index.
+
+    Keys are given like the ``sort`` query parameter (``"status"``, ``"-created"``)
+    or as ``(field, kind)`` tuples for special index types such as
+    ``("location", "2dsphere")`` or ``("name", "text")``.
+
+    Attributes:
+        keys (List[Tuple[str, Any]]): The (field, direction) pairs; ``id`` is mapped to ``_id``.
+        name (str): The index name; defaults to MongoDB's ``field_direction`` naming.
+        unique (bool): Reject documents with duplicate keys.
+        sparse (bool): Skip documents that lack the indexed fields.
+        expire_after_seconds (Optional[int]): TTL in seconds after the indexed date field.
+        partial_filter (Optional[Dict[str, Any]]): Only index documents matching this filter.
+        collation (Optional[Dict[str, Any]]): Collation used by the index, e.g. ``{"locale": "en", "strength": 2}``.
+        weights (Optional[Dict[str, int]]): Field weights for text indexes.
+        default_language (Optional[str]): Default language for text indexes.
+
+    Example:
+        ```python
+        class Ticket(BaseMongoModel):
+            @staticmethod
+            def index_definitions() -> List[IndexDefinition]:
+                return [
+                    IndexDefinition("status", "-created", "id"),
+                    IndexDefinition("email", unique=True, collation={"locale": "en", "strength": 2}),
+                    IndexDefinition("assignee", partial_filter={"assignee": {"$exists": True}}),
+                    IndexDefinition.ttl("expires_at", 0),
+                    IndexDefinition.text("title", "body", weights={"title": 5}),
+                ]
+        ```
+    """
+
+    def __init__(
+        self,
+        *keys: IndexKey,
+        name: Optional[str] = None,
+        unique: bool = False,
+        sparse: bool = False,
+        expire_after_seconds: Optional[int] = None,
+        partial_filter: Optional[Dict[str, Any]] = None,
+        collation: Optional[Dict[str, Any]] = None,
+        weights: Optional[Dict[str, int]] = None,
+        default_language: Optional[str] = None,
+    ):
+        """
+        Initialize the IndexDefinition.
+
+        Args:
+            *keys (IndexKey): The indexed fields in order.
+            name (Optional[str]): Explicit index name.
+            unique (bool): Create a unique index.
+            sparse (bool): Create a sparse index.
+            expire_after_seconds (Optional[int]): TTL for a single date field.
+            partial_filter (Optional[Dict[str, Any]]): Partial filter expression.
+            collation (Optional[Dict[str, Any]]): Index collation.
+            weights (Optional[Dict[str, int]]): Text index weights.
+            default_language (Optional[str]): Text index default language.
+
+        Raises:
+            ValueError: If no keys are given, a key repeats or a TTL index is compound.
+        """
+        if not keys:
+            raise ValueError("an index needs at least one key")
+        self.keys: List[Tuple[str, Any]] = [_parse_key(key) for key in keys]
+        fields = [field for field, _ in self.keys]
+        if len(set(fields)) != len(fields):
+            raise ValueError(f"index keys repeat a field: {fields}")
+        if expire_after_seconds is not None and len(self.keys) != 1:
+            raise ValueError("a TTL index must have exactly one key")
+        self.unique = unique
+        self.sparse = sparse
+        self.expire_after_seconds = expire_after_seconds
+        self.partial_filter = partial_filter
+        self.collation = collation
+        self.weights = weights
+        self.default_language = default_language
+        self.name = name or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    @classmethod
+    def ttl(cls, field: str, expire_after_seconds: int, **options: Any) -> "IndexDefinition":
+        """
+        Declare a TTL index that removes documents once ``field`` is older than the TTL.
+
+        Args:
+            field (str): A date field.
+            expire_after_seconds (int): Seconds after the field's value to expire documents.
+            **options (Any): Further index options.
+
+        Returns:
+            IndexDefinition: The definition.
+        """
+        return cls(field, expire_after_seconds=expire_after_seconds, **options)
+
+    @classmethod
+    def text(cls, *fields: str, **options: Any) -> "IndexDefinition":
+        """
+        Declare a text index over one or more string fields.
+
+        Args:
+            *fields (str): The fields to index.
+            **options (Any): Further index options such as ``weights``.
+
+        Returns:
+            IndexDefinition: The definition.
+        """
+        return cls(*[(field, "text") for field in fields], **options)
+
+    @property
+    def is_text(self) -> bool:
+        """bool: Whether this is a text index."""
+        return any(direction == "text" for _, direction in self.keys)
+
+    def options(self) -> Dict[str, Any]:
+        """
+        Get the options passed to ``create_index``.
+
+        Returns:
+            Dict[str, Any]: The index options, including the name.
+        """
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        if self.collation is not None:
+            options["collation"] = self.collation
+        if self.weights is not None:
+            options["weights"] = self.weights
+        if self.default_language is not None:
+            options["default_language"] = self.default_language
+        return options
+
+    def server_keys(self) -> List[Tuple[str, Any]]:
+        """
+        Get the key pattern as ``list_indexes()`` reports it.
+
+        Text fields are collapsed into MongoDB's ``_fts``/``_ftsx`` keys.
+
+        Returns:
+            List[Tuple[str, Any]]: The key pattern.
+        """
+        if not self.is_text:
+            return list(self.keys)
+        keys: List[Tuple[str, Any]] = []
+        for field, direction in self.keys:
+            if direction != "text":
+                keys.append((field, direction))
+            elif keys[-len(_TEXT_KEYS):] != _TEXT_KEYS:
+                keys.extend(_TEXT_KEYS)
+        return keys
+
+    def matches(self, info: Dict[str, Any]) -> bool:
+        """
+        Check whether an index reported by ``list_indexes()`` is this index.
+
+        Only declared collation fields are compared, since the server fills in
+        defaults for the rest.
+
+        Args:
+            info (Dict[str, Any]): The index document from the server.
+
+        Returns:
+            bool: True if keys and options are the same.
+        """
+        if list(info.get("key", {}).items()) != self.server_keys():
+            return False
+        if bool(info.get("unique", False)) != self.unique or bool(info.get("sparse", False)) != self.sparse:
+            return False
+        if info.get("expireAfterSeconds") != self.expire_after_seconds:
+            return False
+        if info.get("partialFilterExpression") != self.partial_filter:
+            return False
+        collation = info.get("collation") or {}
+        if any(collation.get(key) != value for key, value in (self.collation or {}).items()):
+            return False
+        if self.collation is None and collation and collation.get("locale") != "simple":
+            return False
+        if self.is_text:
+            weights = {field: 1 for field, direction in self.keys if direction == "text"}
+            weights.update(self.weights or {})
+            if dict(info.get("weights") or {}) != weights:
+                return False
+            if info.get("default_language", "english") != (self.default_language or "english"):
+                return False
+        return True
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IndexDefinition) and (self.keys, self.options()) == (other.keys, other.options())
+
+    def __repr__(self) -> str:
+        return f"IndexDefinition({self.name!r}, keys={self.keys!r})"
+
+
+def declared_indexes(model: Type[Any]) -> List[IndexDefinition]:
+    """
+    Collect the indexes a model declares.
+
+    The key returned by ``create_index()`` becomes a unique index, unless it is
+    only ``id``; ``index_definitions()`` adds the secondary indexes,
+    ``search_weights()`` the text index of the search, ``trigram_fields()``
+    one multikey index per trigram field and ``suggest_fields()`` one
+    case-insensitive index per suggest field.
+
+    Args:
+        model (Type[Any]): The model class.
+
+    Returns:
+        List[IndexDefinition]: The definitions, each name appearing once.
+
+    Raises:
+        ValueError: If two definitions share a name or more than one text index is declared.
+    """
+    definitions: List[IndexDefinition] = []
+    keys = model.create_index() or []
+    if keys and keys != ["id"]:
+        fields = ["_id" if key == "id" else key for key in keys]
+        definitions.append(IndexDefinition(*fields, unique=True, name=f"unique_{model.__name__}_" + "_".join(fields)))
+    definitions.extend(getattr(model, "index_definitions", lambda: [])() or [])
+    weights = getattr(model, "search_weights", lambda: {})() or {}
+    if weights:
+        definitions.append(IndexDefinition.text(*weights, weights=dict(weights), name=f"search_{model.__name__}"))
+    if sum(definition.is_text for definition in definitions) > 1:
+        raise ValueError(f"{model.__name__} declares more than one text index; MongoDB allows one per collection")
+    for field in getattr(model, "trigram_fields", lambda: [])() or []:
+        definitions.append(IndexDefinition(f"_trigrams.{field}", name=f"trigram_{model.__name__}_{field}"))
+    for field in getattr(model, "suggest_fields", lambda: [])() or []:
+        from ...queries.base.base_suggest import SUGGEST_COLLATION  # local import to avoid cycle
+
+        definitions.append(IndexDefinition(field, collation=SUGGEST_COLLATION, name=f"suggest_{model.__name__}_{field}"))
+
+    names = [definition.name for definition in definitions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{model.__name__} declares the index names {duplicates} more than once")
+    return definitions
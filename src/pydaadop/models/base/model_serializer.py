@@ -0,0 +1,170 @@
+"""
+This module provides the compiled serializers behind ``BaseMongoModel.model_dump``.
+
+``model_dump`` returns JSON-safe values: datetimes, dates and times in ISO
+format, Decimal, UUID and timedelta as strings, bytes as base64, enums as their
+values and unknown types such as ObjectId as ``str()``. Instead of walking the
+dumped data in Python, a pydantic-core serializer producing this format is
+built once per model class from the model's core schema, with custom
+serializers where the format differs from pydantic's JSON mode. Values of
+untyped fields (``Any``, ``dict``, ``list``) have no schema to compile, so they
+are converted by ``_json_safe`` in Python, which produces the same format.
+
+Functions:
+    compiled_serializer: Returns the compiled serializer of a model class.
+    dump_json_safe: Serializes a model instance into JSON-safe values.
+"""
+
+import base64
+import copy
+import uuid
+import weakref
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Set, Type
+
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer, core_schema
+
+_SERIALIZERS: "weakref.WeakKeyDictionary[type, SchemaSerializer]" = weakref.WeakKeyDictionary()
+
+# Serialization config of every model in the schema: keep inf/nan floats and
+# encode bytes as base64 instead of pydantic's defaults.
+_CONFIG = {"ser_json_inf_nan": "constants", "ser_json_bytes": "base64"}
+
+
+def _isoformat(value: datetime) -> str:
+    # pydantic writes UTC as "Z"; stored documents use isoformat's "+00:00".
+    return value.isoformat()
+
+
+def _str(value: Any) -> str:
+    return str(value)
+
+
+def _base64(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+def _json_safe(value: Any, _seen: Optional[Set[int]] = None, _depth: int = 0) -> Any:
+    """Convert an untyped value into JSON-safe values, recursively."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if _seen is None:
+        _seen = set()
+    # Cyclic or pathologically deep structures end as strings.
+    if _depth > 200 or id(value) in _seen:
+        return str(value)
+    _seen.add(id(value))
+    try:
+        if isinstance(value, BaseModel):
+            return _json_safe(value.model_dump(), _seen, _depth + 1)
+        if isinstance(value, dict):
+            return {str(key): _json_safe(item, _seen, _depth + 1) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [_json_safe(item, _seen, _depth + 1) for item in value]
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, (bytes, bytearray)):
+            return _base64(bytes(value))
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, (Decimal, uuid.UUID)):
+            return str(value)
+        return str(value)
+    finally:
+        _seen.discard(id(value))
+
+
+_LEAF_SERIALIZERS = {
+    "datetime": _isoformat,
+    "timedelta": _str,
+    "bytes": _base64,
+    "any": _json_safe,
+}
+
+# Item slots of container schemas that are missing when the container is
+# untyped, with the schema filled in for them.
+_UNTYPED_SLOTS = {
+    "list": {"items_schema": core_schema.any_schema},
+    "set": {"items_schema": core_schema.any_schema},
+    "frozenset": {"items_schema": core_schema.any_schema},
+    "dict": {
+        "keys_schema": lambda: core_schema.str_schema(
+            serialization=core_schema.plain_serializer_function_ser_schema(_str, when_used="json")
+        ),
+        "values_schema": core_schema.any_schema,
+    },
+}
+
+
+class _StandIn(type):
+    """Metaclass of model stand-ins, whose instance checks (e.g. in unions) test the model."""
+
+    def __instancecheck__(cls, instance: Any) -> bool:
+        return isinstance(instance, cls.model)
+
+
+def _fallback(value: Any) -> Any:
+    """Serialize values of types pydantic does not know, e.g. ObjectId."""
+    return str(value)
+
+
+def _rewrite(node: Any) -> None:
+    """Install the custom serializers in a copied core schema, in place."""
+    if isinstance(node, list):
+        for item in node:
+            _rewrite(item)
+        return
+    if not isinstance(node, dict):
+        return
+    schema_type = node.get("type")
+    for slot, schema in _UNTYPED_SLOTS.get(schema_type, {}).items():
+        node.setdefault(slot, schema())
+    if schema_type == "model":
+        node["config"] = {**node.get("config", {}), **_CONFIG}
+        # pydantic-core reuses the prebuilt serializer of a complete model class
+        # instead of compiling the schema; a stand-in class prevents that.
+        node["cls"] = _StandIn(node["cls"].__name__, (), {"model": node["cls"]})
+    if schema_type in _LEAF_SERIALIZERS and "serialization" not in node:
+        node["serialization"] = core_schema.plain_serializer_function_ser_schema(
+            _LEAF_SERIALIZERS[schema_type], when_used="json"
+        )
+    for key, value in node.items():
+        if key not in ("serialization", "metadata", "config"):
+            _rewrite(value)
+
+
+def compiled_serializer(model: Type[BaseModel]) -> SchemaSerializer:
+    """
+    Get the JSON-safe serializer of a model class, compiling it on first use.
+
+    Args:
+        model (Type[BaseModel]): The model class.
+
+    Returns:
+        SchemaSerializer: The serializer; use it with ``mode="json"``.
+    """
+    serializer = _SERIALIZERS.get(model)
+    if serializer is None:
+        schema = copy.deepcopy(model.__pydantic_core_schema__)
+        _rewrite(schema)
+        serializer = SchemaSerializer(schema, core_schema.CoreConfig(**_CONFIG))
+        _SERIALIZERS[model] = serializer
+    return serializer
+
+
+def dump_json_safe(instance: BaseModel, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Serialize a model instance into JSON-safe values.
+
+    Args:
+        instance (BaseModel): The model instance.
+        **kwargs: Options of ``SchemaSerializer.to_python`` such as ``include``,
+            ``exclude``, ``by_alias`` or ``exclude_none``.
+
+    Returns:
+        Dict[str, Any]: The serialized fields.
+    """
+    return compiled_serializer(type(instance)).to_python(instance, mode="json", fallback=_fallback, **kwargs)
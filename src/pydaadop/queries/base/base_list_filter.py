@@ -8,6 +8,9 @@ class BaseListFilter:
     """
     BaseListFilter class for filtering lists of items by a specific key.
 
+    ``_id`` values can stay strings: the repositories convert them to the ids
+    the model stores, see :mod:`pydaadop.models.base.id_storage`.
+
     Attributes:
         value (Optional[List[str]]): The list of values to filter by.
         key (str): The key to filter by (default is "_id").
@@ -17,11 +17,13 @@ from typing import (
 from bson import ObjectId
 import re
 from fastapi import Query
-from pydantic import create_model, BaseModel
+from pydantic import create_model, BaseModel, field_validator
 
 from .base_range import BaseRange
 from .base_search import BaseSearch
 from .base_select import BaseSelect
+from .base_suggest import BaseSuggest
+from .model_metadata import get_model_metadata
 from ...models.base import BaseMongoModel
 from ...models.display.display_query_info import (
     DisplayFilterInfo,
@@ -30,7 +32,7 @@ from ...models.display.display_query_info import (
     DisplaySortAttributeInfo,
     DisplayQueryInfo,
 )
-from ...queries.base.base_sort import BaseSort
+from ...queries.base.base_sort import BaseSort, parse_sort
 
 
 class BaseQuery:
@@ -50,6 +52,19 @@ class BaseQuery:
     # boolean fields are exposed as filters.
     supported_selectable_types = [bool, str]
 
+    @classmethod
+    def _type_hints(cls, model: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Get the resolved type hints of a model from the metadata registry.
+
+        Args:
+            model (Type[BaseModel]): The model to get the type hints of.
+
+        Returns:
+            Dict[str, Any]: The type hints by field name.
+        """
+        return get_model_metadata(model).hints
+
     @classmethod
     def _get_type(cls, annotation: Any) -> Tuple[type | None, bool]:
         """
@@ -168,7 +183,7 @@ class BaseQuery:
         field_overrides = {}
 
         # Collect fields and their annotations, skipping custom classes
-        model_fields = get_type_hints(model)
+        model_fields = cls._type_hints(model)
         for name, annotation in model_fields.items():
             # Only add fields that are basic types
             field_type, selectable = cls._get_type(annotation)
@@ -262,7 +277,7 @@ class BaseQuery:
 
         for key, value in filter_data.items():
             for i, model in enumerate(models):
-                if key in get_type_hints(model):
+                if key in cls._type_hints(model):
                     split_filter_data[i][key] = value
                     break
 
@@ -273,7 +288,8 @@ class BaseQuery:
         cls, models: list[Type[BaseModel]], sort_model: BaseSort
     ) -> List[BaseSort | None]:
         """
-        Split the sort model into the different models based on the sort_by field.
+        Split the sort model into the different models based on the sort fields.
+        Each key of a compound sort goes to the first model that has the field.
 
         Args:
             models ([Type[BaseModel]]): The list of models to split the sort model for.
@@ -282,26 +298,32 @@ class BaseQuery:
         Returns:
             List[BaseSort | None]: The list of split sort models.
         """
-        # check if the sort model has a sort_by field
-        if not sort_model.sort_by:
+        spec = sort_model.sort_spec()
+        if not spec:
             return [None for _ in range(len(models))]
 
-        # the sort by field is in one of the models
-        sort_by = sort_model.sort_by
-
-        # find the first model that has the sort_by field
-        for i, model in enumerate(models):
-            if sort_by in get_type_hints(model):
-                return [
-                    BaseSort(sort_by=sort_by, sort_order=sort_model.sort_order)
-                    if j == i
-                    else None
-                    for j in range(len(models))
-                ]
+        # assign every sort key to the first model that has the field
+        keys_by_model: List[List[Tuple[str, int]]] = [[] for _ in range(len(models))]
+        for field, direction in spec:
+            for i, model in enumerate(models):
+                if field in cls._type_hints(model) or (field == "_id" and "id" in cls._type_hints(model)):
+                    keys_by_model[i].append((field, direction))
+                    break
 
-        # If the sort_by field does not exist on any of the provided models,
-        # return a list of Nones to indicate no cross-model sort can be applied.
-        return [None for _ in range(len(models))]
+        # If a sort field does not exist on any of the provided models it is
+        # skipped; models without sort keys get None.
+        result: List[BaseSort | None] = []
+        for keys in keys_by_model:
+            if not keys:
+                result.append(None)
+            elif len(keys) == 1 and not sort_model.sort:
+                field, direction = keys[0]
+                result.append(BaseSort(sort_by=field, sort_order="asc" if direction == 1 else "desc"))
+            else:
+                result.append(
+                    BaseSort(sort=",".join(("-" if d == -1 else "") + f for f, d in keys))
+                )
+        return result
 
     @classmethod
     def extract_filter(cls, filter_model: BaseModel, exclude=True) -> dict:
@@ -315,98 +337,36 @@ class BaseQuery:
         Returns:
             dict: The extracted filter data.
         """
-        # Dump the provided pydantic filter model to a dict. We then post-process
-        # certain scalar types so that the resulting dict is a MongoDB-friendly
-        # query. In particular:
+        # Dump the provided pydantic filter model to a dict and post-process
+        # certain scalar types so that the result is a MongoDB-friendly query:
         # - string fields (plain str annotation, not Literal/Enum) become
         #   case-insensitive contains queries using $regex
         # - boolean fields are left as booleans (client-side may provide True/False)
-        filter_data = filter_model.model_dump(
-            exclude_none=exclude, exclude_unset=exclude, exclude_defaults=exclude
-        )
-
-        # Remap public "id" to MongoDB "_id"
-        if "id" in filter_data:
-            filter_data["_id"] = filter_data.pop("id")
-
-        # Get the annotations from the dynamic filter model class so we can
-        # reason about the declared type for each field.
-        try:
-            model_hints = get_type_hints(filter_model.__class__)
-        except Exception:
-            model_hints = {}
-
-        # Post-process fields
-        for key, val in list(filter_data.items()):
-            # Skip empty / unset values
-            if val is None:
-                continue
+        # The per-field handling is compiled once per filter model class.
+        from .query_plan import FilterPlan  # local import to avoid cycle
 
-            annotation = model_hints.get(key)
-            if not annotation:
-                continue
-
-            field_type, _ = cls._get_type(annotation)
-            allowed_values = cls._get_allowed_values(annotation)
-
-            # Strings: support both "is in" and "contains" semantics.
-            # Priority:
-            # 1) If client provided a list/tuple -> treat as $in.
-            # 2) If client provided a comma-separated string -> split and use $in.
-            # 3) Otherwise (single string) -> case-insensitive contains ($regex).
-            if field_type is str:
-                # If value is a list/tuple, treat as $in
-                if isinstance(val, (list, tuple)):
-                    # convert elements to strings and remove empties
-                    vals = [str(v).strip() for v in val if str(v).strip() != ""]
-                    if vals:
-                        filter_data[key] = {"$in": vals}
-                    else:
-                        filter_data.pop(key, None)
-                elif isinstance(val, str):
-                    # If there are enumerated allowed values (Literal/Enum) we
-                    # prefer exact matching / $in on comma lists, otherwise
-                    # fall back to contains.
-                    s = val.strip()
-                    if s == "":
-                        filter_data.pop(key, None)
-                    elif "," in s:
-                        parts = [p.strip() for p in s.split(",") if p.strip()]
-                        if parts:
-                            filter_data[key] = {"$in": parts}
-                        else:
-                            filter_data.pop(key, None)
-                    elif not allowed_values:
-                        # Default single-string behavior: contains (case-insensitive)
-                        # Escape the user input so it's treated as a literal
-                        # substring match and cannot inject regex metacharacters.
-                        filter_data[key] = {"$regex": re.escape(s), "$options": "i"}
-                    else:
-                        # allowed_values present (Literal/Enum) -> exact match
-                        filter_data[key] = s
-
-            # Booleans: accept True/False as-is; if a client somehow provided
-            # the string "any", treat it as no-op (remove filter)
-            elif field_type is bool:
-                if isinstance(val, str):
-                    if val.lower() == "any":
-                        filter_data.pop(key, None)
-                    elif val.lower() in ("true", "false"):
-                        filter_data[key] = val.lower() == "true"
-
-        return filter_data
+        return FilterPlan.for_model(type(filter_model)).apply(filter_model, exclude)
 
     @classmethod
-    def extract_range(cls, range_model: BaseRange) -> dict:
+    def extract_range(cls, range_model: BaseRange, model: Optional[Type[BaseModel]] = None) -> dict:
         """
         Extract the range data from the range model.
 
         Args:
             range_model (BaseRange): The range model to extract the data from.
+            model (Optional[Type[BaseModel]], optional): The model the range refers to.
+                With a model the bounds are coerced to the field types and the
+                ``ranges`` clauses apply, see ``QueryPlan.range``. Without one
+                only digit strings become integers.
 
         Returns:
             dict: The extracted range data.
         """
+        if model is not None:
+            from .query_plan import QueryPlan  # local import to avoid cycle
+
+            return QueryPlan.for_model(model).range(range_model)
+
         if not range_model.range_by or not (
             range_model.gte_value or range_model.lte_value
         ):
@@ -451,6 +411,8 @@ class BaseQuery:
         # sort_by_literal = Literal[*filterable_fields_names]
         sort_by_literal = Literal.__getitem__(tuple(filterable_fields_names))
 
+        sortable_fields = set(filterable_fields_names) | {"id"}
+
         # now we create a sort model for the model
         class CustomSort(BaseSort):
             # Dynamically define the sort_by field based on filterable_fields
@@ -458,6 +420,15 @@ class BaseQuery:
                 default=None, description="Field to sort by"
             )
 
+            @field_validator("sort")
+            @classmethod
+            def _validate_sort(cls, value: Optional[str]) -> Optional[str]:
+                # Every key of a compound sort must be one of the sort_by values
+                for field, _ in parse_sort(value):
+                    if field not in sortable_fields:
+                        raise ValueError(f"cannot sort by {field!r}")
+                return value
+
         return create_model(
             f"{model_name}Sort",  # Set the name dynamically
             __base__=CustomSort,  # Inherit from BaseRange
@@ -514,9 +485,7 @@ class BaseQuery:
         # get all the fields of the models and create a boolean field for each field
         selectable_fields = {}
         for model in models:
-            model_fields = get_type_hints(model)
-            for name, annotation in model_fields.items():
-                field_type, _ = cls._get_type(annotation)
+            for name in cls._type_hints(model):
                 selectable_fields[name] = name
 
         if not selectable_fields:
@@ -536,6 +505,32 @@ class BaseQuery:
             __base__=CustomSelect,  # Inherit from BaseRange
         )
 
+    @classmethod
+    def create_suggest(cls, model: Type[BaseModel]) -> Type[BaseSuggest]:
+        """
+        Create a suggest model for the given model.
+
+        Args:
+            model (Type[BaseModel]): The model to create the suggest model for.
+
+        Returns:
+            Type[BaseSuggest]: The created suggest model, whose field is one of
+                the model's ``suggest_fields()``.
+        """
+        fields = list(getattr(model, "suggest_fields", lambda: [])() or [])
+        if not fields:
+            return BaseSuggest
+
+        field_literal = Literal.__getitem__(tuple(fields))
+
+        class CustomSuggest(BaseSuggest):
+            field: field_literal = Query(default=fields[0], description="Field to complete")
+
+        return create_model(
+            f"{model.__name__}Suggest",  # Set the name dynamically
+            __base__=CustomSuggest,
+        )
+
     @classmethod
     def extract_search(cls, model: Type[BaseModel], search_model: BaseSearch) -> Dict:
         """
@@ -548,39 +543,10 @@ class BaseQuery:
         Returns:
             Dict: The extracted search query.
         """
-        if not search_model.search:
-            return {}
-
-        # Build list of fields we can search
-        filter_model = cls.create_filter([model], only_selectable=False)
-        searchable_fields = cls.extract_filter(filter_model(), exclude=False)
-        searchable_field_names = [str(key) for key in searchable_fields.keys()]
-
-        if not searchable_field_names:
-            return {}
-
-        # Split the search string into tokens. Treat commas or whitespace as
-        # separators so queries like "walter white" or "walter, white" become
-        # two tokens that must both match (AND), but may match different fields (OR).
-        raw = search_model.search
-        tokens = [t.strip() for t in re.split(r"[\s,]+", raw) if t.strip()]
-        if not tokens:
-            return {}
+        # The searchable fields are resolved once per model.
+        from .query_plan import QueryPlan  # local import to avoid cycle
 
-        # For each token produce an OR across all searchable fields; then
-        # require all tokens to match by combining with AND.
-        clauses = []
-        for tok in tokens:
-            esc = re.escape(tok)
-            or_clause = [
-                {field: {"$regex": esc, "$options": "i"}}
-                for field in searchable_field_names
-            ]
-            clauses.append({"$or": or_clause})
-
-        if len(clauses) == 1:
-            return clauses[0]
-        return {"$and": clauses}
+        return QueryPlan.for_model(model).search(search_model)
 
     @classmethod
     def create_display_filter_info(cls, model: Type[BaseModel]) -> DisplayFilterInfo:
@@ -11,8 +11,11 @@ class BaseRange(BaseModel):
         range_by (Optional[str]): Field to range by.
         gte_value (Optional[str]): Minimum value.
         lte_value (Optional[str]): Maximum value.
+        ranges (Optional[str]): Additional ranges as comma separated
+            ``field:min..max`` clauses; either bound may be left out.
     """
     range_by: Optional[str] = Query(default=None, min_length=1, max_length=100, description="Field to range by")
     gte_value: Optional[str] = Query(default=None, min_length=1, max_length=100, description="Minimum value")
     lte_value: Optional[str] = Query(default=None, min_length=1, max_length=100, description="Maximum value")
+    ranges: Optional[str] = Query(default=None, min_length=1, max_length=1000, description="Additional ranges as field:min..max, comma separated")
 
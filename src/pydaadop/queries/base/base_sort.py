@@ -1,7 +1,39 @@
-from typing import Optional, Literal
+from typing import List, Optional, Literal, Tuple
 
 from fastapi import Query
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+def parse_sort(value: Optional[str]) -> List[Tuple[str, int]]:
+    """
+    Parse a compound sort string into (field, direction) pairs.
+
+    Args:
+        value (Optional[str]): Comma separated fields, each optionally prefixed
+            with '-' for descending or '+' for ascending, e.g. ``"status,-created"``.
+
+    Returns:
+        List[Tuple[str, int]]: The sort keys; ``id`` is mapped to ``_id``.
+
+    Raises:
+        ValueError: If a field is empty or repeated.
+    """
+    spec: List[Tuple[str, int]] = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        direction = -1 if part.startswith("-") else 1
+        field = part.lstrip("+-").strip()
+        if not field:
+            raise ValueError(f"invalid sort key {part!r}")
+        if field == "id":
+            field = "_id"
+        if any(existing == field for existing, _ in spec):
+            raise ValueError(f"sort key {field!r} is repeated")
+        spec.append((field, direction))
+    return spec
+
 
 class BaseSort(BaseModel):
     """
@@ -10,7 +42,28 @@ class BaseSort(BaseModel):
     Attributes:
         sort_by (Optional[str]): Field to sort by.
         sort_order (Literal["asc", "desc"]): Sort order: 'asc' for ascending, 'desc' for descending.
+        sort (Optional[str]): Compound sort, e.g. 'status,-created'; takes precedence over sort_by.
     """
     sort_by: Optional[str] = Query(default=None, min_length=1, max_length=100, description="Field to sort by")
     sort_order: Literal["asc", "desc"] = Query(default="asc", description="Sort order: 'asc' for ascending, 'desc' for descending")
+    sort: Optional[str] = Query(default=None, max_length=500, description="Compound sort: comma separated fields, '-' prefix for descending, e.g. 'status,-created'")
+
+    @field_validator("sort")
+    @classmethod
+    def _check_sort(cls, value: Optional[str]) -> Optional[str]:
+        # Reject empty and repeated keys when the query is parsed, not when it is used
+        parse_sort(value)
+        return value
+
+    def sort_spec(self) -> List[Tuple[str, int]]:
+        """
+        Get the requested sort keys.
 
+        Returns:
+            List[Tuple[str, int]]: The (field, direction) pairs, empty if unsorted.
+        """
+        if self.sort:
+            return parse_sort(self.sort)
+        if self.sort_by and self.sort_order:
+            return [("_id" if self.sort_by == "id" else self.sort_by, 1 if self.sort_order == "asc" else -1)]
+        return []
@@ -0,0 +1,57 @@
+"""
+This module provides the BaseSuggest query model for typeahead suggestions,
+together with the prefix filter answering it from an index.
+
+Suggestions match values starting with the typed prefix, ignoring case. The
+filter is a range on the field compared under ``SUGGEST_COLLATION``, which the
+case-insensitive index declared for ``BaseMongoModel.suggest_fields()`` serves
+directly; an anchored case-insensitive regex could not use it.
+
+Classes:
+    BaseSuggest: The query parameters of the suggest endpoint.
+
+Functions:
+    prefix_filter: Builds the index range filter of a prefix.
+
+Attributes:
+    SUGGEST_COLLATION (Dict[str, Any]): The case-insensitive collation of suggest indexes and queries.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import Query
+from pydantic import BaseModel
+
+SUGGEST_COLLATION: Dict[str, Any] = {"locale": "en", "strength": 2}
+
+# U+FFFF has the highest primary weight of the root collation, so every value
+# starting with the prefix sorts below prefix + U+FFFF.
+_UPPER_BOUND = "\uffff"
+
+
+class BaseSuggest(BaseModel):
+    """
+    BaseSuggest class for typeahead suggestions.
+
+    Attributes:
+        field (Optional[str]): Field to complete.
+        prefix (str): The typed prefix.
+        limit (int): Maximum number of suggestions.
+    """
+    field: Optional[str] = Query(default=None, description="Field to complete")
+    prefix: str = Query(..., min_length=1, max_length=100, description="Typed prefix")
+    limit: int = Query(default=10, ge=1, le=50, description="Maximum number of suggestions")
+
+
+def prefix_filter(field: str, prefix: str) -> Dict[str, Any]:
+    """
+    Build the filter matching the values of a field that start with a prefix.
+
+    Args:
+        field (str): The field.
+        prefix (str): The prefix.
+
+    Returns:
+        Dict[str, Any]: The range filter; run it with ``SUGGEST_COLLATION``.
+    """
+    return {field: {"$gte": prefix, "$lt": prefix + _UPPER_BOUND}}
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import Query
+from pydantic import BaseModel
+
+class BaseWhere(BaseModel):
+    """
+    BaseWhere class for filter expressions.
+
+    Attributes:
+        where (Optional[str]): Filter expression, e.g. ``price >= 10 and status in ("new", "open")``.
+    """
+    where: Optional[str] = Query(
+        None,
+        max_length=2000,
+        description=(
+            "Filter expression: comparisons (=, !=, <, <=, >, >=), "
+            "'in (...)', 'not in (...)', 'exists', 'not exists', 'startswith', "
+            "combined with 'and', 'or' and parentheses"
+        ),
+    )
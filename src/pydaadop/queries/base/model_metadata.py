@@ -0,0 +1,161 @@
+"""
+This module provides the per-model metadata registry shared by BaseQuery, the
+MCP router and the display-info endpoints, so model reflection runs once per
+model instead of on every request.
+
+Classes:
+    FieldMetadata: The resolved metadata of one model field.
+    ModelMetadata: The resolved metadata of one model.
+
+Functions:
+    get_model_metadata: Returns the metadata of a model, computing it on first use.
+    clear_model_metadata: Drops all computed metadata.
+"""
+
+from __future__ import annotations
+
+import weakref
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Type, get_type_hints
+
+from pydantic import BaseModel
+
+from ...models.display.display_query_info import DisplayQueryInfo
+
+
+@dataclass(frozen=True)
+class FieldMetadata:
+    """
+    The resolved metadata of one model field.
+
+    Attributes:
+        name (str): The field name.
+        annotation (Any): The type annotation.
+        type (Optional[type]): The scalar type used for queries, or None if unsupported.
+        selectable (bool): Whether the field has a fixed set of values (Literal/Enum).
+        allowed_values (Optional[List[Any]]): The allowed values, if any.
+        required (bool): Whether the field is required.
+        description (Optional[str]): The field description.
+    """
+
+    name: str
+    annotation: Any
+    type: Optional[type]
+    selectable: bool
+    allowed_values: Optional[List[Any]]
+    required: bool
+    description: Optional[str]
+
+
+class ModelMetadata:
+    """
+    The resolved metadata of one model.
+
+    The type hints are resolved when the metadata is created; everything derived
+    from them is computed on first access and kept for the life of the process.
+
+    Attributes:
+        model (Type[BaseModel]): The model.
+        hints (Dict[str, Any]): The resolved type hints of the model.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        """
+        Initialize the ModelMetadata.
+
+        Args:
+            model (Type[BaseModel]): The model.
+        """
+        self.model = model
+        self.hints: Dict[str, Any] = get_type_hints(model)
+
+    @property
+    def name(self) -> str:
+        """The model (collection) name."""
+        return self.model.__name__
+
+    @cached_property
+    def fields(self) -> Dict[str, FieldMetadata]:
+        """The metadata of every annotated field, by name."""
+        from .base_query import BaseQuery  # local import to avoid cycle
+
+        fields: Dict[str, FieldMetadata] = {}
+        model_fields = getattr(self.model, "model_fields", {})
+        for name, annotation in self.hints.items():
+            field_type, selectable = BaseQuery._get_type(annotation)
+            pydantic_field = model_fields.get(name)
+            fields[name] = FieldMetadata(
+                name=name,
+                annotation=annotation,
+                type=field_type,
+                selectable=selectable,
+                allowed_values=BaseQuery._get_allowed_values(annotation),
+                required=pydantic_field is not None and pydantic_field.is_required(),
+                description=pydantic_field.description if pydantic_field else None,
+            )
+        return fields
+
+    @cached_property
+    def filter_fields(self) -> List[str]:
+        """The fields exposed as filters."""
+        from .base_query import BaseQuery  # local import to avoid cycle
+
+        return list(BaseQuery.get_fields_of_model(self.model, only_selectable=True).keys())
+
+    @cached_property
+    def sort_fields(self) -> List[str]:
+        """The fields the model can be sorted by."""
+        from .base_query import BaseQuery  # local import to avoid cycle
+
+        return list(BaseQuery.get_fields_of_model(self.model, only_selectable=False).keys())
+
+    @cached_property
+    def index_fields(self) -> List[str]:
+        """The key (index) fields of the model."""
+        create_index = getattr(self.model, "create_index", None)
+        return create_index() if create_index else []
+
+    @cached_property
+    def _display_query_info(self) -> DisplayQueryInfo:
+        from .base_query import BaseQuery  # local import to avoid cycle
+
+        return DisplayQueryInfo(
+            filter_info=BaseQuery.create_display_filter_info(self.model),
+            sort_info=BaseQuery.create_display_sort_info(self.model),
+        )
+
+    @property
+    def display_query_info(self) -> DisplayQueryInfo:
+        """The filter and sort display info; a copy callers may modify."""
+        return self._display_query_info.model_copy(deep=True)
+
+    @cached_property
+    def display_query_info_json(self) -> bytes:
+        """The display query info serialized to JSON."""
+        return self._display_query_info.model_dump_json().encode("utf-8")
+
+
+_METADATA: "weakref.WeakKeyDictionary[type, ModelMetadata]" = weakref.WeakKeyDictionary()
+
+
+def get_model_metadata(model: Type[BaseModel]) -> ModelMetadata:
+    """
+    Return the metadata of *model*, computing it on first use.
+
+    Args:
+        model (Type[BaseModel]): The model.
+
+    Returns:
+        ModelMetadata: The metadata.
+    """
+    metadata = _METADATA.get(model)
+    if metadata is None:
+        metadata = ModelMetadata(model)
+        _METADATA[model] = metadata
+    return metadata
+
+
+def clear_model_metadata() -> None:
+    """Drop all computed metadata, e.g. after changing a model at runtime."""
+    _METADATA.clear()
@@ -0,0 +1,395 @@
+"""
+This module provides compiled query plans, which translate request query models
+into MongoDB filters without per-request type reflection.
+
+Classes:
+    FilterPlan: Translates instances of one filter model into a MongoDB filter.
+    QueryPlan: Translates the filter, search, range and where queries of one model.
+"""
+
+from __future__ import annotations
+
+import re
+import weakref
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, get_type_hints
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from ...models.base.bson_storage import storage_value, uses_native_storage
+from .base_query import BaseQuery
+from .base_range import BaseRange
+from .base_search import BaseSearch
+from .base_where import BaseWhere
+from .trigram_index import trigram_fields, trigram_filter
+from .where_expression import WhereCompiler, WhereSyntaxError, merge_filters
+
+# Post-processes one filter value in place: (filter_data, key, value).
+FieldHandler = Callable[[Dict[str, Any], str, Any], None]
+
+
+def _split_values(data: Dict[str, Any], key: str, values: List[str]) -> None:
+    if values:
+        data[key] = {"$in": values}
+    else:
+        data.pop(key, None)
+
+
+def _contains_handler(data: Dict[str, Any], key: str, val: Any) -> None:
+    """Plain strings: lists and comma lists become $in, single values a contains match."""
+    if isinstance(val, (list, tuple)):
+        _split_values(data, key, [str(v).strip() for v in val if str(v).strip() != ""])
+    elif isinstance(val, str):
+        s = val.strip()
+        if s == "":
+            data.pop(key, None)
+        elif "," in s:
+            _split_values(data, key, [p.strip() for p in s.split(",") if p.strip()])
+        else:
+            # Escape the user input so it cannot inject regex metacharacters.
+            data[key] = {"$regex": re.escape(s), "$options": "i"}
+
+
+def _exact_handler(data: Dict[str, Any], key: str, val: Any) -> None:
+    """Literal/Enum strings: lists and comma lists become $in, single values match exactly."""
+    if isinstance(val, (list, tuple)):
+        _split_values(data, key, [str(v).strip() for v in val if str(v).strip() != ""])
+    elif isinstance(val, str):
+        s = val.strip()
+        if s == "":
+            data.pop(key, None)
+        elif "," in s:
+            _split_values(data, key, [p.strip() for p in s.split(",") if p.strip()])
+        else:
+            data[key] = s
+
+
+def _bool_handler(data: Dict[str, Any], key: str, val: Any) -> None:
+    """Booleans: "any" removes the filter, "true"/"false" strings become booleans."""
+    if isinstance(val, str):
+        if val.lower() == "any":
+            data.pop(key, None)
+        elif val.lower() in ("true", "false"):
+            data[key] = val.lower() == "true"
+
+
+def _range_clauses(range_query: BaseRange, max_clauses: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Collect the (field, min, max) clauses of a range query."""
+    clauses: List[Tuple[str, Optional[str], Optional[str]]] = []
+    if range_query.range_by:
+        clauses.append((range_query.range_by, range_query.gte_value, range_query.lte_value))
+    for clause in (range_query.ranges or "").split(","):
+        if not clause.strip():
+            continue
+        name, colon, bounds = clause.partition(":")
+        gte, dots, lte = bounds.partition("..")
+        if not colon or not dots or not name.strip():
+            raise WhereSyntaxError(f"expected field:min..max, got {clause.strip()!r}")
+        clauses.append((name.strip(), gte.strip() or None, lte.strip() or None))
+    if len(clauses) > max_clauses:
+        raise WhereSyntaxError(f"more than {max_clauses} ranges")
+    return clauses
+
+
+_ORDER_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def _check_orderable(model: Type[BaseModel], field: str, value: Any) -> None:
+    """Reject order comparisons that the stored representation cannot answer."""
+    # JSON storage keeps Decimals as strings, which compare lexicographically ("10" < "9").
+    if isinstance(value, Decimal) and not uses_native_storage(model):
+        raise WhereSyntaxError(f"cannot compare Decimal field {field!r} by order without native_storage()")
+
+
+def _stored_operands(model: Type[BaseModel], node: Any, field: str = "") -> Any:
+    """Encode the values of a compiled filter the way the model stores them."""
+    if isinstance(node, dict):
+        stored = {}
+        for key, value in node.items():
+            if key in _ORDER_OPERATORS:
+                _check_orderable(model, field, value)
+            stored[key] = _stored_operands(model, value, field if key.startswith("$") else key)
+        return stored
+    if isinstance(node, list):
+        return [_stored_operands(model, value, field) for value in node]
+    return storage_value(model, node)
+
+
+class FilterPlan:
+    """
+    Translates instances of one filter model into a MongoDB filter.
+
+    The field handlers are chosen once from the model's annotations, so
+    :meth:`apply` only dumps the instance and runs the handlers of the fields
+    that were set. Plans are cached per filter model class.
+
+    Attributes:
+        filter_model (Type[BaseModel]): The filter model the plan was compiled for.
+        handlers (Dict[str, FieldHandler]): The post-processing handler by field.
+    """
+
+    _plans: "weakref.WeakKeyDictionary[type, FilterPlan]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, filter_model: Type[BaseModel]):
+        """
+        Compile the FilterPlan.
+
+        Args:
+            filter_model (Type[BaseModel]): The filter model to compile the plan for.
+        """
+        self.filter_model = filter_model
+        self.handlers: Dict[str, FieldHandler] = {}
+
+        try:
+            model_hints = get_type_hints(filter_model)
+        except Exception:
+            model_hints = {}
+
+        for key, annotation in model_hints.items():
+            if not annotation or key not in filter_model.model_fields:
+                continue
+            field_type, _ = BaseQuery._get_type(annotation)
+            if field_type is str:
+                allowed_values = BaseQuery._get_allowed_values(annotation)
+                self.handlers[key] = _exact_handler if allowed_values else _contains_handler
+            elif field_type is bool:
+                self.handlers[key] = _bool_handler
+
+    @classmethod
+    def for_model(cls, filter_model: Type[BaseModel]) -> "FilterPlan":
+        """
+        Return the cached plan of a filter model, compiling it on first use.
+
+        Args:
+            filter_model (Type[BaseModel]): The filter model class.
+
+        Returns:
+            FilterPlan: The plan.
+        """
+        plan = cls._plans.get(filter_model)
+        if plan is None:
+            plan = cls(filter_model)
+            cls._plans[filter_model] = plan
+        return plan
+
+    def apply(self, filter_query: BaseModel, exclude: bool = True) -> Dict[str, Any]:
+        """
+        Translate a filter model instance into a MongoDB filter.
+
+        Args:
+            filter_query (BaseModel): The filter model instance.
+            exclude (bool): Whether to exclude None, unset, and default values.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+        """
+        filter_data = filter_query.model_dump(
+            exclude_none=exclude, exclude_unset=exclude, exclude_defaults=exclude
+        )
+
+        # Remap public "id" to MongoDB "_id"
+        if "id" in filter_data:
+            filter_data["_id"] = filter_data.pop("id")
+
+        for key, val in list(filter_data.items()):
+            if val is None:
+                continue
+            handler = self.handlers.get(key)
+            if handler is not None:
+                handler(filter_data, key, val)
+
+        return filter_data
+
+
+class QueryPlan:
+    """
+    Translates the filter, search, range and where queries of one model into
+    MongoDB filters. Build it once when the routes are set up.
+
+    Attributes:
+        model (Type[BaseModel]): The model the plan was compiled for.
+        filter_plan (FilterPlan): The plan of the model's filter model.
+        search_fields (List[str]): The fields a search string is matched against.
+        text_search (bool): Whether searches use the model's text index, see
+            ``BaseMongoModel.search_weights()``.
+        trigram_fields (List[str]): Fields whose contains filters are pre-filtered
+            by the trigram index, see ``BaseMongoModel.trigram_fields()``.
+        where_compiler (WhereCompiler): Compiles ``where`` expressions.
+        max_range_clauses (int): Maximum number of range clauses in one query.
+
+    Example:
+        ```python
+        plan = QueryPlan.for_model(Product, filter_model)
+        filter_dict = plan.filter(filter_query)
+        ```
+    """
+
+    max_range_clauses = 10
+
+    _plans: "weakref.WeakKeyDictionary[type, QueryPlan]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, model: Type[BaseModel], filter_model: Optional[Type[BaseModel]] = None):
+        """
+        Compile the QueryPlan.
+
+        Args:
+            model (Type[BaseModel]): The model.
+            filter_model (Optional[Type[BaseModel]], optional): The filter model of
+                the routes. Defaults to the model's selectable filter model.
+        """
+        self.model = model
+        if filter_model is None:
+            filter_model = BaseQuery.create_filter([model], only_selectable=True)
+        self.filter_plan = FilterPlan.for_model(filter_model)
+
+        search_model = BaseQuery.create_filter([model], only_selectable=False)
+        self.search_fields = [name for name in search_model.model_fields if name != "id"]
+        if "id" in search_model.model_fields:
+            self.search_fields.append("_id")
+        self.text_search = bool(getattr(model, "search_weights", lambda: {})())
+        self.trigram_fields = trigram_fields(model)
+
+        self.where_compiler = WhereCompiler(model)
+
+    @classmethod
+    def for_model(cls, model: Type[BaseModel], filter_model: Optional[Type[BaseModel]] = None) -> "QueryPlan":
+        """
+        Return the cached plan of a model, compiling it on first use.
+
+        Args:
+            model (Type[BaseModel]): The model.
+            filter_model (Optional[Type[BaseModel]], optional): The filter model of
+                the routes; a plan cached for another filter model is recompiled.
+
+        Returns:
+            QueryPlan: The plan.
+        """
+        plan = cls._plans.get(model)
+        if plan is None or (filter_model is not None and plan.filter_plan.filter_model is not filter_model):
+            plan = cls(model, filter_model)
+            cls._plans[model] = plan
+        return plan
+
+    def filter(self, filter_query: BaseModel) -> Dict[str, Any]:
+        """
+        Translate a filter query into a MongoDB filter.
+
+        Contains filters on trigram fields get an indexed ``$all`` over the
+        trigrams of the text next to the regex, which rechecks the candidates.
+
+        Args:
+            filter_query (BaseModel): The filter model instance.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+        """
+        if type(filter_query) is self.filter_plan.filter_model:
+            data = self.filter_plan.apply(filter_query)
+        else:
+            data = FilterPlan.for_model(type(filter_query)).apply(filter_query)
+        for field in self.trigram_fields:
+            condition = data.get(field)
+            if isinstance(condition, dict) and "$regex" in condition:
+                data.update(trigram_filter(field, getattr(filter_query, field).strip()) or {})
+        return data
+
+    def search(self, search_query: BaseSearch) -> Dict[str, Any]:
+        """
+        Translate a search query into a MongoDB filter.
+
+        Models with a text index get a ``$text`` search for the whitespace or
+        comma separated tokens, matching documents containing any of them
+        (stemmed, case-insensitively); the repositories rank the results by
+        relevance. Otherwise every token has to match (AND) at least one of the
+        search fields (OR) as a case-insensitive substring.
+
+        Args:
+            search_query (BaseSearch): The search query.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+        """
+        if not search_query.search or not (self.search_fields or self.text_search):
+            return {}
+
+        tokens = [t.strip() for t in re.split(r"[\s,]+", search_query.search) if t.strip()]
+        if self.text_search:
+            # Quotes and leading dashes would turn tokens into phrases and negations.
+            terms = [term for term in (t.replace('"', "").lstrip("-") for t in tokens) if term]
+            return {"$text": {"$search": " ".join(terms)}} if terms else {}
+        if not tokens:
+            return {}
+
+        clauses = []
+        for tok in tokens:
+            esc = re.escape(tok)
+            clauses.append(
+                {"$or": [{field: {"$regex": esc, "$options": "i"}} for field in self.search_fields]}
+            )
+
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
+
+    def range(self, range_query: BaseRange) -> Dict[str, Any]:
+        """
+        Translate a range query into a MongoDB filter.
+
+        The bounds are coerced to the declared type of their field (int, float,
+        Decimal, datetime, date, ...) and encoded the way the field is stored,
+        so they can use the field's index. Numbers compare by value. In the
+        default JSON storage, dates and datetimes compare as ISO strings, which
+        orders values stored with the same UTC offset correctly, and Decimal
+        fields are stored as strings, so their ranges need ``native_storage()``.
+
+        The ``range_by`` clause and every ``ranges`` clause are combined with
+        AND, which lets a composite range use a compound index.
+
+        Args:
+            range_query (BaseRange): The range query.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+
+        Raises:
+            HTTPException: 400 if a clause, field or bound is invalid, or a
+                Decimal field is not stored natively.
+        """
+        try:
+            clauses = _range_clauses(range_query, self.max_range_clauses)
+            result: Dict[str, Any] = {}
+            for name, gte, lte in clauses:
+                bounds: Dict[str, Any] = {}
+                for operator, text in (("$gte", gte), ("$lte", lte)):
+                    if text:
+                        field, value = self.where_compiler.coerce(name, text)
+                        _check_orderable(self.model, field, value)
+                        bounds[operator] = storage_value(self.model, value)
+                if bounds:
+                    result = merge_filters(result, {field: bounds})
+            return result
+        except WhereSyntaxError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid range: {e}")
+
+    def where(self, where_query: BaseWhere) -> Dict[str, Any]:
+        """
+        Translate a where expression into a MongoDB filter.
+
+        The operands are coerced to the declared type of their field and
+        encoded the way the field is stored, like range bounds, with the same
+        restriction for order comparisons on Decimal fields.
+
+        Args:
+            where_query (BaseWhere): The where query.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+
+        Raises:
+            HTTPException: 400 if the expression is invalid.
+        """
+        try:
+            return _stored_operands(self.model, self.where_compiler.compile(where_query.where))
+        except WhereSyntaxError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid where expression: {e}")
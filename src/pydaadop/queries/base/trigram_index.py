@@ -0,0 +1,144 @@
+"""
+This module provides the trigram index, which lets substring ("contains")
+filters on marked string fields use an index.
+
+Models mark fields in ``BaseMongoModel.trigram_fields()``. The write
+repositories store the lowercase trigrams of these fields in the ``_trigrams``
+sub document, e.g. ``{"_trigrams": {"name": ["ali", "lic", "ice"]}}``, with a
+multikey index per field. A contains filter is then rewritten into an indexed
+``$all`` over the trigrams of the searched text; the original case-insensitive
+regex stays in the filter and rechecks the small candidate set.
+
+Attributes:
+    TRIGRAM_FIELD (str): The document field holding the trigrams.
+
+Functions:
+    trigram_fields: Returns the trigram fields of a model.
+    trigrams: Splits a text into its lowercase trigrams.
+    trigram_document: Builds the trigrams of a document's marked fields.
+    with_trigrams: Adds the trigrams to a document about to be written.
+    trigram_filter: Builds the indexed pre-filter of a contains filter.
+    backfill_trigrams: Adds the trigrams to documents written before the field was marked.
+"""
+
+from typing import Any, Dict, List, Optional, Type
+
+from pymongo import UpdateOne
+
+TRIGRAM_FIELD = "_trigrams"
+
+
+def trigram_fields(model: Type[Any]) -> List[str]:
+    """
+    Get the trigram fields of a model.
+
+    Args:
+        model (Type[Any]): The model class.
+
+    Returns:
+        List[str]: The fields marked in ``trigram_fields()``.
+    """
+    return list(getattr(model, "trigram_fields", lambda: [])() or [])
+
+
+def trigrams(text: str) -> List[str]:
+    """
+    Split a text into its distinct lowercase trigrams.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: The trigrams in order of first occurrence; empty for texts
+            shorter than three characters.
+    """
+    text = text.lower()
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+
+
+def trigram_document(model: Type[Any], data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Build the trigrams of the marked fields present in a document.
+
+    Args:
+        model (Type[Any]): The model class.
+        data (Dict[str, Any]): The document or ``$set`` data.
+
+    Returns:
+        Dict[str, List[str]]: The trigrams by field; non-string values get none.
+    """
+    return {
+        field: trigrams(data[field]) if isinstance(data[field], str) else []
+        for field in trigram_fields(model)
+        if field in data
+    }
+
+
+def with_trigrams(model: Type[Any], data: Dict[str, Any], partial: bool = False) -> Dict[str, Any]:
+    """
+    Add the trigrams to a document about to be written.
+
+    Args:
+        model (Type[Any]): The model class.
+        data (Dict[str, Any]): The document, or the ``$set`` data of an update.
+        partial (bool): Whether *data* sets only some fields; the trigrams of the
+            other fields are kept by setting dotted paths.
+
+    Returns:
+        Dict[str, Any]: The data with the trigrams, or *data* itself if the model
+            has no trigram fields.
+    """
+    document = trigram_document(model, data)
+    if not document:
+        return data
+    if partial:
+        return {**data, **{f"{TRIGRAM_FIELD}.{field}": grams for field, grams in document.items()}}
+    return {**data, TRIGRAM_FIELD: document}
+
+
+def trigram_filter(field: str, text: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the indexed pre-filter of a contains filter.
+
+    Args:
+        field (str): The marked field.
+        text (str): The searched text.
+
+    Returns:
+        Optional[Dict[str, Any]]: ``{"_trigrams.<field>": {"$all": [...]}}``, or
+            None if the text is too short to have trigrams.
+    """
+    grams = trigrams(text)
+    if not grams:
+        return None
+    return {f"{TRIGRAM_FIELD}.{field}": {"$all": grams}}
+
+
+async def backfill_trigrams(model: Type[Any], collection: Any, batch_size: int = 500) -> int:
+    """
+    Add the trigrams to documents written before their fields were marked.
+
+    Args:
+        model (Type[Any]): The model class.
+        collection (Any): The model's collection.
+        batch_size (int): Updates sent per bulk write.
+
+    Returns:
+        int: The number of updated documents.
+    """
+    fields = trigram_fields(model)
+    if not fields:
+        return 0
+    missing = {"$or": [{f"{TRIGRAM_FIELD}.{field}": {"$exists": False}} for field in fields]}
+    updated = 0
+    batch: List[UpdateOne] = []
+    async for document in collection.find(missing, {field: 1 for field in fields}):
+        grams = {f"{TRIGRAM_FIELD}.{field}": value for field, value in trigram_document(model, document).items()}
+        grams.update({f"{TRIGRAM_FIELD}.{field}": [] for field in fields if field not in document})
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": grams}))
+        if len(batch) >= batch_size:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+    return updated
@@ -0,0 +1,326 @@
+"""
+This module provides the parser for ``where=`` filter expressions, which compiles
+them against a model's metadata into MongoDB filters.
+
+Grammar::
+
+    expression := term ("or" term)*
+    term       := factor ("and" factor)*
+    factor     := "(" expression ")" | condition
+    condition  := field op value
+                | field ["not"] "in" "(" value ("," value)* ")"
+                | field ["not"] "exists"
+                | field "startswith" value
+    op         := "=" | "==" | "!=" | "<" | "<=" | ">" | ">="
+    value      := 'text' | "text" | number | true | false | null | word
+
+Values are coerced to the declared type of the field. Equality, ranges, ``in``
+and ``startswith`` (an anchored, case-sensitive regex) can all use indexes.
+
+Classes:
+    WhereSyntaxError: Raised for invalid expressions.
+    WhereCompiler: Compiles expressions for one model.
+
+Functions:
+    merge_filters: Combines MongoDB filters with AND semantics.
+"""
+
+from __future__ import annotations
+
+import enum
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from .model_metadata import get_model_metadata
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<op><=|>=|!=|==|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[A-Za-z0-9_.:+\-]+)
+    )""",
+    re.VERBOSE,
+)
+
+_OPERATORS = {"=": None, "==": None, "!=": "$ne", "<": "$lt", "<=": "$lte", ">": "$gt", ">=": "$gte"}
+_KEYWORDS = {"and", "or", "not", "in", "exists", "startswith"}
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class WhereSyntaxError(ValueError):
+    """
+    Raised when a ``where`` expression is malformed, references an unknown
+    field or holds a value that does not match the field type.
+    """
+
+
+def merge_filters(*filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combines MongoDB filters so that a document has to match all of them.
+
+    Keys present in more than one filter are moved into ``$and`` instead of
+    overwriting each other.
+
+    Args:
+        *filters (Optional[Dict[str, Any]]): The filters; None entries are skipped.
+
+    Returns:
+        Dict[str, Any]: The combined filter.
+    """
+    result: Dict[str, Any] = {}
+    for query in filters:
+        for key, value in (query or {}).items():
+            if key not in result:
+                result[key] = value
+            elif key == "$and":
+                result["$and"] = list(result["$and"]) + list(value)
+            else:
+                result.setdefault("$and", [])
+                result["$and"] = list(result["$and"]) + [{key: value}]
+    return result
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise WhereSyntaxError(f"unexpected character at position {position}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", text[1:-1])
+        elif kind == "word" and text.lower() in _KEYWORDS:
+            kind, text = "keyword", text.lower()
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, compiler: "WhereCompiler", tokens: List[Tuple[str, str]]):
+        self.compiler = compiler
+        self.tokens = tokens
+        self.position = 0
+        self.conditions = 0
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def take(self, kind: Optional[str] = None, text: Optional[str] = None) -> str:
+        token_kind, token_text = self.peek()
+        if token_kind is None or (kind and token_kind != kind) or (text and token_text != text):
+            expected = text or kind or "a token"
+            found = token_text if token_kind else "end of expression"
+            raise WhereSyntaxError(f"expected {expected}, found {found!r}")
+        self.position += 1
+        return token_text
+
+    def accept(self, kind: str, text: Optional[str] = None) -> bool:
+        token_kind, token_text = self.peek()
+        if token_kind == kind and (text is None or token_text == text):
+            self.position += 1
+            return True
+        return False
+
+    def expression(self, depth: int = 0) -> Dict[str, Any]:
+        if depth > self.compiler.max_depth:
+            raise WhereSyntaxError("expression is nested too deeply")
+        clauses = [self.term(depth)]
+        while self.accept("keyword", "or"):
+            clauses.append(self.term(depth))
+        if len(clauses) == 1:
+            return clauses[0]
+        flattened: List[Dict[str, Any]] = []
+        for clause in clauses:
+            flattened.extend(clause["$or"] if list(clause) == ["$or"] else [clause])
+        return {"$or": flattened}
+
+    def term(self, depth: int) -> Dict[str, Any]:
+        result = self.factor(depth)
+        while self.accept("keyword", "and"):
+            result = self.compiler._and(result, self.factor(depth))
+        return result
+
+    def factor(self, depth: int) -> Dict[str, Any]:
+        if self.accept("punct", "("):
+            result = self.expression(depth + 1)
+            self.take("punct", ")")
+            return result
+        return self.condition()
+
+    def value(self) -> Tuple[str, str]:
+        kind, text = self.peek()
+        if kind not in ("string", "word"):
+            raise WhereSyntaxError(f"expected a value, found {text!r}" if kind else "expected a value")
+        self.position += 1
+        return kind, text
+
+    def condition(self) -> Dict[str, Any]:
+        self.conditions += 1
+        if self.conditions > self.compiler.max_conditions:
+            raise WhereSyntaxError("expression has too many conditions")
+
+        field = self.compiler._field(self.take("word"))
+        kind, text = self.peek()
+
+        if kind == "op":
+            self.position += 1
+            value = self.compiler._coerce(field, *self.value())
+            operator = _OPERATORS[text]
+            return {field: value if operator is None else {operator: value}}
+
+        negate = self.accept("keyword", "not")
+        if self.accept("keyword", "exists"):
+            return {field: {"$exists": not negate}}
+        if self.accept("keyword", "in"):
+            self.take("punct", "(")
+            values = [self.compiler._coerce(field, *self.value())]
+            while self.accept("punct", ","):
+                values.append(self.compiler._coerce(field, *self.value()))
+            self.take("punct", ")")
+            return {field: {"$nin" if negate else "$in": values}}
+        if not negate and self.accept("keyword", "startswith"):
+            _, prefix = self.value()
+            return {field: {"$regex": "^" + re.escape(prefix)}}
+
+        found = text if kind else "end of expression"
+        raise WhereSyntaxError(f"expected an operator after {field!r}, found {found!r}")
+
+
+class WhereCompiler:
+    """
+    Compiles ``where`` expressions into MongoDB filters for one model.
+
+    Attributes:
+        model (Type[BaseModel]): The model the expressions refer to.
+        max_conditions (int): Maximum number of conditions in one expression.
+        max_depth (int): Maximum parenthesis nesting.
+
+    Example:
+        ```python
+        compiler = WhereCompiler(Product)
+        compiler.compile("price >= 10 and price < 20 or name startswith 'Pro'")
+        # {"$or": [{"price": {"$gte": 10.0, "$lt": 20.0}}, {"name": {"$regex": "^Pro"}}]}
+        ```
+    """
+
+    max_conditions = 50
+    max_depth = 10
+
+    def __init__(self, model: Type[BaseModel]):
+        """
+        Initialize the WhereCompiler.
+
+        Args:
+            model (Type[BaseModel]): The model the expressions refer to.
+        """
+        self.model = model
+        metadata = get_model_metadata(model)
+        self._annotations: Dict[str, Any] = {
+            "_id" if name == "id" else name: field.annotation
+            for name, field in metadata.fields.items()
+        }
+        self._adapters: Dict[str, TypeAdapter] = {}
+
+    def compile(self, expression: Optional[str]) -> Dict[str, Any]:
+        """
+        Compile an expression into a MongoDB filter.
+
+        Args:
+            expression (Optional[str]): The expression; empty means no filter.
+
+        Returns:
+            Dict[str, Any]: The MongoDB filter.
+
+        Raises:
+            WhereSyntaxError: If the expression is invalid.
+        """
+        if not expression or not expression.strip():
+            return {}
+        parser = _Parser(self, _tokenize(expression))
+        result = parser.expression()
+        if parser.peek()[0] is not None:
+            raise WhereSyntaxError(f"unexpected {parser.peek()[1]!r}")
+        return result
+
+    def coerce(self, name: str, text: str) -> Tuple[str, Any]:
+        """
+        Coerce a literal to the declared type of a field.
+
+        Args:
+            name (str): The field name; ``id`` refers to ``_id``.
+            text (str): The literal, unquoted.
+
+        Returns:
+            Tuple[str, Any]: The document field and the coerced value.
+
+        Raises:
+            WhereSyntaxError: If the field is unknown or the value invalid.
+        """
+        field = self._field(name)
+        return field, self._coerce(field, "string", text)
+
+    def _field(self, name: str) -> str:
+        field = "_id" if name == "id" else name
+        if field not in self._annotations:
+            raise WhereSyntaxError(f"unknown field {name!r}")
+        return field
+
+    def _adapter(self, field: str) -> TypeAdapter:
+        adapter = self._adapters.get(field)
+        if adapter is None:
+            annotation = self._annotations[field]
+            # Array fields match on their elements.
+            args = [a for a in get_args(annotation) if a is not type(None)]
+            if get_origin(annotation) is not None and len(args) == 1 and get_origin(args[0]) in (list, set, tuple):
+                annotation = args[0]
+            if get_origin(annotation) in (list, set, tuple) and get_args(annotation):
+                annotation = Optional[get_args(annotation)[0]]
+            adapter = TypeAdapter(annotation)
+            self._adapters[field] = adapter
+        return adapter
+
+    def _coerce(self, field: str, kind: str, text: str) -> Any:
+        raw: Any = text
+        if kind == "word" and text.lower() in _LITERALS:
+            raw = _LITERALS[text.lower()]
+            if raw is None:
+                return None
+        try:
+            value = self._adapter(field).validate_python(raw)
+        except ValidationError:
+            if kind == "word" and not isinstance(raw, bool):
+                raise WhereSyntaxError(f"invalid value {text!r} for field {field!r}")
+            try:
+                value = self._adapter(field).validate_python(text)
+            except ValidationError:
+                raise WhereSyntaxError(f"invalid value {text!r} for field {field!r}")
+        if isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, BaseModel):
+            value = value.model_dump()
+        return value
+
+    @staticmethod
+    def _and(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+        """AND two filters, merging operator conditions on the same field into one."""
+        result = dict(left)
+        for key, value in right.items():
+            existing = result.get(key)
+            if (
+                isinstance(existing, dict) and isinstance(value, dict)
+                and all(k.startswith("$") for k in existing) and all(k.startswith("$") for k in value)
+                and not set(existing) & set(value)
+            ):
+                result[key] = {**existing, **value}
+            else:
+                result = merge_filters(result, {key: value})
+        return result
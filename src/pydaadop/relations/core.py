@@ -27,7 +27,8 @@ class Relation:
 def normalize_id(value: Any) -> Any:
     """Normalize an id value to ObjectId when it looks like one, otherwise keep as-is.
 
-    Returns the original value or an ObjectId instance.
+    Returns the original value or an ObjectId instance. Repositories map the
+    result to the ids their model stores, so string-id collections still match.
     """
     if isinstance(value, ObjectId):
         return value
@@ -6,15 +6,29 @@ Classes:
     BaseReadRepository: A repository class for reading MongoDB models.
 """
 
-from typing import Type, TypeVar, List, Optional, Dict, Any
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from typing import Type, TypeVar, List, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Sequence, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from .base_repository import BaseRepository
+from .query_policy import get_query_policy
+from ...cache.document_matcher import UnsupportedQueryError
+from ...cache.query_cache import QueryCache, configure_query_cache, get_query_cache, make_query_key
+from ...cache.replica import get_replica
+from ...cache.single_flight import DEFAULT_SINGLE_FLIGHT, SingleFlight
+from ...diagnostics.query_shapes import DEFAULT_QUERY_SHAPE_RECORDER, QueryShapeRecorder
 from ...models.base import BaseMongoModel
+from ...models.base.bson_storage import from_bson, uses_native_storage
+from ...models.base.id_storage import stored_id, stored_id_filter
 from ...models.display import DisplayItemInfo
 from ...queries.base.base_sort import BaseSort
 from ...queries.base.base_paging import BasePaging
+from ...queries.base.base_suggest import SUGGEST_COLLATION, prefix_filter
+from ...queries.base.trigram_index import TRIGRAM_FIELD, trigram_fields
+from ...queries.base.where_expression import merge_filters
+from ...utils.http import deadline_manager, disconnect_manager
 
 T = TypeVar("T", bound=BaseMongoModel)
 
@@ -25,8 +39,17 @@ class BaseReadRepository(BaseRepository[T]):
 
     Attributes:
         collection (AsyncIOMotorCollection): The MongoDB collection.
+        single_flight (Optional[SingleFlight]): Coalesces identical concurrent reads
+            into one MongoDB operation. Set to None to disable coalescing.
+        shape_recorder (Optional[QueryShapeRecorder]): Records the query shape and
+            MongoDB latency of every read. Set to None to disable recording.
+        suggest_cache_ttl (float): Seconds typeahead suggestions are cached.
     """
 
+    single_flight: Optional[SingleFlight] = DEFAULT_SINGLE_FLIGHT
+    shape_recorder: Optional[QueryShapeRecorder] = DEFAULT_QUERY_SHAPE_RECORDER
+    suggest_cache_ttl: float = 5.0
+
     def __init__(self, model: Type[T], collection: AsyncIOMotorCollection = None):
         """
         Initialize the BaseReadRepository.
@@ -37,6 +60,240 @@ class BaseReadRepository(BaseRepository[T]):
         """
         super().__init__(model, collection)
 
+    async def _read_through(
+        self,
+        operation: str,
+        query: Dict[str, Any],
+        loader: Callable[[], Awaitable[Any]],
+        cache: Optional[QueryCache] = None,
+    ) -> Any:
+        """
+        Run a read operation through the model's in-memory replica, query cache
+        and the single-flight layer, so identical concurrent reads share one
+        MongoDB operation.
+
+        Args:
+            operation (str): The name of the repository operation.
+            query (Dict[str, Any]): The query parts identifying the result.
+            loader (Callable[[], Awaitable[Any]]): Loads the raw result from MongoDB.
+            cache (Optional[QueryCache]): The cache to use instead of the model's query cache.
+
+        Returns:
+            Any: The raw (BSON encodable) result.
+        """
+        loader = self._cancellable(loader)
+        recorder = self.shape_recorder
+        if recorder is not None:
+            shape = recorder.record(self.model.__name__, operation, query)
+            if shape is not None:
+                # Only reads that reach MongoDB are timed.
+                loader = shape.timed(loader)
+
+        replica = get_replica(self.model)
+        if replica is not None and replica.ready:
+            try:
+                return replica.execute(operation, query)
+            except UnsupportedQueryError:
+                pass
+
+        cache = cache if cache is not None else get_query_cache(self.model)
+        single_flight = self.single_flight
+        if cache is None and single_flight is None:
+            return await loader()
+
+        try:
+            key = make_query_key(operation, query)
+        except (TypeError, ValueError):
+            # The query holds values without a canonical JSON form; run it directly.
+            return await loader()
+
+        fetch = loader
+        if cache is not None:
+            version = await cache.version()
+            hit, value = await cache.get(key, version)
+            if hit:
+                return value
+
+            async def fetch() -> Any:
+                result = await loader()
+                await cache.set(key, result, version)
+                return result
+
+        if single_flight is None:
+            return await fetch()
+        return await single_flight.do(self.model.__name__, key, fetch)
+
+    def _cancellable(self, loader: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        """
+        Wrap a loader so a cancelled read (e.g. of a disconnected client) kills
+        its operations on the server.
+
+        Args:
+            loader (Callable[[], Awaitable[Any]]): The MongoDB read.
+
+        Returns:
+            Callable[[], Awaitable[Any]]: The wrapped loader.
+        """
+        async def _load() -> Any:
+            try:
+                return await loader()
+            except asyncio.CancelledError:
+                disconnect_manager.abandon(self.collection)
+                raise
+
+        return _load
+
+    @staticmethod
+    @contextmanager
+    def _closing(cursor: Any) -> Iterator[Any]:
+        """Close a cursor on the server when the read consuming it is cancelled."""
+        try:
+            yield cursor
+        except asyncio.CancelledError:
+            disconnect_manager.abandon(cursor=cursor)
+            raise
+
+    @asynccontextmanager
+    async def _admit(
+        self,
+        filter_query: Optional[Dict[str, Any]],
+        sort_spec: Optional[Sequence[Tuple[str, int]]],
+        limited: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Apply the model's query policy to a read.
+
+        Args:
+            filter_query (Optional[Dict[str, Any]]): The filter.
+            sort_spec (Optional[Sequence[Tuple[str, int]]]): The sort keys.
+            limited (bool): Whether the read returns a limited number of documents.
+
+        Yields:
+            Dict[str, Any]: Options for the read, see :meth:`_apply_options`.
+        """
+        policy = get_query_policy(self.model)
+        if policy is None:
+            yield {}
+            return
+        async with policy.admit(self.model.__name__, self.collection, filter_query, sort_spec, limited) as options:
+            yield options
+
+    @staticmethod
+    def _max_time_ms(options: Dict[str, Any]) -> Optional[int]:
+        """
+        Get the ``maxTimeMS`` of a MongoDB call: the policy limit, shortened to
+        the remaining request deadline.
+
+        Evaluated right before each call, so sequential sub-queries of a request
+        share one shrinking budget.
+
+        Args:
+            options (Dict[str, Any]): The read options.
+
+        Returns:
+            Optional[int]: The time limit in milliseconds, or None for no limit.
+
+        Raises:
+            DeadlineExceeded: If the request deadline has passed.
+        """
+        limit = options.get("max_time_ms") or None
+        remaining = deadline_manager.remaining_ms()
+        if remaining is None:
+            return limit
+        return remaining if limit is None else min(limit, remaining)
+
+    @classmethod
+    def _apply_options(cls, cursor: Any, options: Dict[str, Any]) -> Any:
+        """
+        Apply ``max_time_ms`` and ``allow_disk_use`` read options to a cursor,
+        and tag it with the operation tag of the request.
+
+        Args:
+            cursor (Any): The cursor.
+            options (Dict[str, Any]): The options.
+
+        Returns:
+            Any: The cursor.
+        """
+        max_time_ms = cls._max_time_ms(options)
+        if max_time_ms:
+            cursor = cursor.max_time_ms(max_time_ms)
+        if options.get("allow_disk_use"):
+            cursor = cursor.allow_disk_use(True)
+        tag = disconnect_manager.operation_tag()
+        if tag:
+            cursor = cursor.comment(tag)
+        return cursor
+
+    @classmethod
+    def _count_options(cls, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert read options into ``count_documents`` keyword arguments."""
+        max_time_ms = cls._max_time_ms(options)
+        kwargs: Dict[str, Any] = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+        tag = disconnect_manager.operation_tag()
+        if tag:
+            kwargs["comment"] = tag
+        return kwargs
+
+    def _document_projection(self) -> Optional[Dict[str, Any]]:
+        """Get the projection of whole documents, which leaves out the trigram index."""
+        return {TRIGRAM_FIELD: 0} if trigram_fields(self.model) else None
+
+    def _find_one_options(self) -> Dict[str, Any]:
+        """Get the ``find_one`` keyword arguments for the request deadline and tag."""
+        max_time_ms = self._max_time_ms({})
+        kwargs: Dict[str, Any] = {"max_time_ms": max_time_ms} if max_time_ms else {}
+        projection = self._document_projection()
+        if projection:
+            kwargs["projection"] = projection
+        tag = disconnect_manager.operation_tag()
+        if tag:
+            kwargs["comment"] = tag
+        return kwargs
+
+    @staticmethod
+    def _relevance_sort(filter_query: Optional[Dict[str, Any]], sort_spec: Optional[List]) -> Optional[List]:
+        """
+        Rank the results of a ``$text`` search by relevance unless they are sorted explicitly.
+
+        Args:
+            filter_query (Optional[Dict[str, Any]]): The filter.
+            sort_spec (Optional[List]): The requested sort.
+
+        Returns:
+            Optional[List]: The sort specification.
+        """
+        if sort_spec or not filter_query or "$text" not in filter_query:
+            return sort_spec
+        return [("score", {"$meta": "textScore"}), ("_id", 1)]
+
+    @staticmethod
+    def _sort_spec(sort_query: Optional[BaseSort]) -> Optional[List]:
+        """
+        Convert a sort query into a pymongo sort specification.
+
+        Sorted queries always end with ``_id`` as a tiebreaker, so documents with
+        equal sort keys keep the same order across pages.
+
+        Args:
+            sort_query (Optional[BaseSort]): The sort query.
+
+        Returns:
+            Optional[List]: A list of (field, direction) pairs, or None if unsorted.
+        """
+        if not sort_query:
+            return None
+        spec = sort_query.sort_spec()
+        if not spec:
+            return None
+        if all(field != "_id" for field, _ in spec):
+            spec.append(("_id", 1))
+        return spec
+
+    def _stored_filter(self, filter_query: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Convert the ``_id`` conditions of a filter to the model's stored ids."""
+        return stored_id_filter(self.model, filter_query)
+
     async def exists(self, keys_filter_query: dict) -> bool:
         """
         Check if an item exists based on the filter query.
@@ -48,7 +305,13 @@ class BaseReadRepository(BaseRepository[T]):
             bool: True if the item exists, False otherwise.
         """
         self._ensure_collection()
-        return await self.collection.count_documents(keys_filter_query) > 0
+        keys_filter_query = self._stored_filter(keys_filter_query)
+        count = await self._read_through(
+            "exists",
+            {"filter": keys_filter_query},
+            lambda: self.collection.count_documents(keys_filter_query, **self._count_options({})),
+        )
+        return count > 0
 
     async def get_by_id(self, keys_filter_query: dict) -> Optional[T]:
         """
@@ -61,8 +324,13 @@ class BaseReadRepository(BaseRepository[T]):
             Optional[T]: The retrieved item, or None if not found.
         """
         self._ensure_collection()
-        data = await self.collection.find_one(keys_filter_query)
-        return self.model(**data) if data else None
+        keys_filter_query = self._stored_filter(keys_filter_query)
+        data = await self._read_through(
+            "get_by_id",
+            {"filter": keys_filter_query},
+            lambda: self.collection.find_one(keys_filter_query, **self._find_one_options()),
+        )
+        return self.model.model_validate_storage(data) if data else None
 
     async def get_many_by_ids(
         self, ids: List, projection: Dict[str, Any] = None
@@ -79,19 +347,24 @@ class BaseReadRepository(BaseRepository[T]):
         self._ensure_collection()
         if not ids:
             return []
-        # Normalize ids to ObjectId when possible
-        from ...relations.core import (
-            normalize_id,
-        )  # local import to avoid cycle at module import
-
-        norm_ids = [normalize_id(i) for i in ids]
-        # If projection is None keep signature compatible with collection.find
-        if projection is not None:
-            cursor = self.collection.find({"_id": {"$in": norm_ids}}, projection)
-        else:
-            cursor = self.collection.find({"_id": {"$in": norm_ids}})
-        items = [self.model(**item) async for item in cursor]
-        return items
+        # Convert the ids to the stored ids of the model
+        norm_ids = [stored_id(self.model, i) for i in ids]
+
+        async def _load() -> List[Dict]:
+            # If projection is None keep signature compatible with collection.find
+            fields = projection if projection is not None else self._document_projection()
+            if fields is not None:
+                cursor = self.collection.find({"_id": {"$in": norm_ids}}, fields)
+            else:
+                cursor = self.collection.find({"_id": {"$in": norm_ids}})
+            cursor = self._apply_options(cursor, {})
+            with self._closing(cursor):
+                return [item async for item in cursor]
+
+        documents = await self._read_through(
+            "get_many_by_ids", {"ids": norm_ids, "projection": projection}, _load
+        )
+        return [self.model.model_validate_storage(item) for item in documents]
 
     async def list(
         self,
@@ -112,24 +385,38 @@ class BaseReadRepository(BaseRepository[T]):
         Returns:
             List[T]: The list of items.
         """
-        if filter_query is None:
-            filter_query = {}
-        filter_query.update(search_query or {})
+        filter_query = self._stored_filter(merge_filters(filter_query, search_query))
 
         self._ensure_collection()
-        cursor = (
-            self.collection.find(filter_query)
-            .skip(paging_query.skip())
-            .limit(paging_query.limit())
-        )
-
-        if sort_query and sort_query.sort_by and sort_query.sort_order:
-            sort_order = 1 if sort_query.sort_order == "asc" else -1
-            if sort_query.sort_by:
-                cursor = cursor.sort(sort_query.sort_by, sort_order)
+        sort_spec = self._relevance_sort(filter_query, self._sort_spec(sort_query))
+
+        async with self._admit(filter_query, sort_spec, limited=True) as options:
+
+            async def _load() -> List[Dict]:
+                fields = self._document_projection()
+                cursor = (
+                    (self.collection.find(filter_query, fields) if fields else self.collection.find(filter_query))
+                    .skip(paging_query.skip())
+                    .limit(paging_query.limit())
+                )
+                if sort_spec:
+                    cursor = cursor.sort(sort_spec)
+                cursor = self._apply_options(cursor, options)
+                with self._closing(cursor):
+                    return [item async for item in cursor]
+
+            documents = await self._read_through(
+                "list",
+                {
+                    "filter": filter_query,
+                    "sort": sort_spec,
+                    "skip": paging_query.skip(),
+                    "limit": paging_query.limit(),
+                },
+                _load,
+            )
+        items = [self.model.model_validate_storage(item) for item in documents]
 
-        items = [self.model(**item) async for item in cursor]
-        
         # Normalize any ObjectId elements inside list fields to strings so
         # returned items are consistent for API consumers and tests.
         try:
@@ -174,24 +461,76 @@ class BaseReadRepository(BaseRepository[T]):
         Returns:
             List[Dict]: The list of keys.
         """
-        if filter_query is None:
-            filter_query = {}
-        filter_query.update(search_query or {})
+        filter_query = self._stored_filter(merge_filters(filter_query, search_query))
 
-        # Use self.collection to perform the query, projecting only the _id field
+        # Use self.collection to perform the query, projecting only the requested keys
         self._ensure_collection()
-        cursor = self.collection.find(filter_query, {key: 1 for key in keys})
+        projection = {key: 1 for key in keys}
+        sort_spec = self._relevance_sort(filter_query, self._sort_spec(sort_query))
+
+        async with self._admit(filter_query, sort_spec) as options:
+
+            async def _load() -> List[Dict]:
+                cursor = self.collection.find(filter_query, projection)
+                if sort_spec:
+                    cursor = cursor.sort(sort_spec)
+                cursor = self._apply_options(cursor, options)
+                # Fetch all matching documents, only the projected keys are transferred
+                with self._closing(cursor):
+                    return await cursor.to_list(length=None)
+
+            documents = await self._read_through(
+                "list_keys",
+                {"filter": filter_query, "projection": projection, "sort": sort_spec},
+                _load,
+            )
+        return from_bson(documents) if uses_native_storage(self.model) else documents
+
+    def _suggest_cache(self) -> QueryCache:
+        """Get the short-lived cache of the model's suggestions, configuring it on first use."""
+        name = f"{self.model.__name__}:suggest"
+        cache = get_query_cache(name)
+        if cache is None:
+            cache = configure_query_cache(name, ttl=self.suggest_cache_ttl, max_entries=4096)
+        return cache
+
+    async def suggest(self, field: str, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest values of a field starting with a prefix, ignoring case.
 
-        if sort_query and sort_query.sort_by and sort_query.sort_order:
-            sort_order = 1 if sort_query.sort_order == "asc" else -1
-            if sort_query.sort_by:
-                cursor = cursor.sort(sort_query.sort_by, sort_order)
+        The prefix becomes a range on the field's case-insensitive suggest index,
+        and hot prefixes are answered from a short-lived cache.
 
-        # Fetch the IDs asynchronously, this time we only request the _id field
-        result_keys = await cursor.to_list(length=None)  # Fetch all matching documents
+        Args:
+            field (str): One of the model's ``suggest_fields()``.
+            prefix (str): The typed prefix.
+            limit (int, optional): Maximum number of suggestions. Defaults to 10.
 
-        # Directly extract the ID from the result
-        return result_keys
+        Returns:
+            List[Dict]: The matching documents, projected to ``_id`` and the field,
+                in the field's order.
+        """
+        self._ensure_collection()
+        filter_query = prefix_filter(field, prefix)
+
+        async def _load() -> List[Dict]:
+            cursor = (
+                self.collection.find(filter_query, {field: 1})
+                .collation(SUGGEST_COLLATION)
+                .sort([(field, 1)])
+                .limit(limit)
+            )
+            cursor = self._apply_options(cursor, {})
+            with self._closing(cursor):
+                return [item async for item in cursor]
+
+        return await self._read_through(
+            "suggest",
+            # Prefixes differing in case share one entry, since their results are equal.
+            {"field": field, "prefix": prefix.lower(), "limit": limit},
+            _load,
+            cache=self._suggest_cache(),
+        )
 
     async def info(
         self, filter_query: Dict = None, search_query: Dict = None
@@ -207,10 +546,13 @@ class BaseReadRepository(BaseRepository[T]):
             DisplayItemInfo: The item information.
         """
         # get the count of the items
-        if filter_query is None:
-            filter_query = {}
-        filter_query.update(search_query or {})
+        filter_query = self._stored_filter(merge_filters(filter_query, search_query))
 
         self._ensure_collection()
-        count = await self.collection.count_documents(filter_query)
+        async with self._admit(filter_query, None) as options:
+            count = await self._read_through(
+                "info",
+                {"filter": filter_query},
+                lambda: self.collection.count_documents(filter_query, **self._count_options(options)),
+            )
         return DisplayItemInfo(items_count=count)
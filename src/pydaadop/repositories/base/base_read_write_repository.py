@@ -11,7 +11,10 @@ from typing import Type, TypeVar, Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from .base_read_repository import BaseReadRepository
+from ...cache.invalidation import invalidate_model_caches
 from ...models.base import BaseMongoModel
+from ...queries.base.trigram_index import with_trigrams
+from ...utils.http import deadline_manager
 
 T = TypeVar("T", bound=BaseMongoModel)
 
@@ -19,6 +22,10 @@ class BaseReadWriteRepository(BaseReadRepository[T]):
     """
     A repository class for reading and writing MongoDB models.
 
+    Writes are not sent with ``maxTimeMS``, since an interrupted write may have
+    been partly applied; instead no write starts once the request deadline has
+    passed.
+
     Attributes:
         collection (AsyncIOMotorCollection): The MongoDB collection.
     """
@@ -33,6 +40,16 @@ class BaseReadWriteRepository(BaseReadRepository[T]):
         """
         super().__init__(model, collection)
 
+    async def _invalidate_cache(self) -> None:
+        """
+        Invalidate cached query results and the in-memory replica of the model
+        after a write, and stop sharing reads that started before it.
+
+        Called even when the write fails, since a failed bulk operation may
+        still have modified part of the collection.
+        """
+        await invalidate_model_caches(self.model, single_flight=self.single_flight)
+
     async def create(self, item: T) -> T:
         """
         Create an item.
@@ -44,7 +61,11 @@ class BaseReadWriteRepository(BaseReadRepository[T]):
             T: The created item.
         """
         self._ensure_collection()
-        result = await self.collection.insert_one(item.model_dump())
+        deadline_manager.check()
+        try:
+            result = await self.collection.insert_one(with_trigrams(self.model, item.model_dump_storage()))
+        finally:
+            await self._invalidate_cache()
         item.id = str(result.inserted_id)  # Ensure the model has an 'id' field
         return item
 
@@ -60,7 +81,13 @@ class BaseReadWriteRepository(BaseReadRepository[T]):
             Optional[T]: The updated item, or None if not found.
         """
         self._ensure_collection()
-        await self.collection.update_one(keys_filter_query, {"$set": item_data.model_dump(ignore_id=True)})
+        deadline_manager.check()
+        keys_filter_query = self._stored_filter(keys_filter_query)
+        try:
+            document = with_trigrams(self.model, item_data.model_dump_storage(ignore_id=True))
+            await self.collection.update_one(keys_filter_query, {"$set": document})
+        finally:
+            await self._invalidate_cache()
         return await self.get_by_id(keys_filter_query)
 
     async def delete(self, keys_filter_query: dict) -> None:
@@ -71,4 +98,9 @@ class BaseReadWriteRepository(BaseReadRepository[T]):
             keys_filter_query (dict): The key filter query.
         """
         self._ensure_collection()
-        await self.collection.delete_one(keys_filter_query)
+        deadline_manager.check()
+        keys_filter_query = self._stored_filter(keys_filter_query)
+        try:
+            await self.collection.delete_one(keys_filter_query)
+        finally:
+            await self._invalidate_cache()
@@ -0,0 +1,357 @@
+"""
+This module provides per-model query policies, which keep queries that no index
+can serve away from large collections.
+
+A policy decides for each read whether it is index-backed, either from the
+collection's indexes or from a cached ``explain``. On collections with at least
+``large_collection`` documents, collection scans and in-memory sorts are
+rejected with a 400 or throttled with a 429. Unindexed reads that are let
+through run with ``max_time_ms`` and, if enabled, ``allowDiskUse``.
+
+Classes:
+    QueryAssessment: Whether a read scans the collection or sorts in memory.
+    QueryPolicy: The guardrail of one model.
+
+Functions:
+    configure_query_policy: Configures the policy of a model.
+    get_query_policy: Returns the policy of a model.
+    clear_query_policies: Removes all policies.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pymongo.errors import ExecutionTimeout
+
+from ...database.no_sql.index_sync import list_collection_indexes
+from ...diagnostics.index_advisor import summarize_plan
+from ...diagnostics.query_shapes import normalize_filter
+from ...models.base.index_definition import IndexDefinition
+
+logger = logging.getLogger(__name__)
+
+# Operators an index cannot use to narrow the scanned range.
+_UNSELECTIVE = {"$ne", "$nin", "$not", "$exists"}
+_EQUALITY = {"$eq", "$in"}
+
+
+@dataclass
+class QueryAssessment:
+    """
+    Whether a read scans the collection or sorts in memory.
+
+    Attributes:
+        collection_scan (bool): No index narrows the documents read.
+        blocking_sort (bool): No index provides the sort order.
+    """
+
+    collection_scan: bool = False
+    blocking_sort: bool = False
+
+    @property
+    def index_backed(self) -> bool:
+        """bool: Whether the read is served by indexes."""
+        return not (self.collection_scan or self.blocking_sort)
+
+
+def _filter_backed(shape: Dict[str, Any], first_keys: set) -> bool:
+    for key, operators in shape.items():
+        if key == "$text":
+            # $text always runs on the text index; MongoDB rejects it without one.
+            return True
+        if key == "$or" or key == "$nor":
+            if key == "$or" and operators and all(_filter_backed(branch, first_keys) for branch in operators):
+                return True
+        elif key == "$and":
+            if any(_filter_backed(branch, first_keys) for branch in operators):
+                return True
+        elif not key.startswith("$") and key in first_keys and not set(operators.split(",")) <= _UNSELECTIVE:
+            return True
+    return False
+
+
+def _sort_backed(index: List[Tuple[str, Any]], equality: set, sort: Sequence[Tuple[str, int]]) -> bool:
+    keys = [(name, direction) for name, direction in index if isinstance(direction, (int, float))]
+    # Leading fields matched by equality do not change the order of the rest.
+    while keys and keys[0][0] in equality and all(name != keys[0][0] for name, _ in sort):
+        keys.pop(0)
+    keys = keys[:len(sort)]
+    if [name for name, _ in keys] != [name for name, _ in sort]:
+        return False
+    same = all(direction == wanted for (_, direction), (_, wanted) in zip(keys, sort))
+    inverted = all(direction == -wanted for (_, direction), (_, wanted) in zip(keys, sort))
+    return same or inverted
+
+
+def assess_with_indexes(
+    indexes: Sequence[List[Tuple[str, Any]]],
+    filter_query: Optional[Dict[str, Any]],
+    sort: Optional[Sequence[Tuple[str, int]]],
+    limited: bool = False,
+) -> QueryAssessment:
+    """
+    Decide from index key patterns whether a read is index-backed.
+
+    Args:
+        indexes (Sequence[List[Tuple[str, Any]]]): The key patterns of the collection's indexes.
+        filter_query (Optional[Dict[str, Any]]): The filter.
+        sort (Optional[Sequence[Tuple[str, int]]]): The sort keys.
+        limited (bool): Whether the read returns a limited number of documents;
+            an unfiltered, unsorted limited read stops early and is not a scan.
+
+    Returns:
+        QueryAssessment: The assessment.
+    """
+    shape = normalize_filter(filter_query)
+    sort = list(sort or [])
+    if any(isinstance(direction, dict) for _, direction in sort):
+        # Relevance ($meta) sorts rank the matches of a $text search, never the collection.
+        sort = []
+    if not shape and not sort and limited:
+        return QueryAssessment()
+
+    first_keys = {"_id"} | {keys[0][0] for keys in indexes if keys}
+    equality = {key for key, operators in shape.items() if not key.startswith("$") and set(operators.split(",")) <= _EQUALITY}
+    sorted_by_index = bool(sort) and any(_sort_backed(list(keys), equality, sort) for keys in indexes)
+    return QueryAssessment(
+        collection_scan=not _filter_backed(shape, first_keys) and not sorted_by_index,
+        blocking_sort=bool(sort) and not sorted_by_index,
+    )
+
+
+class QueryPolicy:
+    """
+    The guardrail against unindexed reads of one model.
+
+    Attributes:
+        large_collection (int): Collections with at least this many documents are guarded.
+        on_unindexed (str): ``"reject"`` answers 400, ``"throttle"`` lets
+            ``max_concurrent_unindexed`` reads run at once and answers 429 beyond that,
+            ``"allow"`` only applies the options below.
+        max_concurrent_unindexed (int): Concurrent unindexed reads allowed when throttling.
+        max_time_ms (Optional[int]): ``maxTimeMS`` for unindexed reads that are let through.
+        allow_disk_use (bool): Let unindexed sorts spill to disk instead of failing.
+        use_explain (bool): Assess reads with a cached ``explain`` instead of the index list.
+        indexes (Optional[List[IndexDefinition]]): Known indexes; read from the server if None.
+        cache_ttl (float): Seconds the document count, index list and explain results are cached.
+        max_explained (int): Maximum number of query shapes whose explain result is
+            cached; the least recently used shape is dropped beyond that, since
+            clients choose the shapes (e.g. with ``where`` expressions).
+
+    Example:
+        ```python
+        configure_query_policy(Order, large_collection=50_000, on_unindexed="throttle", max_time_ms=2000)
+        ```
+    """
+
+    def __init__(
+        self,
+        large_collection: int = 100_000,
+        on_unindexed: str = "reject",
+        max_concurrent_unindexed: int = 2,
+        max_time_ms: Optional[int] = 5000,
+        allow_disk_use: bool = False,
+        use_explain: bool = False,
+        indexes: Optional[List[IndexDefinition]] = None,
+        cache_ttl: float = 60.0,
+        max_explained: int = 1000,
+    ):
+        """
+        Initialize the QueryPolicy.
+
+        Args:
+            large_collection (int): Collections with at least this many documents are guarded.
+            on_unindexed (str): ``"reject"``, ``"throttle"`` or ``"allow"``.
+            max_concurrent_unindexed (int): Concurrent unindexed reads allowed when throttling.
+            max_time_ms (Optional[int]): ``maxTimeMS`` for unindexed reads that are let through.
+            allow_disk_use (bool): Let unindexed sorts spill to disk.
+            use_explain (bool): Assess reads with a cached ``explain``.
+            indexes (Optional[List[IndexDefinition]]): Known indexes; read from the server if None.
+            cache_ttl (float): Seconds the document count, index list and explain results are cached.
+            max_explained (int): Maximum number of cached explain results.
+
+        Raises:
+            ValueError: If ``on_unindexed`` is unknown.
+        """
+        if on_unindexed not in ("reject", "throttle", "allow"):
+            raise ValueError(f"unknown on_unindexed action {on_unindexed!r}")
+        self.large_collection = large_collection
+        self.on_unindexed = on_unindexed
+        self.max_concurrent_unindexed = max_concurrent_unindexed
+        self.max_time_ms = max_time_ms
+        self.allow_disk_use = allow_disk_use
+        self.use_explain = use_explain
+        self.indexes = indexes
+        self.cache_ttl = cache_ttl
+        self.max_explained = max_explained
+        self._unindexed_running = 0
+        self._count: Tuple[float, int] = (0.0, 0)
+        self._index_keys: Tuple[float, List[List[Tuple[str, Any]]]] = (0.0, [])
+        # Explain results by query shape, least recently used first: (expires, assessment).
+        self._explained: "OrderedDict[str, Tuple[float, QueryAssessment]]" = OrderedDict()
+
+    async def _document_count(self, collection: Any) -> int:
+        expires, count = self._count
+        if time.monotonic() >= expires:
+            count = await collection.estimated_document_count()
+            self._count = (time.monotonic() + self.cache_ttl, count)
+        return count
+
+    async def _known_indexes(self, collection: Any) -> List[List[Tuple[str, Any]]]:
+        if self.indexes is not None:
+            return [definition.server_keys() for definition in self.indexes]
+        expires, keys = self._index_keys
+        if time.monotonic() >= expires:
+            keys = [list(index.get("key", {}).items()) for index in await list_collection_indexes(collection)]
+            self._index_keys = (time.monotonic() + self.cache_ttl, keys)
+        return keys
+
+    async def assess(
+        self,
+        collection: Any,
+        filter_query: Optional[Dict[str, Any]],
+        sort: Optional[Sequence[Tuple[str, int]]],
+        limited: bool = False,
+    ) -> QueryAssessment:
+        """
+        Decide whether a read is index-backed.
+
+        Args:
+            collection (Any): The collection.
+            filter_query (Optional[Dict[str, Any]]): The filter.
+            sort (Optional[Sequence[Tuple[str, int]]]): The sort keys.
+            limited (bool): Whether the read returns a limited number of documents.
+
+        Returns:
+            QueryAssessment: The assessment.
+        """
+        if not self.use_explain:
+            return assess_with_indexes(await self._known_indexes(collection), filter_query, sort, limited)
+
+        key = json.dumps([normalize_filter(filter_query), list(sort or []), limited], sort_keys=True)
+        cached = self._explained.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            self._explained.move_to_end(key)
+            return cached[1]
+        cursor = collection.find(filter_query or {})
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limited:
+            cursor = cursor.limit(1)
+        plan = summarize_plan(await cursor.explain())
+        assessment = QueryAssessment(plan.collection_scan, plan.blocking_sort)
+        self._explained[key] = (time.monotonic() + self.cache_ttl, assessment)
+        self._explained.move_to_end(key)
+        while len(self._explained) > self.max_explained:
+            self._explained.popitem(last=False)
+        return assessment
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        name: str,
+        collection: Any,
+        filter_query: Optional[Dict[str, Any]],
+        sort: Optional[Sequence[Tuple[str, int]]],
+        limited: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Admit a read, rejecting or throttling it if it is unindexed on a large collection.
+
+        Args:
+            name (str): The model name used in error messages.
+            collection (Any): The collection.
+            filter_query (Optional[Dict[str, Any]]): The filter.
+            sort (Optional[Sequence[Tuple[str, int]]]): The sort keys.
+            limited (bool): Whether the read returns a limited number of documents.
+
+        Yields:
+            Dict[str, Any]: Options for the read: ``max_time_ms`` and ``allow_disk_use``.
+
+        Raises:
+            HTTPException: 400 if rejected, 429 if throttled, 504 if ``max_time_ms`` ran out.
+        """
+        assessment = await self.assess(collection, filter_query, sort, limited)
+        if assessment.index_backed:
+            yield {}
+            return
+
+        large = await self._document_count(collection) >= self.large_collection
+        problem = " and ".join(
+            ([f"scans all documents (filter fields {sorted(normalize_filter(filter_query))})"] if assessment.collection_scan else [])
+            + ([f"sorts in memory by {[key for key, _ in sort]}"] if assessment.blocking_sort else [])
+        )
+        if large and self.on_unindexed == "reject":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Query on {name} {problem} and is not allowed on large collections; filter or sort by indexed fields",
+            )
+        throttled = large and self.on_unindexed == "throttle"
+        if throttled:
+            if self._unindexed_running >= self.max_concurrent_unindexed:
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Too many unindexed queries on {name} are running; retry later",
+                    headers={"Retry-After": "1"},
+                )
+            self._unindexed_running += 1
+        if large:
+            logger.info("Running unindexed query on %s: %s", name, problem)
+
+        options: Dict[str, Any] = {}
+        if self.max_time_ms:
+            options["max_time_ms"] = self.max_time_ms
+        if self.allow_disk_use and assessment.blocking_sort:
+            options["allow_disk_use"] = True
+        try:
+            yield options
+        except ExecutionTimeout:
+            raise HTTPException(status_code=504, detail=f"Query on {name} exceeded {self.max_time_ms} ms")
+        finally:
+            if throttled:
+                self._unindexed_running -= 1
+
+
+_POLICY_REGISTRY: Dict[str, QueryPolicy] = {}
+
+
+def configure_query_policy(model: Type[Any], **options: Any) -> QueryPolicy:
+    """
+    Configure the query policy of a model, guarding the reads of all its repositories.
+
+    Args:
+        model (Type[Any]): The model.
+        **options (Any): The :class:`QueryPolicy` arguments.
+
+    Returns:
+        QueryPolicy: The policy.
+    """
+    policy = QueryPolicy(**options)
+    _POLICY_REGISTRY[model.__name__] = policy
+    return policy
+
+
+def get_query_policy(model: Type[Any]) -> Optional[QueryPolicy]:
+    """
+    Get the query policy of a model.
+
+    Args:
+        model (Type[Any]): The model.
+
+    Returns:
+        Optional[QueryPolicy]: The policy, or None if reads are not guarded.
+    """
+    return _POLICY_REGISTRY.get(model.__name__)
+
+
+def clear_query_policies() -> None:
+    """Remove all query policies."""
+    _POLICY_REGISTRY.clear()
@@ -14,6 +14,9 @@ from pymongo.results import InsertManyResult, DeleteResult, BulkWriteResult
 
 from ..base.base_read_write_repository import BaseReadWriteRepository
 from ...models.base import BaseMongoModel
+from ...models.base.bson_storage import storage_fields
+from ...queries.base.trigram_index import with_trigrams
+from ...utils.http import deadline_manager
 
 T = TypeVar("T", bound=BaseMongoModel)
 
@@ -46,8 +49,12 @@ class ManyReadWriteRepository(BaseReadWriteRepository[T]):
             InsertManyResult: The result of the insert operation.
         """
         self._ensure_collection()
-        serialized_items = [item.model_dump(by_alias=True) for item in items]
-        return await self.collection.insert_many(serialized_items, ordered=False)
+        deadline_manager.check()
+        serialized_items = [with_trigrams(self.model, item.model_dump_storage()) for item in items]
+        try:
+            return await self.collection.insert_many(serialized_items, ordered=False)
+        finally:
+            await self._invalidate_cache()
 
     async def update_many(self, items: List[T]) -> BulkWriteResult:
         """
@@ -60,8 +67,14 @@ class ManyReadWriteRepository(BaseReadWriteRepository[T]):
             BulkWriteResult: The result of the update operation.
         """
         self._ensure_collection()
-        bulk_write_operations = [UpdateOne(item.model_dump_keys(), {"$set": item.model_dump()}) for item in items]
-        return await self.collection.bulk_write(bulk_write_operations)
+        deadline_manager.check()
+        bulk_write_operations = [
+            UpdateOne(item.model_dump_keys(storage=True), {"$set": with_trigrams(self.model, item.model_dump_storage())}) for item in items
+        ]
+        try:
+            return await self.collection.bulk_write(bulk_write_operations)
+        finally:
+            await self._invalidate_cache()
 
     async def update_field_many(self, keys_filter_query: List[dict], data: dict) -> BulkWriteResult:
         """
@@ -73,10 +86,20 @@ class ManyReadWriteRepository(BaseReadWriteRepository[T]):
 
         Returns:
             BulkWriteResult: The result of the update operation.
+
+        Raises:
+            ValueError: If a value does not match its field's type (native storage).
         """
         self._ensure_collection()
-        bulk_write_operations = [UpdateOne(key_filter, {"$set": data}) for key_filter in keys_filter_query]
-        return await self.collection.bulk_write(bulk_write_operations)
+        deadline_manager.check()
+        data = with_trigrams(self.model, storage_fields(self.model, data), partial=True)
+        bulk_write_operations = [
+            UpdateOne(self._stored_filter(key_filter), {"$set": data}) for key_filter in keys_filter_query
+        ]
+        try:
+            return await self.collection.bulk_write(bulk_write_operations)
+        finally:
+            await self._invalidate_cache()
 
     async def delete_many(self, keys_filter_query: List[dict]) -> DeleteResult:
         """
@@ -89,4 +112,8 @@ class ManyReadWriteRepository(BaseReadWriteRepository[T]):
             DeleteResult: The result of the delete operation.
         """
         self._ensure_collection()
-        return await self.collection.delete_many({"$or": keys_filter_query})
+        deadline_manager.check()
+        try:
+            return await self.collection.delete_many(self._stored_filter({"$or": keys_filter_query}))
+        finally:
+            await self._invalidate_cache()
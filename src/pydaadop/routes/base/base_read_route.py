@@ -6,14 +6,21 @@ Classes:
     BaseReadRouter: A router class for reading MongoDB models.
 """
 
-from typing import List, Type, TypeVar
-from fastapi import Depends, HTTPException
+import inspect
+from typing import Any, Callable, List, Optional, Type, TypeVar
+from fastapi import Depends, HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from ...models.base import BaseMongoModel
 from ...models.display import DisplayItemInfo, DisplayQueryInfo
 from ...queries.base.base_paging import BasePaging
 from ...queries.base.base_query import BaseQuery
+from ...queries.base.query_plan import FilterPlan, QueryPlan
 from ...queries.base.base_search import BaseSearch
+from ...queries.base.base_where import BaseWhere
+from ...queries.base.where_expression import merge_filters
+from ...queries.base.model_metadata import get_model_metadata
 from ...services.base.base_read_service import BaseReadService
 from ...services.interface.read_service_interface import ReadServiceInterface
 from typing_extensions import override
@@ -23,14 +30,53 @@ from .base_route import BaseRouter
 T = TypeVar("T", bound=BaseMongoModel)  # Generic type for the model class
 
 
+def _validated_query(query_model: Type[BaseModel]) -> Callable[..., BaseModel]:
+    """
+    Wrap a query model into a dependency that reports invalid values as 422.
+
+    FastAPI validates the query parameters of a ``Depends()`` model, but errors
+    of the model's own validators escape as 500. The wrapper keeps the model's
+    signature, so the parameters and the OpenAPI schema stay the same.
+
+    Args:
+        query_model (Type[BaseModel]): The query model.
+
+    Returns:
+        Callable[..., BaseModel]: The dependency.
+    """
+
+    def dependency(**params: Any) -> BaseModel:
+        try:
+            return query_model(**params)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("query", *error["loc"])} for error in e.errors(include_url=False, include_context=False)]
+            )
+
+    dependency.__signature__ = inspect.signature(query_model)
+    return dependency
+
+
 class BaseReadRouter(BaseRouter[T]):
     """
     A router class for reading MongoDB models.
 
     Attributes:
         service (ReadServiceInterface): The service for reading operations.
+        metadata_cache_control (Optional[str]): Cache-Control header for the static
+            ``display-info/query/`` metadata endpoint.
+        read_cache_control (Optional[str]): Cache-Control header for the data read
+            endpoints. Defaults to ``no-cache`` so clients revalidate with their ETag.
+        fast_responses (bool): Serialize the items of the list and item endpoints
+            straight to JSON bytes with the model's pydantic serializer. Without it
+            FastAPI dumps, revalidates and re-serializes every item against the
+            ``response_model``. The OpenAPI schema is the same either way.
     """
 
+    metadata_cache_control: Optional[str] = "public, max-age=300"
+    read_cache_control: Optional[str] = "no-cache"
+    fast_responses: bool = True
+
     def __init__(self, model: Type[T], service: ReadServiceInterface = None):
         """
         Initialize the BaseReadRouter.
@@ -76,6 +122,33 @@ class BaseReadRouter(BaseRouter[T]):
 
         return schema
 
+    @staticmethod
+    def _set_cache_control(response: Response, value: Optional[str]) -> None:
+        """
+        Set the Cache-Control header on a response if a value is configured.
+
+        Args:
+            response (Response): The response whose headers are updated.
+            value (Optional[str]): The Cache-Control directive, or None to omit it.
+        """
+        if value:
+            response.headers["Cache-Control"] = value
+
+    def _json_response(self, adapter: TypeAdapter, content: Any) -> Response:
+        """
+        Serialize validated items directly into a JSON response.
+
+        Args:
+            adapter (TypeAdapter): The adapter of the route's response model.
+            content (Any): The items, already validated by the repository.
+
+        Returns:
+            Response: The JSON response with the read Cache-Control header.
+        """
+        response = Response(content=adapter.dump_json(content, by_alias=True), media_type="application/json")
+        self._set_cache_control(response, self.read_cache_control)
+        return response
+
     @override
     def setup_routes(self):
         """
@@ -88,18 +161,34 @@ class BaseReadRouter(BaseRouter[T]):
         key_filter_model = self.service.create_key_filter()
         range_model = self.service.create_range()
         sort_model = self.service.create_sort()
+        sort_dependency = _validated_query(sort_model)
         select_model = self.service.create_select()
 
+        # Compile the query translation once instead of reflecting per request.
+        query_plan = QueryPlan.for_model(model, filter_model)
+        key_filter_plan = FilterPlan.for_model(key_filter_model)
+        item_adapter = TypeAdapter(model)
+        list_adapter = TypeAdapter(List[model])
+
         @self.router.get(
             f"{self.prefix}/display-info/query/", response_model=DisplayQueryInfo
         )
-        async def get_display_query_info():
+        async def get_display_query_info(response: Response):
             """
             Get display query information.
 
             Returns:
                 DisplayQueryInfo: The display query information.
             """
+            if type(self.service).query_info is BaseReadService.query_info:
+                # Static metadata: send the bytes serialized once per model.
+                body = Response(
+                    content=get_model_metadata(model).display_query_info_json,
+                    media_type="application/json",
+                )
+                self._set_cache_control(body, self.metadata_cache_control)
+                return body
+            self._set_cache_control(response, self.metadata_cache_control)
             display_info = await self.service.query_info(model=model)
             return display_info
 
@@ -107,9 +196,11 @@ class BaseReadRouter(BaseRouter[T]):
             f"{self.prefix}/display-info/item/", response_model=DisplayItemInfo
         )
         async def get_display_item_info(
+            response: Response,
             filter_query: filter_model = Depends(),
             range_query: range_model = Depends(),
             search_query: BaseSearch = Depends(),
+            where_query: BaseWhere = Depends(),
         ):
             """
             Get display item information.
@@ -118,15 +209,17 @@ class BaseReadRouter(BaseRouter[T]):
                 filter_query (filter_model, optional): The filter query. Defaults to Depends().
                 range_query (range_model, optional): The range query. Defaults to Depends().
                 search_query (BaseSearch, optional): The search query. Defaults to Depends().
+                where_query (BaseWhere, optional): The where expression. Defaults to Depends().
 
             Returns:
                 DisplayItemInfo: The display item information.
             """
-            range_dict = BaseQuery.extract_range(range_query)
-            filter_dict = BaseQuery.extract_filter(filter_model=filter_query)
-            search_dict = BaseQuery.extract_search(
-                model=model, search_model=search_query
+            self._set_cache_control(response, self.read_cache_control)
+            range_dict = query_plan.range(range_query)
+            filter_dict = merge_filters(
+                query_plan.filter(filter_query), query_plan.where(where_query)
             )
+            search_dict = query_plan.search(search_query)
             display_info = await self.service.item_info(
                 filter_query=filter_dict,
                 range_query=range_dict,
@@ -136,11 +229,13 @@ class BaseReadRouter(BaseRouter[T]):
 
         @self.router.get(f"{self.prefix}/", response_model=List[model])
         async def get_all(
-            sort_query: sort_model = Depends(),
+            response: Response,
+            sort_query: sort_model = Depends(sort_dependency),
             range_query: range_model = Depends(),
             paging_query: BasePaging = Depends(),
             filter_query: filter_model = Depends(),
             search_query: BaseSearch = Depends(),
+            where_query: BaseWhere = Depends(),
             include: str | None = None,
         ):
             """
@@ -152,13 +247,17 @@ class BaseReadRouter(BaseRouter[T]):
                 paging_query (BasePaging, optional): The paging query. Defaults to Depends().
                 filter_query (filter_model, optional): The filter query. Defaults to Depends().
                 search_query (BaseSearch, optional): The search query. Defaults to Depends().
+                where_query (BaseWhere, optional): The where expression. Defaults to Depends().
 
             Returns:
                 List[model]: The list of items.
             """
-            range_dict = BaseQuery.extract_range(range_query)
-            filter_dict = BaseQuery.extract_filter(filter_query)
-            search_dict = BaseQuery.extract_search(model, search_query)
+            self._set_cache_control(response, self.read_cache_control)
+            range_dict = query_plan.range(range_query)
+            filter_dict = merge_filters(
+                query_plan.filter(filter_query), query_plan.where(where_query)
+            )
+            search_dict = query_plan.search(search_query)
             items = await self.service.list(
                 filter_query=filter_dict,
                 sort_query=sort_query,
@@ -176,16 +275,20 @@ class BaseReadRouter(BaseRouter[T]):
                 except Exception:
                     # Swallow errors to avoid breaking endpoints if repos aren't registered
                     pass
+            elif self.fast_responses and all(type(item) is model for item in items):
+                return self._json_response(list_adapter, items)
 
             return items
 
         @self.router.get(f"{self.prefix}/select/", response_model=List[dict])
         async def get_all_select(
+            response: Response,
             select_query: select_model = Depends(),
             range_query: range_model = Depends(),
-            sort_query: sort_model = Depends(),
+            sort_query: sort_model = Depends(sort_dependency),
             filter_query: filter_model = Depends(),
             search_query: BaseSearch = Depends(),
+            where_query: BaseWhere = Depends(),
         ):
             """
             Get all items with selected fields.
@@ -196,14 +299,18 @@ class BaseReadRouter(BaseRouter[T]):
                 sort_query (sort_model, optional): The sort query. Defaults to Depends().
                 filter_query (filter_model, optional): The filter query. Defaults to Depends().
                 search_query (BaseSearch, optional): The search query. Defaults to Depends().
+                where_query (BaseWhere, optional): The where expression. Defaults to Depends().
 
             Returns:
                 List[dict]: The list of items with selected fields.
             """
+            self._set_cache_control(response, self.read_cache_control)
             keys = [select_query.selected_field]
-            range_dict = BaseQuery.extract_range(range_query)
-            filter_dict = BaseQuery.extract_filter(filter_query)
-            search_dict = BaseQuery.extract_search(model, search_query)
+            range_dict = query_plan.range(range_query)
+            filter_dict = merge_filters(
+                query_plan.filter(filter_query), query_plan.where(where_query)
+            )
+            search_dict = query_plan.search(search_query)
             items = await self.service.list_keys(
                 keys=keys,
                 filter_query=filter_dict,
@@ -218,6 +325,26 @@ class BaseReadRouter(BaseRouter[T]):
 
             return items
 
+        if getattr(model, "suggest_fields", lambda: [])():
+            suggest_model = BaseQuery.create_suggest(model)
+
+            @self.router.get(f"{self.prefix}/suggest/", response_model=List[dict])
+            async def get_suggestions(response: Response, suggest_query: suggest_model = Depends()):
+                """
+                Suggest values starting with a prefix, for typeahead inputs.
+
+                Args:
+                    suggest_query (suggest_model, optional): The suggest query. Defaults to Depends().
+
+                Returns:
+                    List[dict]: The ids and values of the matching items, ordered by value.
+                """
+                self._set_cache_control(response, self.read_cache_control)
+                items = await self.service.suggest(
+                    suggest_query.field, suggest_query.prefix, suggest_query.limit
+                )
+                return [{"id": str(item["_id"]), suggest_query.field: item.get(suggest_query.field)} for item in items]
+
         @self.router.get(f"{self.prefix}/exists/", response_model=bool)
         async def item_exists(key_filter_query: key_filter_model = Depends()):
             """
@@ -229,12 +356,14 @@ class BaseReadRouter(BaseRouter[T]):
             Returns:
                 bool: True if the item exists, False otherwise.
             """
-            key_filter_dict = BaseQuery.extract_filter(key_filter_query)
+            key_filter_dict = key_filter_plan.apply(key_filter_query)
             return await self.service.exists(key_filter_dict)
 
         @self.router.get(f"{self.prefix}/item/", response_model=model)
         async def get_item(
-            key_filter_query: key_filter_model = Depends(), include: str | None = None
+            response: Response,
+            key_filter_query: key_filter_model = Depends(),
+            include: str | None = None,
         ):
             """
             Get an item.
@@ -248,7 +377,8 @@ class BaseReadRouter(BaseRouter[T]):
             Raises:
                 HTTPException: If the item is not found.
             """
-            key_filter_dict = BaseQuery.extract_filter(key_filter_query)
+            self._set_cache_control(response, self.read_cache_control)
+            key_filter_dict = key_filter_plan.apply(key_filter_query)
             item = await self.service.get(key_filter_dict)
             if not item:
                 raise HTTPException(status_code=404, detail="Item not found")
@@ -261,5 +391,7 @@ class BaseReadRouter(BaseRouter[T]):
                     await load_relations([item], include=includes)
                 except Exception:
                     pass
+            elif self.fast_responses and type(item) is model:
+                return self._json_response(item_adapter, item)
 
             return item
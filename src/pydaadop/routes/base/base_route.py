@@ -4,16 +4,33 @@ routes for MongoDB models.
 
 Classes:
     BaseRouter: A base router class for setting up routes for MongoDB models.
+
+Functions:
+    registered_models: The models routers have been created for.
 """
 
 from abc import abstractmethod
-from typing import Type, TypeVar, Generic
+from typing import Dict, List, Optional, Type, TypeVar, Generic
 from fastapi import APIRouter
 
 from ...models.base import BaseMongoModel
+from .conditional_route import ConditionalRoute
 
 T = TypeVar("T", bound=BaseMongoModel)  # Generic type for the model class
 
+# Models served by a router, keyed by collection name, in creation order.
+_registered_models: Dict[str, Type[BaseMongoModel]] = {}
+
+
+def registered_models() -> List[Type[BaseMongoModel]]:
+    """
+    Get the models routers have been created for, e.g. to synchronise their indexes.
+
+    Returns:
+        List[Type[BaseMongoModel]]: The models in the order their first router was created.
+    """
+    return list(_registered_models.values())
+
 class BaseRouter(Generic[T]):
     """
     A base router class for setting up routes for MongoDB models.
@@ -23,8 +40,14 @@ class BaseRouter(Generic[T]):
         router (APIRouter): The FastAPI router.
         model (Type[T]): The MongoDB model type.
         prefix (str): The prefix for the routes.
+        deadline_ms (Optional[float]): Request deadline of the routes in milliseconds;
+            None keeps the ConditionalRoute default.
+        route_deadlines_ms (Dict[str, float]): Deadlines by endpoint name, e.g. ``{"get_all": 2000}``.
     """
 
+    deadline_ms: Optional[float] = None
+    route_deadlines_ms: Dict[str, float] = {}
+
     def __init__(self, model: Type[T]):
         """
         Initialize the BaseRouter.
@@ -33,8 +56,12 @@ class BaseRouter(Generic[T]):
             model (Type[T]): The MongoDB model type.
         """
         self.tags = [model.__name__]
-        self.router = APIRouter(tags=self.tags)
+        # Read responses carry content hash ETags so polling clients can
+        # revalidate with If-None-Match and receive an empty 304.
+        route_class = ConditionalRoute.with_deadlines(self.deadline_ms, self.route_deadlines_ms)
+        self.router = APIRouter(tags=self.tags, route_class=route_class)
         self.model = model
+        _registered_models.setdefault(model.__name__, model)
         # Router paths are written relative to a base prefix derived from the
         # model name (e.g. '/product'). This preserves the historical behavior
         # where routes are reachable under '/<model-name>/' when the router is
@@ -0,0 +1,129 @@
+"""
+This module provides the ConditionalRoute class, a FastAPI route class which adds
+ETag generation and If-None-Match handling to read endpoints, opens the
+request deadline and cancels reads whose client disconnected.
+
+Classes:
+    ConditionalRoute: An APIRoute answering repeated reads with 304 Not Modified.
+"""
+
+import os
+from typing import Callable, Dict, Optional, Type
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pymongo.errors import ExecutionTimeout
+
+from ...diagnostics.slow_queries import current_route
+from ...utils.http import deadline_manager, disconnect_manager, etag_manager
+
+# Only safe methods can be answered from the client's cached representation.
+_CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+class ConditionalRoute(APIRoute):
+    """
+    A route class which tags successful GET responses with a content hash ETag.
+
+    When the request carries an ``If-None-Match`` header that matches the tag of
+    the freshly rendered body, the body is dropped and an empty 304 response is
+    returned instead, so polling clients only pay for the headers.
+
+    Every request runs under a deadline of ``deadline_ms`` (or the entry of
+    ``route_deadlines_ms`` for the endpoint name), which clients can replace with
+    the ``deadline_header`` up to ``max_deadline_ms``. Repositories send the
+    remaining budget to MongoDB as ``maxTimeMS``; running out answers 504.
+
+    Read requests are cancelled when the client disconnects, which kills their
+    MongoDB operations and cursors, see :mod:`pydaadop.utils.http.disconnect_manager`.
+
+    Attributes:
+        deadline_ms (Optional[float]): Default budget in milliseconds, None for no deadline.
+        route_deadlines_ms (Dict[str, float]): Budgets by endpoint name, e.g. ``{"get_all": 2000}``.
+        max_deadline_ms (float): Upper bound for budgets requested by clients.
+        deadline_header (str): Request header carrying a budget in milliseconds.
+        cancel_on_disconnect (bool): Whether read requests are cancelled when the client disconnects.
+
+    Example:
+        ```python
+        router = APIRouter(route_class=ConditionalRoute.with_deadlines(3000, {"get_display_item_info": 1000}))
+        ```
+    """
+
+    deadline_ms: Optional[float] = float(os.getenv("PYDAADOP_DEADLINE_MS", "0")) or None
+    route_deadlines_ms: Dict[str, float] = {}
+    max_deadline_ms: float = 60000
+    deadline_header: str = "X-Request-Timeout-Ms"
+    cancel_on_disconnect: bool = True
+
+    @classmethod
+    def with_deadlines(
+        cls, deadline_ms: Optional[float] = None, route_deadlines_ms: Optional[Dict[str, float]] = None
+    ) -> Type["ConditionalRoute"]:
+        """
+        Create a route class with its own deadline defaults.
+
+        Args:
+            deadline_ms (Optional[float]): Default budget; None keeps the inherited one.
+            route_deadlines_ms (Optional[Dict[str, float]]): Budgets by endpoint name.
+
+        Returns:
+            Type[ConditionalRoute]: The route class.
+        """
+        if deadline_ms is None and not route_deadlines_ms:
+            return cls
+        return type(cls.__name__, (cls,), {
+            "deadline_ms": deadline_ms if deadline_ms is not None else cls.deadline_ms,
+            "route_deadlines_ms": {**cls.route_deadlines_ms, **(route_deadlines_ms or {})},
+        })
+
+    def _budget_ms(self, request: Request) -> Optional[float]:
+        """Return the deadline budget of a request in milliseconds."""
+        requested = deadline_manager.parse_timeout_header(request.headers.get(self.deadline_header))
+        if requested is not None:
+            return min(requested, self.max_deadline_ms)
+        return self.route_deadlines_ms.get(self.name, self.deadline_ms)
+
+    def get_route_handler(self) -> Callable:
+        """
+        Wrap the default route handler with conditional request handling.
+
+        Returns:
+            Callable: The wrapped route handler.
+        """
+        route_handler = super().get_route_handler()
+        route_name = f"{','.join(sorted(self.methods or ()))} {self.path}"
+
+        async def conditional_route_handler(request: Request) -> Response:
+            # Lets the slow query log name the route that issued a command.
+            token = current_route.set(route_name)
+            try:
+                with deadline_manager.deadline(self._budget_ms(request)):
+                    if self.cancel_on_disconnect and request.method in _CONDITIONAL_METHODS:
+                        with disconnect_manager.tagged():
+                            response = await disconnect_manager.run_until_disconnect(request, route_handler(request))
+                    else:
+                        response = await route_handler(request)
+            except ExecutionTimeout:
+                raise deadline_manager.DeadlineExceeded()
+            except disconnect_manager.ClientDisconnected:
+                # Nobody reads the response anymore; 499 is the nginx convention for it.
+                return Response(status_code=499)
+            finally:
+                current_route.reset(token)
+            if request.method not in _CONDITIONAL_METHODS or response.status_code != 200:
+                return response
+
+            # Streaming responses have no rendered body to hash.
+            body = getattr(response, "body", None)
+            if body is None:
+                return response
+
+            etag = response.headers.get("etag") or etag_manager.compute_etag(body)
+            if etag_manager.etag_matches(request.headers.get("if-none-match"), etag):
+                return etag_manager.not_modified_response(response, etag)
+
+            response.headers["ETag"] = etag
+            return response
+
+        return conditional_route_handler
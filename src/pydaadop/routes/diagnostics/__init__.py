@@ -0,0 +1,123 @@
+"""
+Diagnostics routes for Pydaadop.
+
+Exposes the recorded query shapes, the index advice derived from them and the
+slow query log. The responses reveal the structure of client queries, so the
+router is meant to be included behind an authentication dependency or only in
+internal deployments.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Literal, Optional, Type
+
+from fastapi import APIRouter, Query
+
+from ...database.no_sql import BaseMongoDatabase
+from ...diagnostics import (
+    DEFAULT_QUERY_SHAPE_RECORDER,
+    DEFAULT_SLOW_QUERY_MONITOR,
+    IndexAdvisor,
+    QueryShapeRecorder,
+    SlowQueryMonitor,
+)
+from ...models.base import BaseMongoModel
+
+
+class DiagnosticsRouter:
+    """
+    A router exposing query diagnostics.
+
+    Usage::
+
+        app = FastAPI()
+        diagnostics = DiagnosticsRouter()
+        app.include_router(diagnostics.router, dependencies=[Depends(require_admin)])
+
+    The router adds the following endpoints:
+
+    * ``GET /_debug/query-shapes`` – recorded query shapes with counts and latency
+    * ``GET /_debug/index-advice`` – explain results and ESR index suggestions for the top shapes
+    * ``GET /_debug/slow-queries`` – the latest slow commands with captured execution statistics
+
+    Collections are resolved from :meth:`register`, falling back to the models of
+    all routers created so far.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "/_debug",
+        recorder: Optional[QueryShapeRecorder] = None,
+        monitor: Optional[SlowQueryMonitor] = None,
+    ) -> None:
+        self.router = APIRouter(prefix=prefix, tags=["Diagnostics"])
+        self.recorder = recorder if recorder is not None else DEFAULT_QUERY_SHAPE_RECORDER
+        self.monitor = monitor if monitor is not None else DEFAULT_SLOW_QUERY_MONITOR
+        self._collections: Dict[str, Any] = {}
+        self._models: Dict[str, Type[BaseMongoModel]] = {}
+        self.advisor = IndexAdvisor(self._collection_for, self.recorder)
+        self._setup_routes()
+
+    def register(self, model: Type[BaseMongoModel], collection: Any = None) -> None:
+        """Register a model, optionally with the collection to explain its queries against."""
+        self._models[model.__name__] = model
+        if collection is not None:
+            self._collections[model.__name__] = collection
+
+    def _collection_for(self, name: str) -> Any:
+        """Return the collection named *name*, connecting lazily like the repositories."""
+        collection = self._collections.get(name)
+        if collection is None:
+            from ..base.base_route import registered_models  # local import to avoid cycle
+
+            model = self._models.get(name) or next((m for m in registered_models() if m.__name__ == name), None)
+            if model is None:
+                raise KeyError(f"no model registered for collection {name!r}")
+            database = BaseMongoDatabase(model)
+            database._ensure_connection()
+            collection = self._collections[name] = database.collection
+        return collection
+
+    def _setup_routes(self) -> None:
+        router = self.router
+
+        @router.get("/query-shapes", summary="Recorded query shapes")
+        async def get_query_shapes(
+            collection: Optional[str] = Query(None, description="Only shapes of this collection"),
+            order: Literal["count", "total_time", "max_time"] = Query("count", description="Ranking of the shapes"),
+            limit: int = Query(50, ge=1, le=1000),
+        ) -> Dict[str, Any]:
+            """
+            Return the most used or most expensive query shapes.
+
+            Shapes contain field names and operators only, never values.
+            """
+            shapes: List[Dict[str, Any]] = [
+                stats.to_dict() for stats in self.recorder.top(limit, collection=collection, by=order)
+            ]
+            return {"shapes": shapes, "overflow": self.recorder.overflow}
+
+        @router.get("/index-advice", summary="Index suggestions for the top query shapes")
+        async def get_index_advice(
+            collection: Optional[str] = Query(None, description="Only shapes of this collection"),
+            order: Literal["count", "total_time", "max_time"] = Query("total_time", description="Ranking of the shapes"),
+            top: int = Query(10, ge=1, le=100),
+        ) -> Dict[str, Any]:
+            """
+            Explain the top query shapes and suggest ESR ordered compound indexes
+            for collection scans and in-memory sorts.
+            """
+            advice = await self.advisor.advise(top=top, collection=collection, by=order)
+            return {"advice": [item.to_dict() for item in advice]}
+
+        @router.get("/slow-queries", summary="Latest slow MongoDB commands")
+        async def get_slow_queries(
+            collection: Optional[str] = Query(None, description="Only commands on this collection"),
+            limit: int = Query(100, ge=1, le=1000),
+        ) -> Dict[str, Any]:
+            """
+            Return the slow commands in the monitor's ring buffer, newest first,
+            with execution statistics for the sampled ones.
+            """
+            entries = [entry for entry in self.monitor.entries() if collection is None or entry.collection == collection]
+            return {"threshold_ms": self.monitor.threshold_ms, "queries": [entry.to_dict() for entry in entries[:limit]]}
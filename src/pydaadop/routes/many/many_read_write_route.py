@@ -103,9 +103,15 @@ class ManyReadWriteRouter(BaseReadWriteRouter[T]):
 
             Returns:
                 dict: A success message.
+
+            Raises:
+                HTTPException: 400 if a value does not match its field's type.
             """
             key_filter_dicts = [BaseQuery.extract_filter(query) for query in key_filter_queries]
-            await self.service.update_field_many(key_filter_dicts, data)
+            try:
+                await self.service.update_field_many(key_filter_dicts, data)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             return {"detail": "Item updated successfully"}
 
         @self.router.delete(f"{self.prefix}-delete-many/")
@@ -8,13 +8,15 @@ interact with the API without prior knowledge of the schema.
 
 from __future__ import annotations
 
+import json
 from typing import Any, Dict, List, Optional, Type
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
 from ...models.base import BaseMongoModel
-from ...queries.base.base_query import BaseQuery
+from ...queries.base.model_metadata import get_model_metadata
+from ..base.conditional_route import ConditionalRoute
 
 
 # ── Response schemas ──────────────────────────────────────────────────────────
@@ -63,39 +65,27 @@ class MCPContext(BaseModel):
 # ── Helper ────────────────────────────────────────────────────────────────────
 
 def _build_model_info(model: Type[BaseMongoModel]) -> MCPModelInfo:
-    """Build an :class:`MCPModelInfo` for *model*."""
-    from typing import get_type_hints
-
-    hints = get_type_hints(model)
-    fields: List[MCPFieldInfo] = []
-
-    for field_name, annotation in hints.items():
-        field_type, _selectable = BaseQuery._get_type(annotation)
-        if field_type is None:
-            continue
-        allowed = BaseQuery._get_allowed_values(annotation)
-        pydantic_field = model.model_fields.get(field_name)
-        required = pydantic_field is not None and pydantic_field.is_required()
-        fields.append(
-            MCPFieldInfo(
-                name=field_name,
-                type=field_type.__name__,
-                required=required,
-                allowed_values=allowed,
-                description=pydantic_field.description if pydantic_field else None,
-            )
+    """Build an :class:`MCPModelInfo` for *model* from its cached metadata."""
+    metadata = get_model_metadata(model)
+    fields: List[MCPFieldInfo] = [
+        MCPFieldInfo(
+            name=field.name,
+            type=field.type.__name__,
+            required=field.required,
+            allowed_values=field.allowed_values,
+            description=field.description,
         )
-
-    filter_fields = list(BaseQuery.get_fields_of_model(model, only_selectable=True).keys())
-    sort_fields = list(BaseQuery.get_fields_of_model(model, only_selectable=False).keys())
+        for field in metadata.fields.values()
+        if field.type is not None
+    ]
 
     return MCPModelInfo(
         name=model.__name__,
         collection=model.__name__,
-        index_fields=model.create_index(),
+        index_fields=metadata.index_fields,
         fields=fields,
-        filter_fields=filter_fields,
-        sort_fields=sort_fields,
+        filter_fields=metadata.filter_fields,
+        sort_fields=metadata.sort_fields,
     )
 
 
@@ -133,22 +123,58 @@ class MCPRouter:
     * ``GET /_mcp/context``  – full context document (models + operations)
     * ``GET /_mcp/models``   – list of model names
     * ``GET /_mcp/models/{name}`` – metadata for a single model
+
+    The metadata only changes when models are registered, so the responses are
+    serialized once per registration and sent with :attr:`cache_control` and a
+    content hash ETag.
     """
 
+    cache_control: Optional[str] = "public, max-age=300"
+
     def __init__(self) -> None:
-        self.router = APIRouter(prefix="/_mcp", tags=["MCP"])
+        self.router = APIRouter(prefix="/_mcp", tags=["MCP"], route_class=ConditionalRoute)
         self._models: Dict[str, Type[BaseMongoModel]] = {}
+        self._model_json: Dict[str, bytes] = {}
+        self._context_json: Optional[bytes] = None
+        self._models_json: Optional[bytes] = None
         self._setup_routes()
 
     def register(self, model: Type[BaseMongoModel]) -> None:
         """Register a model so it is included in MCP context responses."""
         self._models[model.__name__] = model
+        self._model_json[model.__name__] = _build_model_info(model).model_dump_json().encode("utf-8")
+        self._context_json = None
+        self._models_json = None
+
+    def _set_cache_control(self, response: Response) -> None:
+        """Apply :attr:`cache_control` to *response* when configured."""
+        if self.cache_control:
+            response.headers["Cache-Control"] = self.cache_control
+
+    def _json_response(self, content: bytes) -> Response:
+        """Return pre-serialized JSON with :attr:`cache_control` applied."""
+        response = Response(content=content, media_type="application/json")
+        self._set_cache_control(response)
+        return response
+
+    def _context(self) -> bytes:
+        """Serialize the full context document once per set of registered models."""
+        if self._context_json is None:
+            models_info: List[MCPModelInfo] = []
+            operations_info: List[MCPOperationInfo] = []
+            for model in self._models.values():
+                models_info.append(_build_model_info(model))
+                prefix = f"/{model.__name__.lower()}"
+                operations_info.extend(_build_operations(model, prefix))
+            context = MCPContext(models=models_info, operations=operations_info)
+            self._context_json = context.model_dump_json().encode("utf-8")
+        return self._context_json
 
     def _setup_routes(self) -> None:
         router = self.router
 
         @router.get("/context", response_model=MCPContext, summary="Full MCP context")
-        async def get_context() -> MCPContext:
+        async def get_context() -> Response:
             """
             Return the full Model Context Protocol document.
 
@@ -156,21 +182,17 @@ class MCPRouter:
             It lists every registered model together with its fields, index keys,
             filterable/sortable attributes, and the REST operations available for it.
             """
-            models_info: List[MCPModelInfo] = []
-            operations_info: List[MCPOperationInfo] = []
-            for model in self._models.values():
-                models_info.append(_build_model_info(model))
-                prefix = f"/{model.__name__.lower()}"
-                operations_info.extend(_build_operations(model, prefix))
-            return MCPContext(models=models_info, operations=operations_info)
+            return self._json_response(self._context())
 
         @router.get("/models", response_model=List[str], summary="List registered model names")
-        async def list_models() -> List[str]:
+        async def list_models() -> Response:
             """Return the names of all models registered with this MCP router."""
-            return list(self._models.keys())
+            if self._models_json is None:
+                self._models_json = json.dumps(list(self._models.keys())).encode("utf-8")
+            return self._json_response(self._models_json)
 
         @router.get("/models/{name}", response_model=MCPModelInfo, summary="Get metadata for a single model")
-        async def get_model(name: str) -> MCPModelInfo:
+        async def get_model(name: str) -> Response:
             """
             Return detailed metadata for the model identified by *name*.
 
@@ -178,7 +200,7 @@ class MCPRouter:
             """
             from fastapi import HTTPException
 
-            model = self._models.get(name)
-            if model is None:
+            content = self._model_json.get(name)
+            if content is None:
                 raise HTTPException(status_code=404, detail=f"Model '{name}' not found")
-            return _build_model_info(model)
+            return self._json_response(content)
@@ -22,6 +22,8 @@ from ...queries.base.base_query import BaseQuery
 from ...queries.base.base_range import BaseRange
 from ...queries.base.base_select import BaseSelect
 from ...queries.base.base_sort import BaseSort
+from ...queries.base.model_metadata import get_model_metadata
+from ...queries.base.where_expression import merge_filters
 from ...repositories.base.base_read_repository import BaseReadRepository
 
 S = TypeVar("S", bound=BaseMongoModel)
@@ -154,8 +156,7 @@ class BaseReadService(ReadServiceInterface[S], ABC):
             List[S]: The list of items.
         """
         filter_query = self._update_filter_query(filter_query, list_filter)
-        if range_query:
-            filter_query.update(range_query)
+        filter_query = merge_filters(filter_query, range_query)
         items = await self.repository.list(
             paging_query, filter_query, sort_query, search_query
         )
@@ -189,8 +190,7 @@ class BaseReadService(ReadServiceInterface[S], ABC):
             List[Dict]: The list of keys.
         """
         filter_query = self._update_filter_query(filter_query, list_filter)
-        if range_query:
-            filter_query.update(range_query)
+        filter_query = merge_filters(filter_query, range_query)
         return await self.repository.list_keys(
             keys=keys,
             filter_query=filter_query,
@@ -198,6 +198,20 @@ class BaseReadService(ReadServiceInterface[S], ABC):
             sort_query=sort_query,
         )
 
+    async def suggest(self, field: str, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest values of a field starting with a prefix, ignoring case.
+
+        Args:
+            field (str): One of the model's ``suggest_fields()``.
+            prefix (str): The typed prefix.
+            limit (int, optional): Maximum number of suggestions. Defaults to 10.
+
+        Returns:
+            List[Dict]: The matching documents, projected to ``_id`` and the field.
+        """
+        return await self.repository.suggest(field, prefix, limit)
+
     @override
     async def item_info(
         self,
@@ -219,14 +233,13 @@ class BaseReadService(ReadServiceInterface[S], ABC):
             DisplayItemInfo: The item information.
         """
         updated_filter_query = self._update_filter_query(filter_query, list_filter)
-        if range_query:
-            updated_filter_query.update(range_query)
+        updated_filter_query = merge_filters(updated_filter_query, range_query)
         return await self.repository.info(updated_filter_query, search_query)
 
     @override
     async def query_info(self, model: Type[S]) -> DisplayQueryInfo:
         """
-        Get query information for the model.
+        Get query information for the model. It is computed once per model.
 
         Args:
             model (Type[S]): The MongoDB model type.
@@ -234,7 +247,4 @@ class BaseReadService(ReadServiceInterface[S], ABC):
         Returns:
             DisplayQueryInfo: The query information.
         """
-        return DisplayQueryInfo(
-            filter_info=BaseQuery.create_display_filter_info(model),
-            sort_info=BaseQuery.create_display_sort_info(model),
-        )
+        return get_model_metadata(model).display_query_info
@@ -56,7 +56,7 @@ class BaseReadWriteService(ReadWriteServiceInterface[S], BaseReadService[S], ABC
         # id generation can produce spurious matches. If there are no
         # meaningful keys (empty dict) we skip the existence check and
         # allow creation.
-        keys_filter = item.model_dump_keys()
+        keys_filter = item.model_dump_keys(storage=True)
         # remove _id if present
         keys_filter.pop("_id", None)
 
@@ -83,10 +83,10 @@ class BaseReadWriteService(ReadWriteServiceInterface[S], BaseReadService[S], ABC
         Raises:
             HTTPException: If the item does not exist.
         """
-        exists = await self.repository.exists(item.model_dump_keys())
+        exists = await self.repository.exists(item.model_dump_keys(storage=True))
         if not exists: # create the item
             return await self.create(item)
-        return await self.repository.update(item.model_dump_keys(), item)
+        return await self.repository.update(item.model_dump_keys(storage=True), item)
 
     @override
     async def delete(self, keys_filter_query: dict) -> None:
@@ -0,0 +1,126 @@
+"""
+This module provides per-request deadlines, which bound how long MongoDB may
+work on a request.
+
+The route class opens a deadline for every request. Repositories read the
+remaining budget before each MongoDB call and send it as ``maxTimeMS``, so the
+budget shrinks as sequential sub-queries consume it and the server stops
+working once the client has given up.
+
+Classes:
+    DeadlineExceeded: A 504 raised when the budget of a request is used up.
+
+Functions:
+    deadline: Opens a deadline for the enclosed code.
+    without_deadline: Runs the enclosed code without the current deadline.
+    remaining_ms: Returns the remaining budget of the current deadline.
+    check: Raises if the current deadline has passed.
+    parse_timeout_header: Reads a budget from a request header.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import HTTPException
+
+# Absolute time.monotonic() value at which the current request has to be answered.
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("pydaadop_deadline", default=None)
+
+
+class DeadlineExceeded(HTTPException):
+    """
+    Raised when the deadline of a request passes before MongoDB answered.
+    """
+
+    def __init__(self, detail: str = "The request deadline was exceeded"):
+        super().__init__(status_code=504, detail=detail)
+
+
+@contextmanager
+def deadline(budget_ms: Optional[float]) -> Iterator[None]:
+    """
+    Open a deadline for the enclosed code. A nested deadline can only shorten
+    the one already open.
+
+    Args:
+        budget_ms (Optional[float]): The budget in milliseconds; None opens no deadline.
+
+    Example:
+        ```python
+        with deadline(2000):
+            await service.list(...)
+        ```
+    """
+    if budget_ms is None:
+        yield
+        return
+    expires = time.monotonic() + budget_ms / 1000
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+@contextmanager
+def without_deadline() -> Iterator[None]:
+    """
+    Run the enclosed code without the current deadline, e.g. work shared by
+    requests with different budgets; each of them bounds its own wait instead.
+    """
+    token = _DEADLINE.set(None)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining_ms() -> Optional[int]:
+    """
+    Get the remaining budget of the current deadline.
+
+    Returns:
+        Optional[int]: Whole milliseconds left, at least 1, or None without a deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed.
+    """
+    expires = _DEADLINE.get()
+    if expires is None:
+        return None
+    left = (expires - time.monotonic()) * 1000
+    if left <= 0:
+        raise DeadlineExceeded()
+    return max(1, int(left))
+
+
+def check() -> None:
+    """
+    Make sure the current deadline has not passed, e.g. before starting a write.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed.
+    """
+    remaining_ms()
+
+
+def parse_timeout_header(value: Optional[str]) -> Optional[float]:
+    """
+    Read a budget in milliseconds from a request header.
+
+    Args:
+        value (Optional[str]): The header value.
+
+    Returns:
+        Optional[float]: The positive budget, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        budget = float(value)
+    except ValueError:
+        return None
+    return budget if budget > 0 else None
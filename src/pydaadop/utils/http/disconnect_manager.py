@@ -0,0 +1,167 @@
+"""
+This module provides cancellation of MongoDB work for clients which disconnect
+before their response is ready.
+
+The route class runs read handlers next to a watcher for the ASGI
+``http.disconnect`` event and cancels the handler once it arrives. Every read
+of a watched request carries the request's tag as its ``comment``, so a
+cancelled repository read can find its operations on the server and kill them,
+and close its open cursor, instead of leaving MongoDB working for nobody.
+
+Classes:
+    ClientDisconnected: Raised when the client of a request disconnected.
+
+Functions:
+    tagged: Tags the MongoDB operations started in the enclosed code.
+    operation_tag: Returns the tag of the current request.
+    run_until_disconnect: Runs a handler, cancelling it when the client disconnects.
+    kill_operations: Kills the server operations carrying a tag.
+    abandon: Cleans up after a cancelled read in the background.
+"""
+
+import asyncio
+import logging
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional, Set, TypeVar
+
+from pymongo.errors import PyMongoError
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+_TAG: ContextVar[Optional[str]] = ContextVar("pydaadop_operation_tag", default=None)
+
+# Keeps the cleanup tasks alive until they finished.
+_CLEANUPS: Set["asyncio.Task[Any]"] = set()
+
+
+class ClientDisconnected(Exception):
+    """
+    Raised when the client of a request disconnected before the response was ready.
+    """
+
+
+@contextmanager
+def tagged(tag: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag the MongoDB operations started in the enclosed code.
+
+    Args:
+        tag (Optional[str]): The tag; a unique one is generated if omitted.
+
+    Yields:
+        str: The tag.
+    """
+    tag = tag or f"pydaadop-{uuid.uuid4().hex}"
+    token = _TAG.set(tag)
+    try:
+        yield tag
+    finally:
+        _TAG.reset(token)
+
+
+def operation_tag() -> Optional[str]:
+    """
+    Get the tag of the current request.
+
+    Returns:
+        Optional[str]: The tag, or None outside a watched request.
+    """
+    return _TAG.get()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Wait for the ASGI ``http.disconnect`` event of a request whose body was read."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(request: Request, handler: Awaitable[R]) -> R:
+    """
+    Run a handler, cancelling it when the client disconnects.
+
+    The request body is read first, so the watcher only ever receives the
+    disconnect event; the handler gets the body from the request's cache.
+
+    Args:
+        request (Request): The request.
+        handler (Awaitable[R]): The handler.
+
+    Returns:
+        R: The result of the handler.
+
+    Raises:
+        ClientDisconnected: If the client disconnected first.
+    """
+    await request.body()
+    task = asyncio.ensure_future(handler)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if task.cancelled():
+        raise ClientDisconnected()
+    return task.result()
+
+
+async def kill_operations(collection: Any, tag: str) -> int:
+    """
+    Kill the server operations carrying a tag as their comment.
+
+    Args:
+        collection (Any): A collection of the client which started the operations.
+        tag (str): The tag.
+
+    Returns:
+        int: The number of killed operations.
+    """
+    admin = collection.database.client.admin
+    pipeline = [
+        {"$currentOp": {}},
+        {"$match": {"$or": [{"command.comment": tag}, {"cursor.originatingCommand.comment": tag}]}},
+        {"$project": {"opid": 1}},
+    ]
+    killed = 0
+    try:
+        async for operation in admin.aggregate(pipeline):
+            await admin.command("killOp", op=operation["opid"])
+            killed += 1
+    except PyMongoError as error:
+        logger.debug("Could not kill operations tagged %s: %s", tag, error)
+    return killed
+
+
+def abandon(collection: Any = None, cursor: Any = None) -> None:
+    """
+    Clean up after a cancelled read in the background: close its cursor, which
+    sends ``killCursors``, and kill the operations of the current request.
+
+    Args:
+        collection (Any, optional): The collection of the read; its operations are
+            killed when the current request is tagged.
+        cursor (Any, optional): The open cursor of the read.
+    """
+    tag = operation_tag()
+
+    async def _cleanup() -> None:
+        if cursor is not None and hasattr(cursor, "close"):
+            try:
+                await cursor.close()
+            except PyMongoError as error:
+                logger.debug("Could not close abandoned cursor: %s", error)
+        if collection is not None and tag is not None:
+            await kill_operations(collection, tag)
+
+    task = asyncio.ensure_future(_cleanup())
+    _CLEANUPS.add(task)
+    task.add_done_callback(_CLEANUPS.discard)
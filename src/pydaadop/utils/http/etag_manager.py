@@ -0,0 +1,85 @@
+"""
+This module provides utilities for conditional HTTP requests based on entity tags (ETags).
+
+Functions:
+    compute_etag: Computes a strong ETag from a rendered response body.
+    etag_matches: Checks whether an If-None-Match header matches an ETag.
+    not_modified_response: Builds an empty 304 response for a matching ETag.
+"""
+
+import hashlib
+from typing import Optional
+
+from starlette.responses import Response
+
+# Headers that must be repeated on a 304 response (RFC 9110, section 15.4.5).
+_PRESERVED_HEADERS = ("cache-control", "content-location", "expires", "vary")
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Computes a strong ETag from the given response body.
+
+    The tag is a quoted 128 bit BLAKE2b digest of the body, so identical payloads
+    always produce identical tags regardless of which worker rendered them.
+
+    Args:
+        body (bytes): The rendered response body.
+
+    Returns:
+        str: The quoted ETag value.
+
+    Example:
+        >>> compute_etag(b'[]')
+        '"7ebb3c7c2a87b1a2f8a7ed729ecb040d"'
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks whether an If-None-Match header matches the given ETag.
+
+    Uses the weak comparison required for If-None-Match, so ``W/"abc"`` matches
+    ``"abc"``. The wildcard ``*`` matches any current representation.
+
+    Args:
+        if_none_match (Optional[str]): The raw If-None-Match header value.
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if the client already holds the current representation.
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",") if tag.strip()]
+    if "*" in candidates:
+        return True
+
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in candidates:
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified_response(response: Response, etag: str) -> Response:
+    """
+    Builds an empty 304 Not Modified response for the given full response.
+
+    Args:
+        response (Response): The response that would have been sent.
+        etag (str): The ETag of that response.
+
+    Returns:
+        Response: A body-less 304 response carrying the cache related headers.
+    """
+    headers = {"ETag": etag}
+    for name in _PRESERVED_HEADERS:
+        value = response.headers.get(name)
+        if value is not None:
+            headers[name] = value
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,183 @@
+"""
+Tests for the native BSON storage mode.
+"""
+import datetime
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from bson import BSON, Binary, Decimal128
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.queries.base.base_range import BaseRange
+from pydaadop.queries.base.base_where import BaseWhere
+from pydaadop.queries.base.query_plan import QueryPlan
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+from pydaadop.routes.many.many_read_write_route import ManyReadWriteRouter
+from pydaadop.services.many.many_read_write_service import ManyReadWriteService
+
+PLACED = datetime.datetime(2024, 3, 1, 12, 30)
+TOKEN = uuid.UUID("12345678-1234-5678-1234-567812345678")
+
+
+class Invoice(BaseMongoModel):
+    number: int
+    placed: datetime.datetime
+    due: Optional[datetime.date] = None
+    amount: Decimal = Decimal("0")
+    token: Optional[uuid.UUID] = None
+    scan: bytes = b""
+
+    @staticmethod
+    def native_storage() -> bool:
+        return True
+
+
+class Receipt(Invoice):
+    @staticmethod
+    def native_storage() -> bool:
+        return False
+
+
+def invoice(**values):
+    return Invoice(id="i1", number=1, placed=PLACED, due=datetime.date(2024, 4, 1),
+                   amount=Decimal("10.50"), token=TOKEN, scan=b"\x00\xff", **values)
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+    def __aiter__(self):
+        self.iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class Collection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.calls = []
+
+    def find(self, *args):
+        return Cursor(self.documents)
+
+    async def insert_one(self, document):
+        self.calls.append(("insert_one", document))
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def bulk_write(self, operations, **kwargs):
+        self.calls.append(("bulk_write", [operation._doc for operation in operations]))
+        return SimpleNamespace(modified_count=len(operations))
+
+
+@pytest.fixture(autouse=True)
+def no_single_flight(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+
+
+def test_storage_dump_keeps_native_types_and_round_trips():
+    document = invoice().model_dump_storage()
+
+    assert document == {
+        "_id": "i1",
+        "number": 1,
+        "placed": PLACED,
+        "due": datetime.datetime(2024, 4, 1),
+        "amount": Decimal128("10.50"),
+        "token": Binary.from_uuid(TOKEN),
+        "scan": Binary(b"\x00\xff"),
+    }
+    stored = BSON.encode(document).decode()
+    assert Invoice.model_validate_storage(stored) == invoice()
+    assert invoice().model_dump()["placed"] == "2024-03-01T12:30:00"
+
+
+def test_json_mode_is_unchanged():
+    receipt = Receipt(id="r1", number=1, placed=PLACED, amount=Decimal("1.5"))
+
+    assert receipt.model_dump_storage() == receipt.model_dump()
+    assert Receipt.model_validate_storage(receipt.model_dump()) == receipt
+
+
+def test_queries_use_the_stored_representation():
+    plan = QueryPlan.for_model(Invoice)
+
+    assert plan.range(BaseRange(range_by="due", gte_value="2024-04-01")) == {
+        "due": {"$gte": datetime.datetime(2024, 4, 1)}
+    }
+    assert plan.range(BaseRange(range_by="amount", lte_value="9.99")) == {"amount": {"$lte": Decimal128("9.99")}}
+    assert plan.where(BaseWhere(where="amount > 5")) == {"amount": {"$gt": Decimal128("5")}}
+    assert QueryPlan.for_model(Receipt).range(BaseRange(range_by="due", lte_value="2024-04-01")) == {
+        "due": {"$lte": "2024-04-01"}
+    }
+
+
+@pytest.mark.parametrize("model, expected", [
+    (Invoice, {
+        "amount": Decimal128("10.50"),
+        "due": datetime.datetime(2024, 4, 1),
+        "placed": {"$gte": datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc)},
+    }),
+    (Receipt, {"amount": "10.50", "due": "2024-04-01", "placed": {"$gte": "2024-03-01T00:00:00+00:00"}}),
+])
+def test_where_operands_are_stored_values(model, expected):
+    where = BaseWhere(where="amount = 10.50 and due = 2024-04-01 and placed >= '2024-03-01T00:00:00Z'")
+    result = QueryPlan.for_model(model).where(where)
+
+    assert result == expected
+    BSON.encode(result)
+
+
+async def test_repositories_write_and_read_native_documents():
+    collection = Collection([BSON.encode(invoice().model_dump_storage()).decode()])
+    repo = ManyReadWriteRepository(Invoice, collection=collection)
+
+    await repo.create(invoice())
+    await repo.update_field_many([{"_id": "i1"}], {"placed": "2024-05-01T08:00:00", "amount": "3.25"})
+    items = await repo.list()
+    keys = await repo.list_keys(["amount", "token"])
+
+    assert collection.calls[0][1]["amount"] == Decimal128("10.50")
+    assert collection.calls[1][1][0]["$set"] == {
+        "placed": datetime.datetime(2024, 5, 1, 8),
+        "amount": Decimal128("3.25"),
+    }
+    assert items == [invoice()]
+    assert keys[0]["amount"] == Decimal("10.50") and keys[0]["token"] == TOKEN
+    with pytest.raises(ValueError, match="placed"):
+        await repo.update_field_many([{"_id": "i1"}], {"placed": "soon"})
+
+
+def test_invalid_partial_update_is_a_client_error():
+    service = ManyReadWriteService.__new__(ManyReadWriteService)
+    service.model = Invoice
+    service.repository = ManyReadWriteRepository(Invoice, collection=Collection([]))
+    app = FastAPI()
+    app.include_router(ManyReadWriteRouter(Invoice, service=service).router)
+
+    response = TestClient(app).put("/invoice-update-field-many", json={
+        "key_filter_queries": [{"number": 1}], "data": {"placed": "soon"},
+    })
+
+    assert response.status_code == 400
+    assert "placed" in response.json()["detail"]
@@ -0,0 +1,111 @@
+"""
+Tests for the pluggable query cache backends.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+from bson import ObjectId
+
+from pydaadop.cache import (
+    MemoryCacheBackend,
+    QueryCache,
+    RedisCacheBackend,
+    clear_query_caches,
+    configure_query_cache,
+    decode_value,
+    encode_value,
+    get_query_cache,
+    set_default_cache_backend,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    clear_query_caches()
+    yield
+    clear_query_caches()
+
+
+@pytest.fixture()
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def make_backend(server) -> RedisCacheBackend:
+    return RedisCacheBackend(fakeredis.FakeAsyncRedis(server=server))
+
+
+# ── Codec ─────────────────────────────────────────────────────────────────────
+
+def test_codec_round_trips_bson_types():
+    value = [{"_id": ObjectId(), "at": datetime.datetime(2024, 1, 1), "n": 1}]
+    assert decode_value(encode_value(value)) == value
+
+
+def test_codec_compresses_large_values():
+    value = [{"name": "x" * 100} for _ in range(100)]
+    encoded = encode_value(value)
+    assert len(encoded) < 1024
+    assert decode_value(encoded) == value
+
+
+# ── Memory backend ────────────────────────────────────────────────────────────
+
+async def test_memory_backend_notifies_listeners_on_invalidation():
+    backend = MemoryCacheBackend()
+    seen = []
+    backend.add_invalidation_listener(seen.append)
+    await backend.set("Category", 0, "k", b"v", 60)
+    assert await backend.bump_version("Category") == 1
+    assert await backend.get("Category", 0, "k") is None
+    assert seen == ["Category"]
+    assert len(backend) == 0
+
+
+async def test_default_backend_is_shared_by_configured_caches():
+    backend = MemoryCacheBackend()
+    set_default_cache_backend(backend)
+    configure_query_cache("Category")
+    configure_query_cache("Product")
+    assert get_query_cache("Category").backend is backend
+    assert get_query_cache("Product").backend is backend
+
+
+# ── Redis backend ─────────────────────────────────────────────────────────────
+
+async def test_redis_values_are_shared_between_workers(redis_server):
+    worker_a = QueryCache("Category", backend=make_backend(redis_server))
+    worker_b = QueryCache("Category", backend=make_backend(redis_server))
+
+    await worker_a.set("k", [{"name": "Books"}], await worker_a.version())
+    assert await worker_b.get("k", await worker_b.version()) == (True, [{"name": "Books"}])
+
+
+async def test_redis_invalidation_reaches_other_workers(redis_server):
+    worker_a = QueryCache("Category", backend=make_backend(redis_server))
+    worker_b = QueryCache("Category", backend=make_backend(redis_server))
+
+    await worker_a.set("k", 1, await worker_a.version())
+    await worker_b.invalidate()
+    assert await worker_a.get("k", await worker_a.version()) == (False, None)
+
+
+async def test_redis_broadcast_updates_listening_workers(redis_server):
+    backend_a = make_backend(redis_server)
+    backend_b = make_backend(redis_server)
+    received = asyncio.Event()
+    backend_a.add_invalidation_listener(lambda namespace: received.set())
+    await backend_a.start()
+    try:
+        # Version is now served from the process-local copy.
+        assert await backend_a.get_version("Category") == 0
+        await backend_b.bump_version("Category")
+        await asyncio.wait_for(received.wait(), timeout=2)
+        assert await backend_a.get_version("Category") == 1
+    finally:
+        await backend_a.stop()
@@ -0,0 +1,222 @@
+"""
+Tests for change stream driven cache invalidation.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from pydaadop.cache import (
+    ChangeStreamWatcher,
+    MemoryResumeTokenStore,
+    clear_query_caches,
+    clear_replicas,
+    configure_query_cache,
+    configure_replica,
+)
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+
+
+class Warehouse(BaseMongoModel):
+    name: str
+
+
+class FakeStream:
+    """Async iterator over queued change events exposing the last resume token."""
+
+    def __init__(self, events: "asyncio.Queue"):
+        self.events = events
+        self.resume_token: Optional[Dict[str, Any]] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.events.get()
+        if isinstance(event, Exception):
+            raise event
+        self.resume_token = event["_id"]
+        return event
+
+
+class FakeCollection:
+    """Collection whose watch() serves events pushed by the test."""
+
+    def __init__(self):
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.resumed_after: List[Optional[Dict[str, Any]]] = []
+
+    def watch(self, resume_after=None):
+        self.resumed_after.append(resume_after)
+        return FakeStream(self.events)
+
+    def push(self, n: int) -> None:
+        self.events.put_nowait({"_id": {"_data": str(n)}, "operationType": "update"})
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    clear_query_caches()
+    clear_replicas()
+    yield
+    clear_query_caches()
+    clear_replicas()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_change_event_invalidates_cache_and_calls_listeners():
+    cache = configure_query_cache(Warehouse)
+    collection = FakeCollection()
+    watcher = ChangeStreamWatcher(token_store=MemoryResumeTokenStore(), token_save_interval=0)
+    watcher.register(Warehouse, collection)
+    received = []
+
+    async def on_change(event):
+        received.append(event["operationType"])
+
+    watcher.add_listener(Warehouse, on_change)
+    watcher.add_listener("Warehouse", lambda event: received.append("sync"))
+
+    version = await cache.version()
+    await cache.set("k", [1], version)
+    await watcher.start()
+    collection.push(1)
+    await _settle()
+    await watcher.stop()
+
+    assert await cache.version() == version + 1
+    assert (await cache.get("k", await cache.version()))[0] is False
+    assert received == ["update", "sync"]
+
+
+async def test_register_is_idempotent():
+    watcher = ChangeStreamWatcher(token_store=MemoryResumeTokenStore())
+    first, second = FakeCollection(), FakeCollection()
+    watcher.register(Warehouse, first)
+    watcher.register(Warehouse, second)
+    await watcher.start()
+    await watcher.start()
+    await _settle()
+    await watcher.stop()
+
+    assert first.resumed_after == [None]
+    assert second.resumed_after == []
+
+
+async def test_restart_resumes_after_stored_token():
+    store = MemoryResumeTokenStore()
+    collection = FakeCollection()
+    watcher = ChangeStreamWatcher(token_store=store, token_save_interval=60)
+    watcher.register(Warehouse, collection)
+    await watcher.start()
+    collection.push(1)
+    collection.push(2)
+    await _settle()
+    await watcher.stop()
+
+    # The latest token is saved on shutdown even inside the save interval.
+    assert store.tokens["Warehouse"] == {"_data": "2"}
+
+    restarted = ChangeStreamWatcher(token_store=store)
+    restarted.register(Warehouse, collection)
+    await restarted.start()
+    await _settle()
+    await restarted.stop()
+
+    assert collection.resumed_after == [None, {"_data": "2"}]
+
+
+async def test_lost_resume_token_restarts_from_now_and_invalidates():
+    cache = configure_query_cache(Warehouse)
+    store = MemoryResumeTokenStore()
+    store.tokens["Warehouse"] = {"_data": "old"}
+    collection = FakeCollection()
+    collection.events.put_nowait(OperationFailure("resume point no longer in oplog", code=286))
+    watcher = ChangeStreamWatcher(token_store=store)
+    watcher.register(Warehouse, collection)
+
+    await watcher.start()
+    await _settle()
+    await watcher.stop()
+
+    assert collection.resumed_after == [{"_data": "old"}, None]
+    assert await cache.version() == 1
+
+
+async def test_failed_stream_is_retried_with_backoff():
+    collection = FakeCollection()
+    collection.events.put_nowait(ConnectionError("node stepped down"))
+    watcher = ChangeStreamWatcher(token_store=MemoryResumeTokenStore(), retry_delay=0)
+    watcher.register(Warehouse, collection)
+
+    await watcher.start()
+    await _settle()
+    await watcher.stop()
+
+    assert len(collection.resumed_after) == 2
+
+
+class FlakyTokenStore(MemoryResumeTokenStore):
+    """Token store whose first load fails, like a database that is not reachable yet."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    async def load(self, name):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("token store unavailable")
+        return await super().load(name)
+
+
+async def test_failed_token_load_is_retried():
+    store = FlakyTokenStore()
+    store.tokens["Warehouse"] = {"_data": "7"}
+    collection = FakeCollection()
+    watcher = ChangeStreamWatcher(token_store=store, retry_delay=0)
+    watcher.register(Warehouse, collection)
+
+    await watcher.start()
+    await _settle()
+    await watcher.stop()
+
+    assert collection.resumed_after == [{"_data": "7"}]
+    assert store.tokens["Warehouse"] == {"_data": "7"}
+
+
+@pytest.mark.parametrize("attached", [False, True])
+async def test_change_event_invalidates_like_a_write(attached):
+    suggestions = configure_query_cache("Warehouse:suggest")
+    collection = FakeCollection()
+    watcher = ChangeStreamWatcher(token_store=MemoryResumeTokenStore())
+    replica = configure_replica(Warehouse, collection=collection, watcher=watcher if attached else None)
+    watcher.register(Warehouse, collection)
+    stale = []
+    replica.mark_stale = lambda: stale.append(True)
+
+    await watcher.start()
+    collection.events.put_nowait({
+        "_id": {"_data": "1"}, "operationType": "insert",
+        "documentKey": {"_id": "w1"}, "fullDocument": {"_id": "w1", "name": "North"},
+    })
+    await _settle()
+    await watcher.stop()
+
+    assert await suggestions.version() == 1
+    # An attached replica applies the event itself instead of reloading.
+    assert stale == ([] if attached else [True])
+    assert len(replica) == (1 if attached else 0)
@@ -0,0 +1,122 @@
+"""
+Tests for compound multi-field sorting.
+"""
+from __future__ import annotations
+
+import logging
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from pydaadop.database.no_sql import BaseMongoDatabase
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.base_sort import BaseSort, parse_sort
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+
+
+class Order(BaseMongoModel):
+    status: str
+    created: int
+
+    @staticmethod
+    def sort_combinations() -> List[str]:
+        return ["status,-created", "created"]
+
+
+class Customer(BaseMongoModel):
+    country: str
+
+
+class IndexCollection:
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    def create_index(self, *args, **kwargs):
+        return None
+
+    async def list_indexes(self):
+        for keys in self.indexes:
+            yield {"key": dict(keys)}
+
+
+def test_parse_sort():
+    assert parse_sort("status, -created,+id") == [("status", 1), ("created", -1), ("_id", 1)]
+    assert parse_sort(None) == []
+    with pytest.raises(ValueError):
+        parse_sort("status,-status")
+
+
+def test_sort_model_validates_compound_keys():
+    SortModel = BaseQuery.create_sort([Order])
+
+    assert SortModel(sort="status,-created").sort_spec() == [("status", 1), ("created", -1)]
+    assert SortModel(sort_by="created", sort_order="desc").sort_spec() == [("created", -1)]
+    with pytest.raises(ValidationError):
+        SortModel(sort="status,-secret")
+
+
+class StaticService(BaseReadService):
+    async def list(self, **kwargs):
+        return [Order(id="o1", status="new", created=1)]
+
+
+@pytest.mark.parametrize("sort, message", [
+    ("unknown", "cannot sort by 'unknown'"),
+    ("status,-status", "sort key 'status' is repeated"),
+])
+def test_invalid_sort_is_a_client_error(sort, message):
+    service = StaticService.__new__(StaticService)
+    service.model = Order
+    app = FastAPI()
+    app.include_router(BaseReadRouter(Order, service=service).router)
+    client = TestClient(app, raise_server_exceptions=False)
+
+    response = client.get("/order/", params={"sort": sort})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "sort"]
+    assert message in response.json()["detail"][0]["msg"]
+    assert client.get("/order/", params={"sort": "-created"}).status_code == 200
+
+
+def test_repository_adds_id_tiebreaker():
+    assert BaseReadRepository._sort_spec(BaseSort(sort="status,-created")) == [
+        ("status", 1), ("created", -1), ("_id", 1)
+    ]
+    assert BaseReadRepository._sort_spec(BaseSort(sort="-_id")) == [("_id", -1)]
+    assert BaseReadRepository._sort_spec(BaseSort()) is None
+
+
+def test_split_sort_assigns_keys_to_models():
+    result = BaseQuery.split_sort([Order, Customer], BaseSort(sort="country,-created,status"))
+
+    assert result[0].sort_spec() == [("created", -1), ("status", 1)]
+    assert result[1].sort_spec() == [("country", 1)]
+
+
+async def test_unindexed_sort_combinations_are_reported(caplog):
+    collection = IndexCollection([
+        [("_id", 1)],
+        [("status", -1), ("created", 1), ("_id", -1)],
+    ])
+    database = BaseMongoDatabase(Order, collection=collection)
+
+    with caplog.at_level(logging.WARNING):
+        missing = await database.check_sort_indexes()
+
+    assert missing == [[("created", 1), ("_id", 1)]]
+    assert "created" in caplog.text
+
+
+async def test_sort_index_check_task_is_kept():
+    database = BaseMongoDatabase(Order, collection=IndexCollection([[("_id", 1)]]))
+    database._schedule_sort_index_check()
+
+    assert database.sort_index_check_task is not None
+    await database.sort_index_check_task
@@ -0,0 +1,128 @@
+"""
+Tests for ETag generation and If-None-Match handling on read routes.
+"""
+from __future__ import annotations
+
+from typing import List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.routes.base.base_read_write_route import BaseReadWriteRouter
+from pydaadop.routes.mcp import MCPRouter
+from pydaadop.services.base.base_read_write_service import BaseReadWriteService
+from pydaadop.utils.http.etag_manager import compute_etag, etag_matches
+
+
+class Gadget(BaseMongoModel):
+    name: str
+    price: float
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["name"]
+
+
+def make_client(items: List[Gadget]) -> TestClient:
+    service = BaseReadWriteService.__new__(BaseReadWriteService)
+    service.model = Gadget
+    repo = MagicMock()
+    repo.exists = AsyncMock(return_value=False)
+    repo.get_by_id = AsyncMock(return_value=items[0] if items else None)
+    repo.list = AsyncMock(return_value=items)
+    repo.info = AsyncMock(return_value=MagicMock(items_count=len(items)))
+    repo.create = AsyncMock(side_effect=lambda item: item)
+    service.repository = repo
+
+    app = FastAPI()
+    app.include_router(BaseReadWriteRouter(Gadget, service=service).router)
+    return TestClient(app)
+
+
+@pytest.fixture()
+def client() -> TestClient:
+    return make_client([Gadget(name="Widget", price=9.99)])
+
+
+# ── etag_manager ──────────────────────────────────────────────────────────────
+
+def test_compute_etag_is_stable_and_quoted():
+    assert compute_etag(b"[]") == compute_etag(b"[]")
+    assert compute_etag(b"[]") != compute_etag(b"[1]")
+    assert compute_etag(b"[]").startswith('"')
+
+
+def test_etag_matches_weak_list_and_wildcard():
+    etag = compute_etag(b"[]")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+# ── Read routes ───────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/gadget/", {}),
+        ("/gadget/item/", {"name": "Widget"}),
+        ("/gadget/display-info/item/", {}),
+        ("/gadget/display-info/query/", {}),
+    ],
+)
+def test_read_routes_return_etag_and_304(client: TestClient, path, params):
+    first = client.get(path, params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(path, params=params, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_changed_content_gets_new_etag(client: TestClient):
+    etag = client.get("/gadget/").headers["etag"]
+    other = make_client([Gadget(name="Gizmo", price=1.0)])
+    response = other.get("/gadget/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_cache_control_headers(client: TestClient):
+    assert client.get("/gadget/").headers["cache-control"] == "no-cache"
+    query_info = client.get("/gadget/display-info/query/")
+    assert query_info.headers["cache-control"] == BaseReadWriteRouter.metadata_cache_control
+
+
+def test_write_routes_are_not_tagged(client: TestClient):
+    response = client.post("/gadget/", json={"name": "New", "price": 1.0})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_not_found_is_not_tagged():
+    response = make_client([]).get("/gadget/item/", params={"name": "missing"})
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+
+
+# ── MCP routes ────────────────────────────────────────────────────────────────
+
+def test_mcp_context_cache_control_and_304():
+    mcp = MCPRouter()
+    mcp.register(Gadget)
+    app = FastAPI()
+    app.include_router(mcp.router)
+    tc = TestClient(app)
+
+    first = tc.get("/_mcp/context")
+    assert first.headers["cache-control"] == MCPRouter.cache_control
+    second = tc.get("/_mcp/context", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["cache-control"] == MCPRouter.cache_control
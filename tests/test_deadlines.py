@@ -0,0 +1,197 @@
+"""
+Tests for per-request deadlines.
+"""
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo.errors import ExecutionTimeout
+
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.base.base_read_write_repository import BaseReadWriteRepository
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+from pydaadop.utils.http import deadline_manager
+from pydaadop.utils.http.deadline_manager import DeadlineExceeded, deadline, remaining_ms
+
+
+class Parcel(BaseMongoModel):
+    label: str
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimedCursor:
+    def __init__(self, collection):
+        self.collection = collection
+        self.options = {}
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def max_time_ms(self, ms):
+        self.options["max_time_ms"] = ms
+        return self
+
+    def __aiter__(self):
+        self.collection.calls.append(("find", self.options))
+        self.collection.clock.now += self.collection.cost
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class TimedCollection:
+    def __init__(self, clock, cost=0.0):
+        self.clock = clock
+        self.cost = cost
+        self.calls = []
+
+    def find(self, *args):
+        return TimedCursor(self)
+
+    async def find_one(self, filter_query, **kwargs):
+        self.calls.append(("find_one", kwargs))
+        return None
+
+    async def count_documents(self, filter_query, **kwargs):
+        self.calls.append(("count", kwargs))
+        return 0
+
+    async def insert_one(self, document):
+        self.calls.append(("insert", document))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline_manager.time, "monotonic", clock)
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    return clock
+
+
+def test_nested_deadlines_only_shorten(clock):
+    assert remaining_ms() is None
+    with deadline(1000):
+        with deadline(5000):
+            assert remaining_ms() == 1000
+        with deadline(200):
+            assert remaining_ms() == 200
+        clock.now += 1.0
+        with pytest.raises(DeadlineExceeded) as error:
+            remaining_ms()
+    assert error.value.status_code == 504
+    assert remaining_ms() is None
+
+
+async def test_sequential_reads_share_a_shrinking_budget(clock):
+    collection = TimedCollection(clock, cost=0.3)
+    repo = BaseReadRepository(Parcel, collection=collection)
+
+    with deadline(1000):
+        await repo.list(filter_query={"label": "a"})
+        await repo.list(filter_query={"label": "b"})
+        await repo.get_by_id({"_id": "1"})
+        await repo.exists({"_id": "1"})
+        clock.now += 0.5
+        with pytest.raises(DeadlineExceeded):
+            await repo.info(filter_query={"label": "c"})
+
+    assert collection.calls == [
+        ("find", {"max_time_ms": 1000}),
+        ("find", {"max_time_ms": 700}),
+        ("find_one", {"max_time_ms": 400}),
+        ("count", {"maxTimeMS": 400}),
+    ]
+
+
+async def test_writes_do_not_start_after_the_deadline(clock):
+    collection = TimedCollection(clock)
+    repo = BaseReadWriteRepository(Parcel, collection=collection)
+
+    with deadline(100):
+        clock.now += 1.0
+        with pytest.raises(DeadlineExceeded):
+            await repo.create(Parcel(label="a"))
+
+    assert collection.calls == []
+
+
+@pytest.mark.parametrize("method, args", [
+    ("create_many", ([Parcel(label="a")],)),
+    ("update_many", ([Parcel(label="a")],)),
+    ("update_field_many", ([{"_id": "p1"}], {"label": "b"})),
+    ("delete_many", ([{"_id": "p1"}],)),
+])
+async def test_bulk_writes_do_not_start_after_the_deadline(clock, method, args):
+    collection = TimedCollection(clock)
+    repo = ManyReadWriteRepository(Parcel, collection=collection)
+
+    with deadline(100):
+        clock.now += 1.0
+        with pytest.raises(DeadlineExceeded):
+            await getattr(repo, method)(*args)
+
+    assert collection.calls == []
+
+
+def build_client(service, **deadlines):
+    router_cls = type("ParcelRouter", (BaseReadRouter,), deadlines)
+    app = FastAPI()
+    app.include_router(router_cls(Parcel, service=service).router)
+    return TestClient(app)
+
+
+def build_service(list_impl):
+    class TimedService(BaseReadService):
+        async def list(self, *args, **kwargs):
+            return await list_impl()
+
+        async def item_info(self, *args, **kwargs):
+            return await list_impl()
+
+    service = TimedService.__new__(TimedService)
+    service.model = Parcel
+    return service
+
+
+def test_routes_open_deadlines_from_defaults_and_header():
+    seen = []
+
+    async def record():
+        seen.append(remaining_ms())
+        return []
+
+    client = build_client(build_service(record), deadline_ms=3000, route_deadlines_ms={"get_all": 2000})
+
+    client.get("/parcel/")
+    client.get("/parcel/", headers={"X-Request-Timeout-Ms": "500"})
+    client.get("/parcel/", headers={"X-Request-Timeout-Ms": "600000"})
+
+    assert 1900 < seen[0] <= 2000
+    assert 400 < seen[1] <= 500
+    assert 59000 < seen[2] <= 60000
+
+
+def test_server_time_limit_maps_to_504():
+    async def timeout():
+        raise ExecutionTimeout("operation exceeded time limit", 50)
+
+    client = build_client(build_service(timeout), deadline_ms=1000)
+
+    response = client.get("/parcel/")
+
+    assert response.status_code == 504
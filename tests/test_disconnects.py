@@ -0,0 +1,159 @@
+"""
+Tests for cancelling reads of disconnected clients.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import FastAPI
+
+from pydaadop.cache.single_flight import SingleFlight
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+from pydaadop.utils.http.disconnect_manager import tagged
+
+
+class Crate(BaseMongoModel):
+    label: str
+
+
+class Admin:
+    def __init__(self):
+        self.commands = []
+
+    async def aggregate(self, pipeline):
+        self.pipeline = pipeline
+        yield {"opid": 17}
+
+    async def command(self, name, **kwargs):
+        self.commands.append((name, kwargs))
+
+
+class BlockingCursor:
+    def __init__(self):
+        self.tag = None
+        self.closed = False
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def comment(self, tag):
+        self.tag = tag
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+class BlockingCollection:
+    def __init__(self):
+        self.admin = Admin()
+        self.database = type("Database", (), {"client": type("Client", (), {"admin": self.admin})})()
+        self.cursor = BlockingCursor()
+
+    def find(self, *args):
+        return self.cursor
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_cancelled_read_closes_cursor_and_kills_operation(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", SingleFlight())
+    collection = BlockingCollection()
+    repo = BaseReadRepository(Crate, collection=collection)
+
+    with tagged("pydaadop-test"):
+        task = asyncio.create_task(repo.list(filter_query={"label": "a"}))
+    await settle()
+    task.cancel()
+    await settle()
+
+    assert task.cancelled()
+    assert collection.cursor.tag == "pydaadop-test" and collection.cursor.closed
+    assert collection.admin.pipeline[1]["$match"]["$or"][0] == {"command.comment": "pydaadop-test"}
+    assert collection.admin.commands == [("killOp", {"op": 17})]
+
+
+async def test_shared_operation_is_cancelled_with_its_last_caller():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def load():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    first = asyncio.create_task(flight.do("M", "k", load))
+    second = asyncio.create_task(flight.do("M", "k", load))
+    await started.wait()
+    first.cancel()
+    await settle()
+    assert not cancelled.is_set()
+
+    second.cancel()
+    await settle()
+    assert cancelled.is_set()
+
+
+async def test_route_cancels_handler_when_client_disconnects():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    class SlowService(BaseReadService):
+        async def list(self, *args, **kwargs):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    service = SlowService.__new__(SlowService)
+    service.model = Crate
+    app = FastAPI()
+    app.include_router(BaseReadRouter(Crate, service=service).router)
+
+    gone = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/crate/", "raw_path": b"/crate/", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80),
+    }
+    request = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(started.wait(), 1)
+
+    gone.set()
+    await asyncio.wait_for(request, 1)
+
+    assert cancelled.is_set()
+    assert sent[0]["status"] == 499
@@ -0,0 +1,75 @@
+"""
+Tests for the fast response serialization of the read routes.
+"""
+import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.services.base.base_read_service import BaseReadService
+
+
+class Grade(Enum):
+    A = "a"
+
+
+class Address(BaseModel):
+    city: str
+
+
+class Supplier(BaseMongoModel):
+    name: str
+    since: datetime.datetime
+    rating: Decimal
+    grade: Grade
+    address: Optional[Address] = None
+    tags: List[str] = []
+
+
+SUPPLIERS = [
+    Supplier(id="s1", name="Acme", since=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+             rating=Decimal("4.50"), grade=Grade.A, address=Address(city="Bonn"), tags=["x"]),
+    Supplier(id="s2", name="Bolt", since=datetime.datetime(2023, 6, 1), rating=Decimal("3"), grade=Grade.A),
+]
+
+
+class StaticService(BaseReadService):
+    async def list(self, **kwargs):
+        return list(SUPPLIERS)
+
+    async def get(self, keys_filter_query):
+        return SUPPLIERS[0]
+
+
+class SlowRouter(BaseReadRouter):
+    fast_responses = False
+
+
+def client_for(router_class):
+    service = StaticService.__new__(StaticService)
+    service.model = Supplier
+    app = FastAPI()
+    app.include_router(router_class(Supplier, service=service).router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/supplier/", "/supplier/item/?id=s1"])
+def test_fast_responses_match_the_response_model_serialization(path):
+    fast = client_for(BaseReadRouter).get(path)
+    slow = client_for(SlowRouter).get(path)
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.content == slow.content
+    assert fast.headers["cache-control"] == slow.headers["cache-control"] == "no-cache"
+    assert fast.headers["etag"] == slow.headers["etag"]
+
+
+def test_openapi_schema_is_unchanged():
+    assert client_for(BaseReadRouter).get("/openapi.json").json() == client_for(SlowRouter).get("/openapi.json").json()
@@ -0,0 +1,127 @@
+"""
+Tests for the id storage strategies.
+"""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.models.base.id_storage import migrate_string_ids, stored_id, stored_id_filter
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+
+OID = ObjectId("65f0a1b2c3d4e5f6a7b8c9d0")
+HEX = str(OID)
+
+
+class LegacyTicket(BaseMongoModel):
+    title: str = ""
+
+
+class Ticket(LegacyTicket):
+    @staticmethod
+    def id_storage() -> str:
+        return "objectid"
+
+
+class Collection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.calls = []
+
+    def find(self, filter_query, *args):
+        self.calls.append(("find", filter_query))
+        return Cursor([d for d in self.documents if isinstance(d["_id"], str)])
+
+    async def find_one(self, filter_query, **kwargs):
+        self.calls.append(("find_one", filter_query))
+        return {"_id": OID, "title": "stored"}
+
+    async def insert_one(self, document):
+        self.calls.append(("insert_one", document))
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def delete_many(self, filter_query):
+        self.calls.append(("delete_many", filter_query))
+
+    async def bulk_write(self, operations, **kwargs):
+        self.calls.append(("bulk_write", [(type(o).__name__, o._filter, getattr(o, "_doc", None)) for o in operations]))
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        self.iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.fixture(autouse=True)
+def no_single_flight(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+
+
+def test_ids_are_stored_as_object_ids_and_exposed_as_strings():
+    ticket = Ticket(id=HEX)
+
+    assert ticket.model_dump_storage()["_id"] == OID
+    assert ticket.model_dump()["_id"] == HEX
+    assert LegacyTicket(id=HEX).model_dump_storage()["_id"] == HEX
+    assert Ticket.model_validate_storage({"_id": OID}).id == HEX
+    assert stored_id(Ticket, "custom-key") == "custom-key"
+    assert stored_id(LegacyTicket, OID) == HEX
+
+
+def test_id_conditions_in_filters_are_converted():
+    query = {"_id": {"$in": [HEX, "x"]}, "$or": [{"_id": HEX}, {"title": HEX}]}
+
+    assert stored_id_filter(Ticket, query) == {"_id": {"$in": [OID, "x"]}, "$or": [{"_id": OID}, {"title": HEX}]}
+    assert stored_id_filter(LegacyTicket, {"_id": {"$ne": OID}}) == {"_id": {"$ne": HEX}}
+    untouched = {"title": "a"}
+    assert stored_id_filter(Ticket, untouched) is untouched
+
+
+async def test_repositories_query_stored_ids():
+    collection = Collection()
+    repo = ManyReadWriteRepository(Ticket, collection=collection)
+
+    created = await repo.create(Ticket(id=HEX))
+    found = await repo.get_by_id({"_id": HEX})
+    await repo.delete_many([{"_id": HEX}])
+
+    assert collection.calls[0][1]["_id"] == OID and created.id == HEX
+    assert collection.calls[1] == ("find_one", {"_id": OID})
+    assert found.id == HEX and found.title == "stored"
+    assert collection.calls[2] == ("delete_many", {"$or": [{"_id": OID}]})
+
+
+async def test_migration_replaces_string_ids():
+    collection = Collection([{"_id": HEX, "title": "a"}, {"_id": "custom", "title": "b"}, {"_id": OID}])
+
+    assert await migrate_string_ids(collection) == 1
+
+    assert collection.calls[0] == ("find", {"_id": {"$type": "string"}})
+    assert collection.calls[1] == ("bulk_write", [
+        ("ReplaceOne", {"_id": OID}, {"title": "a"}),
+        ("DeleteMany", {"_id": {"$in": [HEX]}}, None),
+    ])
+
+
+async def test_models_keep_string_ids_by_default():
+    collection = Collection()
+    repo = ManyReadWriteRepository(LegacyTicket, collection=collection)
+
+    await repo.create(LegacyTicket(id=HEX))
+    found = await repo.get_by_id({"_id": HEX})
+
+    assert collection.calls[0][1]["_id"] == HEX
+    assert collection.calls[1] == ("find_one", {"_id": HEX})
+    assert found.id == HEX
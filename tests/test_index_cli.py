@@ -0,0 +1,104 @@
+"""
+Tests for the index synchronisation command line tool.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import List
+
+from pydaadop.database.no_sql.index_cli import discover_models, main
+from pydaadop.models.base import BaseMongoModel, IndexDefinition
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+
+
+class Warehouse(BaseMongoModel):
+    city: str
+
+    @staticmethod
+    def index_definitions() -> List[IndexDefinition]:
+        return [IndexDefinition("city")]
+
+
+class Shipment(BaseMongoModel):
+    warehouse: str
+    created: int
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["warehouse", "created"]
+
+
+class Parcel(BaseMongoModel):
+    weight: float
+
+
+class BuildingCollection:
+    def __init__(self, indexes=None):
+        self.indexes = [{"name": "_id_", "key": {"_id": 1}}] + list(indexes or [])
+
+    async def list_indexes(self):
+        for index in list(self.indexes):
+            yield index
+
+    async def create_indexes(self, models):
+        await asyncio.sleep(0.05)
+        self.indexes.extend(dict(model.document) for model in models)
+
+    async def drop_index(self, name):
+        self.indexes = [index for index in self.indexes if index["name"] != name]
+
+
+class FakeAdmin:
+    async def command(self, command):
+        assert "currentOp" in command
+        return {"inprog": [{"ns": "shop.Shipment", "msg": "Index Build: scanning", "progress": {"done": 5, "total": 10}}]}
+
+
+class FakeClient:
+    def __init__(self, collections):
+        self.collections = collections
+        self.admin = FakeAdmin()
+
+    def __getitem__(self, name):
+        return self.collections
+
+
+def test_discover_models_from_module_and_routers():
+    BaseReadRouter(Parcel)
+
+    names = [model.__name__ for model in discover_models([__name__])]
+    routed = [model.__name__ for model in discover_models([__name__], source="routers")]
+
+    assert names[:3] == ["Parcel", "Shipment", "Warehouse"]
+    assert "Parcel" in routed and "Shipment" not in routed
+
+
+def test_cli_builds_indexes_and_reports_progress(capsys):
+    collections = {"Warehouse": BuildingCollection(), "Shipment": BuildingCollection(), "Parcel": BuildingCollection()}
+
+    code = main([__name__, "--source", "models", "--database", "shop", "--poll-interval", "0.01"], client=FakeClient(collections))
+
+    output = capsys.readouterr().out
+    assert code == 0
+    assert "shop.Shipment: Index Build: scanning (5/10)" in output
+    assert "Warehouse: 1 created, 0 unchanged, 0 conflicting" in output
+    assert "  + unique_Shipment_warehouse_created" in output
+    assert [index["name"] for index in collections["Warehouse"].indexes] == ["_id_", "city_1"]
+
+
+def test_cli_reports_conflicts_as_json(capsys):
+    collections = {
+        "Warehouse": BuildingCollection([{"name": "city_1", "key": {"city": 1}, "unique": True}]),
+        "Shipment": BuildingCollection(),
+        "Parcel": BuildingCollection([{"name": "weight_1", "key": {"weight": 1}}]),
+    }
+
+    code = main([__name__, "--source", "models", "--dry-run", "--json"], client=FakeClient(collections))
+
+    reports = json.loads(capsys.readouterr().out)
+    assert code == 1
+    assert reports["Warehouse"]["conflicting"] == ["city_1"]
+    assert reports["Shipment"]["created"] == ["unique_Shipment_warehouse_created"]
+    assert reports["Parcel"]["undeclared"] == ["weight_1"]
+    assert len(collections["Shipment"].indexes) == 1
@@ -0,0 +1,120 @@
+"""
+Tests for declarative index definitions and the index synchroniser.
+"""
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from pydaadop.database.no_sql import BaseMongoDatabase, IndexSynchronizer
+from pydaadop.models.base import BaseMongoModel, IndexDefinition, declared_indexes
+
+
+class Session(BaseMongoModel):
+    user: str
+    status: str
+    created: int
+    title: str = ""
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["user"]
+
+    @staticmethod
+    def index_definitions() -> List[IndexDefinition]:
+        return [
+            IndexDefinition("status", "-created", "id"),
+            IndexDefinition.ttl("created", 3600),
+            IndexDefinition("title", sparse=True, collation={"locale": "en", "strength": 2}),
+            IndexDefinition.text("title", weights={"title": 3}),
+        ]
+
+
+class IndexCollection:
+    def __init__(self, indexes=None):
+        self.indexes = [{"name": "_id_", "key": {"_id": 1}}] + list(indexes or [])
+        self.created = []
+        self.dropped = []
+
+    async def list_indexes(self):
+        for index in list(self.indexes):
+            yield index
+
+    async def create_indexes(self, models):
+        for model in models:
+            document = dict(model.document)
+            text_fields = [field for field, kind in document["key"].items() if kind == "text"]
+            if text_fields:
+                # The server reports text indexes by their _fts keys and weights.
+                document["key"] = {"_fts": "text", "_ftsx": 1}
+                document["weights"] = {**{field: 1 for field in text_fields}, **document.get("weights", {})}
+            self.created.append(document["name"])
+            self.indexes.append(document)
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+        self.indexes = [index for index in self.indexes if index["name"] != name]
+
+
+def test_definitions_parse_keys_and_options():
+    definition = IndexDefinition("status", "-created", "id", partial_filter={"status": "open"})
+
+    assert definition.keys == [("status", 1), ("created", -1), ("_id", 1)]
+    assert definition.name == "status_1_created_-1__id_1"
+    assert definition.options() == {"name": definition.name, "partialFilterExpression": {"status": "open"}}
+    assert IndexDefinition.text("a", "b").server_keys() == [("_fts", "text"), ("_ftsx", 1)]
+    with pytest.raises(ValueError):
+        IndexDefinition("a", "-a")
+    with pytest.raises(ValueError):
+        IndexDefinition("a", "b", expire_after_seconds=5)
+
+
+def test_declared_indexes_include_unique_key():
+    names = [definition.name for definition in declared_indexes(Session)]
+
+    assert names == ["unique_Session_user", "status_1_created_-1__id_1", "created_1", "title_1", "title_text"]
+    assert declared_indexes(BaseMongoModel) == []
+
+
+async def test_sync_creates_missing_indexes_and_is_idempotent():
+    collection = IndexCollection()
+
+    first = await IndexSynchronizer(Session, collection).sync()
+    second = await IndexSynchronizer(Session, collection).sync()
+
+    assert first.created == [definition.name for definition in declared_indexes(Session)]
+    assert second.created == [] and second.conflicting == [] and second.undeclared == []
+    assert second.unchanged == first.created
+    assert second.in_sync
+
+
+async def test_sync_reports_conflicts_and_undeclared_indexes():
+    collection = IndexCollection([
+        {"name": "created_1", "key": {"created": 1}, "expireAfterSeconds": 60},
+        {"name": "legacy_status", "key": {"status": 1, "created": -1, "_id": 1}},
+        {"name": "old_1", "key": {"old": 1}},
+    ])
+    synchronizer = IndexSynchronizer(Session, collection)
+
+    report = await synchronizer.sync()
+
+    assert report.conflicting == ["status_1_created_-1__id_1", "created_1"]
+    assert report.undeclared == ["old_1"]
+    assert collection.dropped == []
+    assert not report.in_sync
+
+    report = await synchronizer.sync(drop_undeclared=True, replace_conflicting=True)
+
+    assert report.replaced == ["status_1_created_-1__id_1", "created_1"]
+    assert report.dropped == ["old_1"]
+    assert sorted(collection.dropped) == ["created_1", "legacy_status", "old_1"]
+    assert sorted((await synchronizer.plan()).unchanged) == sorted(report.unchanged + report.replaced)
+
+
+def test_ensure_indexes_runs_synchroniser_without_loop():
+    collection = IndexCollection()
+
+    BaseMongoDatabase(Session, collection=collection)
+
+    assert "unique_Session_user" in collection.created
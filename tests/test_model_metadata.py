@@ -0,0 +1,87 @@
+"""
+Tests for the cached per-model metadata registry.
+"""
+from __future__ import annotations
+
+import json
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base import model_metadata as model_metadata_module
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.model_metadata import get_model_metadata
+from pydaadop.routes.base.base_read_write_route import BaseReadWriteRouter
+from pydaadop.routes.mcp import MCPRouter
+from pydaadop.services.base.base_read_write_service import BaseReadWriteService
+
+
+class Lamp(BaseMongoModel):
+    name: str
+    watts: int
+    style: Optional[Literal["modern", "classic"]] = None
+    dimmable: Optional[bool] = None
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["name"]
+
+
+def test_metadata_is_computed_once():
+    metadata = get_model_metadata(Lamp)
+
+    assert get_model_metadata(Lamp) is metadata
+    assert metadata.fields["style"].allowed_values == ["modern", "classic"]
+    assert metadata.fields["name"].required is True
+    assert metadata.index_fields == ["name"]
+    assert "dimmable" in metadata.filter_fields
+    assert "watts" in metadata.sort_fields
+
+
+def test_display_query_info_is_a_copy():
+    first = get_model_metadata(Lamp).display_query_info
+    first.filter_info.filter_attributes.clear()
+
+    second = get_model_metadata(Lamp).display_query_info
+    assert second.filter_info.filter_attributes
+    assert json.loads(get_model_metadata(Lamp).display_query_info_json) == second.model_dump()
+
+
+def test_split_helpers_use_cached_hints(monkeypatch):
+    get_model_metadata(Lamp)
+    monkeypatch.setattr(
+        model_metadata_module, "get_type_hints", lambda *a: (_ for _ in ()).throw(AssertionError)
+    )
+
+    assert BaseQuery.split_filter([Lamp], {"name": "x", "other": 1}) == [{"name": "x"}]
+
+
+def test_display_query_route_serves_metadata_bytes():
+    service = BaseReadWriteService.__new__(BaseReadWriteService)
+    service.model = Lamp
+    app = FastAPI()
+    app.include_router(BaseReadWriteRouter(Lamp, service=service).router)
+
+    response = TestClient(app).get("/lamp/display-info/query/")
+
+    assert response.status_code == 200
+    assert response.content == get_model_metadata(Lamp).display_query_info_json
+    assert response.headers["cache-control"] == "public, max-age=300"
+
+
+def test_mcp_serializes_on_registration_only():
+    mcp = MCPRouter()
+    mcp.register(Lamp)
+    app = FastAPI()
+    app.include_router(mcp.router)
+    client = TestClient(app)
+
+    first = client.get("/_mcp/context")
+    assert mcp._context_json is not None
+    second = client.get("/_mcp/context")
+
+    assert first.content == second.content
+    assert first.json()["models"][0]["index_fields"] == ["name"]
+    assert client.get("/_mcp/models").json() == ["Lamp"]
@@ -0,0 +1,114 @@
+"""
+Tests for the compiled model serializers.
+"""
+import datetime
+import math
+import uuid
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.models.base import model_serializer
+from pydaadop.models.base.model_serializer import compiled_serializer
+
+UTC = datetime.timezone.utc
+OID = ObjectId("65f0a1b2c3d4e5f6a7b8c9d0")
+
+
+class Size(Enum):
+    SMALL = "s"
+
+
+class Photo(BaseModel):
+    taken: datetime.datetime
+    data: bytes
+
+
+class Note(BaseModel):
+    text: str
+
+
+class Parcel(BaseMongoModel):
+    code: str
+    sent: datetime.datetime
+    weight: Decimal
+    size: Size
+    tracking: uuid.UUID
+    owner: Optional[ObjectId] = None
+    photos: List[Photo] = []
+    attachment: Union[Photo, Note, None] = None
+    ratio: float = 0.0
+
+    @staticmethod
+    def create_index() -> List[str]:
+        return ["code", "size"]
+
+
+class Crate(BaseMongoModel):
+    extra: Any = None
+    meta: Dict[str, Any] = {}
+    raw: dict = {}
+
+
+def parcel(**values):
+    return Parcel(
+        id="p1", code="P-1", sent=datetime.datetime(2024, 5, 1, 8, tzinfo=UTC), weight=Decimal("1.50"),
+        size=Size.SMALL, tracking=uuid.UUID(int=1), owner=OID,
+        photos=[Photo(taken=datetime.datetime(2024, 5, 1), data=b"\xff")], **values,
+    )
+
+
+def test_dump_produces_json_safe_values():
+    assert parcel(attachment=Note(text="fragile"), ratio=float("inf")).model_dump() == {
+        "code": "P-1",
+        "sent": "2024-05-01T08:00:00+00:00",
+        "weight": "1.50",
+        "size": "s",
+        "tracking": "00000000-0000-0000-0000-000000000001",
+        "owner": str(OID),
+        "photos": [{"taken": "2024-05-01T00:00:00", "data": "/w=="}],
+        "attachment": {"text": "fragile"},
+        "ratio": float("inf"),
+        "_id": "p1",
+    }
+    assert parcel().model_dump(ignore_id=True, exclude_none=True, include={"code", "attachment"}) == {"code": "P-1"}
+
+
+def test_serializer_is_compiled_once_per_model():
+    assert compiled_serializer(Parcel) is compiled_serializer(Parcel)
+    assert compiled_serializer(Parcel) is not Parcel.__pydantic_serializer__
+
+
+def test_keys_are_dumped_without_the_other_fields(monkeypatch):
+    calls = []
+    dump = model_serializer.dump_json_safe
+    monkeypatch.setattr(
+        "pydaadop.models.base.base_mongo_model.dump_json_safe",
+        lambda instance, **kwargs: calls.append(kwargs) or dump(instance, **kwargs),
+    )
+
+    assert parcel().model_dump_keys() == {"code": "P-1", "size": "s"}
+    assert parcel().model_dump_keys(storage=True) == {"code": "P-1", "size": "s"}
+    assert [call["include"] for call in calls] == [{"code", "size"}, {"code", "size"}]
+
+
+def test_untyped_values_keep_the_sanitized_format():
+    values = {
+        "at": datetime.datetime(2024, 1, 1, tzinfo=UTC), "wait": datetime.timedelta(seconds=90),
+        "nan": float("nan"), "blob": b"\xff\x00", "size": Size.SMALL, "tags": {"x"},
+        "photo": Photo(taken=datetime.datetime(2024, 1, 1, tzinfo=UTC), data=b"\xff"),
+    }
+    dumped = Crate(id="c1", extra=list(values.values()), meta=values, raw={1: values["wait"]}).model_dump()
+
+    expected = [
+        "2024-01-01T00:00:00+00:00", "0:01:30", dumped["extra"][2], "/wA=", "s", ["x"],
+        {"taken": "2024-01-01T00:00:00+00:00", "data": "/w=="},
+    ]
+    assert math.isnan(dumped["extra"][2]) and math.isnan(dumped["meta"]["nan"])
+    assert dumped["extra"] == expected
+    assert dumped["meta"] == dict(zip(values, expected[:2] + [dumped["meta"]["nan"]] + expected[3:]))
+    assert dumped["raw"] == {"1": "0:01:30"}
@@ -0,0 +1,182 @@
+"""
+Tests for the read-through query cache and its write invalidation.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+
+from pydaadop.cache import (
+    QueryCache,
+    clear_query_caches,
+    configure_query_cache,
+    get_query_cache_stats,
+    make_query_key,
+)
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base.base_paging import BasePaging
+from pydaadop.queries.base.base_sort import BaseSort
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+
+
+class Category(BaseMongoModel):
+    name: str
+
+
+class FakeCursor:
+    def __init__(self, items: List[Dict]):
+        self._items = items
+
+    def skip(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._items)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return list(self._items)
+
+
+class CountingCollection:
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.calls = 0
+
+    def find(self, *args, **kwargs):
+        self.calls += 1
+        return FakeCursor(self.items)
+
+    async def find_one(self, *args, **kwargs):
+        self.calls += 1
+        return self.items[0] if self.items else None
+
+    async def count_documents(self, *args, **kwargs):
+        self.calls += 1
+        return len(self.items)
+
+    async def insert_one(self, document):
+        self.items.append(document)
+        return type("Result", (), {"inserted_id": document["_id"]})()
+
+    async def insert_many(self, documents, ordered=False):
+        self.items.extend(documents)
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    clear_query_caches()
+    yield
+    clear_query_caches()
+
+
+# ── QueryCache ────────────────────────────────────────────────────────────────
+
+def test_make_query_key_ignores_key_order():
+    a = make_query_key("list", {"filter": {"a": 1, "b": 2}, "limit": 10})
+    b = make_query_key("list", {"limit": 10, "filter": {"b": 2, "a": 1}})
+    assert a == b
+    assert a != make_query_key("info", {"filter": {"a": 1, "b": 2}, "limit": 10})
+
+
+async def test_lru_eviction_and_stats():
+    cache = QueryCache("Category", max_entries=2)
+    version = await cache.version()
+    await cache.set("a", 1, version)
+    await cache.set("b", 2, version)
+    await cache.get("a", version)
+    await cache.set("c", 3, version)  # evicts "b", the least recently used
+    assert await cache.get("b", version) == (False, None)
+    assert await cache.get("a", version) == (True, 1)
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.hits == 2
+    assert stats.misses == 1
+    assert stats.size == 2
+
+
+async def test_ttl_expiry():
+    cache = QueryCache("Category", ttl=0)
+    await cache.set("a", 1, 0)
+    assert await cache.get("a", 0) == (False, None)
+    assert cache.stats().expirations == 1
+
+
+async def test_hits_return_independent_copies():
+    cache = QueryCache("Category")
+    await cache.set("a", [{"_id": "x"}], 0)
+    _, first = await cache.get("a", 0)
+    first[0]["_id"] = "mutated"
+    assert await cache.get("a", 0) == (True, [{"_id": "x"}])
+
+
+async def test_stale_version_is_not_stored():
+    cache = QueryCache("Category")
+    version = await cache.version()
+    await cache.invalidate()
+    await cache.set("a", 1, version)
+    assert await cache.get("a", await cache.version()) == (False, None)
+    assert cache.stats().size == 0
+
+
+# ── Repository integration ────────────────────────────────────────────────────
+
+async def test_repository_reads_are_cached_when_configured():
+    configure_query_cache(Category, ttl=60)
+    collection = CountingCollection([{"_id": "1", "name": "Books"}])
+    repo = BaseReadRepository(Category, collection=collection)
+
+    for _ in range(3):
+        items = await repo.list(BasePaging(), {"name": "Books"}, BaseSort())
+        assert [i.name for i in items] == ["Books"]
+    assert collection.calls == 1
+
+    await repo.info({"name": "Books"})
+    await repo.info({"name": "Books"})
+    assert collection.calls == 2
+    assert get_query_cache_stats()["Category"].hits == 3
+
+
+async def test_repository_without_cache_always_queries():
+    collection = CountingCollection([{"_id": "1", "name": "Books"}])
+    repo = BaseReadRepository(Category, collection=collection)
+    await repo.list(BasePaging(), {})
+    await repo.list(BasePaging(), {})
+    assert collection.calls == 2
+
+
+async def test_write_invalidates_other_repositories_of_model():
+    configure_query_cache(Category)
+    collection = CountingCollection([{"_id": "1", "name": "Books"}])
+    reader = BaseReadRepository(Category, collection=collection)
+    writer = ManyReadWriteRepository(Category, collection=collection)
+
+    assert len(await reader.list(BasePaging(), {})) == 1
+    await writer.create_many([Category(name="Games")])
+    items = await reader.list(BasePaging(), {})
+    assert [i.name for i in items] == ["Books", "Games"]
+    assert get_query_cache_stats()["Category"].invalidations == 1
+
+
+async def test_list_keys_results_can_be_mutated_by_caller():
+    configure_query_cache(Category)
+    collection = CountingCollection([{"_id": "1", "name": "Books"}])
+    repo = BaseReadRepository(Category, collection=collection)
+    first = await repo.list_keys(["name"], {})
+    first[0]["_id"] = "changed"
+    second = await repo.list_keys(["name"], {})
+    assert second[0]["_id"] == "1"
@@ -0,0 +1,83 @@
+"""
+Tests for compiled query plans.
+"""
+from enum import Enum
+from typing import Literal, Optional
+
+import pytest
+
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base import query_plan as query_plan_module
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.base_range import BaseRange
+from pydaadop.queries.base.base_search import BaseSearch
+from pydaadop.queries.base.query_plan import FilterPlan, QueryPlan
+
+
+class Shade(Enum):
+    LIGHT = "light"
+    DARK = "dark"
+
+
+class Paint(BaseMongoModel):
+    name: str
+    litres: int
+    finish: Optional[Literal["matt", "gloss"]] = None
+    shade: Optional[Shade] = None
+    indoor: Optional[bool] = None
+
+
+@pytest.fixture
+def plan():
+    return QueryPlan.for_model(Paint, BaseQuery.create_filter([Paint]))
+
+
+def test_filter_translation(plan):
+    filter_model = plan.filter_plan.filter_model
+
+    assert plan.filter(filter_model(name="Wall")) == {"name": {"$regex": "Wall", "$options": "i"}}
+    assert plan.filter(filter_model(name="a, b")) == {"name": {"$in": ["a", "b"]}}
+    assert plan.filter(filter_model(name="  ")) == {}
+    assert plan.filter(filter_model(finish="matt")) == {"finish": "matt"}
+    assert plan.filter(filter_model(indoor=True)) == {"indoor": True}
+    assert plan.filter(filter_model(id="abc")) == {"_id": "abc"}
+
+
+def test_regex_input_is_escaped(plan):
+    filter_model = plan.filter_plan.filter_model
+
+    assert plan.filter(filter_model(name="a.b*")) == {"name": {"$regex": r"a\.b\*", "$options": "i"}}
+
+
+def test_search_translation(plan):
+    single = plan.search(BaseSearch(search="blue"))
+    double = plan.search(BaseSearch(search="blue, wall"))
+
+    assert {"name": {"$regex": "blue", "$options": "i"}} in single["$or"]
+    assert {"_id": {"$regex": "blue", "$options": "i"}} == single["$or"][-1]
+    assert len(double["$and"]) == 2
+    assert plan.search(BaseSearch()) == {}
+    assert plan.search(BaseSearch(search="blue")) == BaseQuery.extract_search(Paint, BaseSearch(search="blue"))
+
+
+def test_range_translation(plan):
+    assert plan.range(BaseRange(range_by="litres", gte_value="5")) == {"litres": {"$gte": 5}}
+
+
+def test_requests_do_not_reflect_types(plan, monkeypatch):
+    filter_model = plan.filter_plan.filter_model
+    calls = []
+    monkeypatch.setattr(query_plan_module, "get_type_hints", lambda *a: calls.append(a) or {})
+
+    plan.filter(filter_model(name="Wall", indoor=True))
+    BaseQuery.extract_filter(filter_model(name="Wall"))
+    plan.search(BaseSearch(search="blue"))
+
+    assert calls == []
+
+
+def test_filter_plans_are_cached_per_class():
+    filter_model = BaseQuery.create_filter([Paint])
+
+    assert FilterPlan.for_model(filter_model) is FilterPlan.for_model(filter_model)
+    assert FilterPlan.for_model(filter_model) is not FilterPlan.for_model(BaseQuery.create_filter([Paint]))
@@ -0,0 +1,199 @@
+"""
+Tests for the guardrail against unindexed queries.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import ExecutionTimeout
+
+from pydaadop.models.base import BaseMongoModel, IndexDefinition
+from pydaadop.queries.base.base_sort import BaseSort
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.base.query_policy import (
+    QueryPolicy,
+    assess_with_indexes,
+    clear_query_policies,
+    configure_query_policy,
+)
+
+
+class Shipment(BaseMongoModel):
+    status: str
+    created: int
+    weight: float
+
+
+INDEXES = [[("_id", 1)], [("status", 1), ("created", -1), ("_id", 1)]]
+
+
+class GuardedCursor:
+    def __init__(self, collection):
+        self.collection = collection
+        self.options = {}
+
+    def sort(self, spec):
+        return self
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def max_time_ms(self, ms):
+        self.options["max_time_ms"] = ms
+        return self
+
+    def allow_disk_use(self, value):
+        self.options["allow_disk_use"] = value
+        return self
+
+    async def explain(self):
+        self.collection.explains += 1
+        return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+    def __aiter__(self):
+        self.collection.cursors.append(self.options)
+        return self
+
+    async def __anext__(self):
+        if self.collection.block is not None:
+            await self.collection.block.wait()
+        if self.collection.timeout:
+            raise ExecutionTimeout("operation exceeded time limit", 50)
+        raise StopAsyncIteration
+
+
+class GuardedCollection:
+    def __init__(self, documents=1_000_000):
+        self.documents = documents
+        self.cursors = []
+        self.block = None
+        self.timeout = False
+        self.index_reads = 0
+        self.explains = 0
+
+    async def estimated_document_count(self):
+        return self.documents
+
+    async def list_indexes(self):
+        self.index_reads += 1
+        for keys in INDEXES:
+            yield {"name": "_".join(f"{k}_{d}" for k, d in keys), "key": dict(keys)}
+
+    def find(self, *args):
+        return GuardedCursor(self)
+
+    async def count_documents(self, filter_query, **kwargs):
+        self.cursors.append(kwargs)
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def policies(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    yield
+    clear_query_policies()
+
+
+def test_assess_with_indexes():
+    assert assess_with_indexes(INDEXES, {"status": "new"}, [("created", -1), ("_id", 1)]).index_backed
+    assert assess_with_indexes(INDEXES, {}, [("status", -1), ("created", 1), ("_id", -1)]).index_backed
+    assert assess_with_indexes(INDEXES, {}, None, limited=True).index_backed
+    assert assess_with_indexes(INDEXES, {"status": {"$ne": "new"}, "weight": 1}, None).collection_scan
+    assert assess_with_indexes(INDEXES, {"$or": [{"status": "a"}, {"_id": "b"}]}, None).index_backed
+
+    unindexed_sort = assess_with_indexes(INDEXES, {"status": "new"}, [("weight", 1), ("_id", 1)])
+    assert not unindexed_sort.collection_scan and unindexed_sort.blocking_sort
+
+
+async def test_unindexed_queries_are_rejected_on_large_collections():
+    configure_query_policy(Shipment, large_collection=1000)
+    repo = BaseReadRepository(Shipment, collection=GuardedCollection())
+
+    await repo.list(filter_query={"status": "new"}, sort_query=BaseSort(sort="-created"))
+    with pytest.raises(HTTPException) as error:
+        await repo.list(sort_query=BaseSort(sort="weight"))
+
+    assert error.value.status_code == 400
+    assert "sorts in memory by ['weight', '_id']" in error.value.detail
+    assert repo.collection.index_reads == 1
+
+
+async def test_small_collections_get_time_limit_and_disk_use():
+    configure_query_policy(Shipment, large_collection=1000, allow_disk_use=True, max_time_ms=250)
+    collection = GuardedCollection(documents=10)
+    repo = BaseReadRepository(Shipment, collection=collection)
+
+    await repo.list(sort_query=BaseSort(sort="weight"))
+    await repo.info(filter_query={"weight": {"$gt": 1}})
+    await repo.list(filter_query={"status": "new"})
+
+    assert collection.cursors == [{"max_time_ms": 250, "allow_disk_use": True}, {"maxTimeMS": 250}, {}]
+
+
+async def test_unindexed_queries_are_throttled():
+    configure_query_policy(
+        Shipment,
+        large_collection=1000,
+        on_unindexed="throttle",
+        max_concurrent_unindexed=1,
+        indexes=[IndexDefinition("status", "-created", "id")],
+    )
+    collection = GuardedCollection()
+    collection.block = asyncio.Event()
+    repo = BaseReadRepository(Shipment, collection=collection)
+
+    running = asyncio.create_task(repo.list(filter_query={"weight": 3}))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as error:
+        await repo.list(filter_query={"weight": 4})
+    collection.block.set()
+    await running
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "1"}
+    assert collection.index_reads == 0
+    await repo.list(filter_query={"weight": 5})
+
+
+async def test_exceeded_time_limit_maps_to_504():
+    configure_query_policy(Shipment, on_unindexed="allow")
+    collection = GuardedCollection()
+    collection.timeout = True
+    repo = BaseReadRepository(Shipment, collection=collection)
+
+    with pytest.raises(HTTPException) as error:
+        await repo.list(filter_query={"weight": 3})
+
+    assert error.value.status_code == 504
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError):
+        QueryPolicy(on_unindexed="ignore")
+
+
+async def test_explain_results_are_bounded_and_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("pydaadop.repositories.base.query_policy.time.monotonic", lambda: now[0])
+    collection = GuardedCollection()
+    policy = QueryPolicy(use_explain=True, max_explained=2, cache_ttl=60)
+
+    for status in ("a", "b", "a"):
+        assert (await policy.assess(collection, {"status": status, f"f_{status}": 1}, None)).collection_scan
+    assert collection.explains == 2
+
+    # A third shape evicts the least recently used one ("b").
+    await policy.assess(collection, {"status": "c", "f_c": 1}, None)
+    await policy.assess(collection, {"status": "a", "f_a": 1}, None)
+    assert collection.explains == 3 and len(policy._explained) == 2
+    await policy.assess(collection, {"status": "b", "f_b": 1}, None)
+    assert collection.explains == 4
+
+    now[0] += 61
+    await policy.assess(collection, {"status": "b", "f_b": 1}, None)
+    assert collection.explains == 5
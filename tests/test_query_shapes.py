@@ -0,0 +1,160 @@
+"""
+Tests for the query shape recorder and the index advisor.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.diagnostics import (
+    IndexAdvisor,
+    QueryShapeRecorder,
+    normalize_filter,
+    suggest_index,
+    summarize_plan,
+)
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base.base_sort import BaseSort
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.routes.diagnostics import DiagnosticsRouter
+
+
+class Invoice(BaseMongoModel):
+    status: str
+    total: float
+    created: int
+
+
+COLLSCAN_SORT = {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}
+IXSCAN = {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_1"}}}}}
+
+
+class ExplainCursor:
+    def __init__(self, collection, filter_query):
+        self.collection = collection
+        self.filter_query = filter_query
+        self.sort_spec = None
+
+    def sort(self, spec):
+        self.sort_spec = spec
+        return self
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+    async def explain(self):
+        self.collection.explained.append((self.filter_query, self.sort_spec))
+        return COLLSCAN_SORT if self.sort_spec else IXSCAN
+
+
+class ExplainCollection:
+    def __init__(self):
+        self.explained: List[Any] = []
+
+    def find(self, filter_query=None, *args):
+        return ExplainCursor(self, filter_query)
+
+    async def count_documents(self, filter_query):
+        return 0
+
+
+@pytest.fixture
+def recorder(monkeypatch) -> QueryShapeRecorder:
+    recorder = QueryShapeRecorder()
+    monkeypatch.setattr(BaseReadRepository, "shape_recorder", recorder)
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    return recorder
+
+
+def test_normalize_filter_drops_values():
+    assert normalize_filter({
+        "status": "open",
+        "total": {"$lt": 5, "$gte": 1},
+        "name": {"$regex": "^a", "$options": "i"},
+        "$or": [{"b": 1}, {"a": {"$in": [1, 2]}}],
+    }) == {
+        "status": "$eq",
+        "total": "$gte,$lt",
+        "name": "$regex",
+        "$or": [{"a": "$in"}, {"b": "$eq"}],
+    }
+
+
+async def test_repository_records_shapes_and_latency(recorder):
+    repo = BaseReadRepository(Invoice, collection=ExplainCollection())
+
+    await repo.list(filter_query={"status": "open"}, sort_query=BaseSort(sort="-created"))
+    await repo.list(filter_query={"status": "paid"}, sort_query=BaseSort(sort="-created"))
+    await repo.info(filter_query={"total": {"$gt": 10}})
+
+    top = recorder.top(5)
+    assert [(s.operation, s.count, s.executions) for s in top] == [("list", 2, 2), ("info", 1, 1)]
+    summary = top[0].to_dict()
+    assert summary["filter"] == {"status": "$eq"}
+    assert summary["sort"] == [["created", -1], ["_id", 1]]
+    assert sum(summary["histogram"].values()) == 2
+    assert "open" not in str(summary)
+
+
+def test_recorder_bounds_shapes():
+    recorder = QueryShapeRecorder(max_shapes=1)
+
+    recorder.record("A", "list", {"filter": {"a": 1}})
+    assert recorder.record("A", "list", {"filter": {"b": 1}}) is None
+    assert recorder.overflow == 1
+
+
+def test_suggest_index_follows_esr():
+    assert suggest_index(
+        {"total": "$gte", "status": "$eq", "tags": "$in", "$or": [{"x": "$eq"}]},
+        [("created", -1), ("_id", 1)],
+    ) == [("status", 1), ("tags", 1), ("created", -1), ("_id", 1), ("total", 1)]
+
+
+def test_summarize_plan():
+    plan = summarize_plan(COLLSCAN_SORT)
+    assert plan.collection_scan and plan.blocking_sort
+    assert summarize_plan(IXSCAN).indexes == ["status_1"]
+
+
+async def test_advisor_flags_collection_scans(recorder):
+    collection = ExplainCollection()
+    repo = BaseReadRepository(Invoice, collection=collection)
+    await repo.list(filter_query={"status": "open", "total": {"$gt": 3}}, sort_query=BaseSort(sort="-created"))
+    await repo.info(filter_query={"status": "open"})
+
+    advice = await IndexAdvisor(lambda name: collection, recorder).advise()
+
+    assert [item.problems for item in advice] == [["COLLSCAN", "SORT"], []]
+    assert advice[0].to_code() == 'IndexDefinition("status", "-created", "id", "total")'
+    assert advice[0].definition().keys == [("status", 1), ("created", -1), ("_id", 1), ("total", 1)]
+    assert advice[1].to_dict()["indexes"] == ["status_1"]
+    assert collection.explained[0][0] == {"status": "open", "total": {"$gt": 3}}
+
+
+async def test_diagnostics_routes(recorder):
+    collection = ExplainCollection()
+    await BaseReadRepository(Invoice, collection=collection).list(sort_query=BaseSort(sort="total"))
+    diagnostics = DiagnosticsRouter(recorder=recorder)
+    diagnostics.register(Invoice, collection)
+    app = FastAPI()
+    app.include_router(diagnostics.router)
+    client = TestClient(app)
+
+    shapes = client.get("/_debug/query-shapes").json()
+    advice = client.get("/_debug/index-advice", params={"collection": "Invoice"}).json()
+
+    assert shapes["shapes"][0]["collection"] == "Invoice"
+    assert advice["advice"][0]["definition"] == 'IndexDefinition("total", "id")'
@@ -0,0 +1,240 @@
+"""
+Tests for in-memory replicas of small reference collections.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Dict, List
+
+import pytest
+from bson import ObjectId
+
+from pydaadop.cache import (
+    UnsupportedQueryError,
+    clear_replicas,
+    configure_replica,
+    match_document,
+    project_document,
+    sort_documents,
+)
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base.base_paging import BasePaging
+from pydaadop.queries.base.base_sort import BaseSort
+from pydaadop.repositories.base.base_read_write_repository import BaseReadWriteRepository
+
+
+class ProductCategory(BaseMongoModel):
+    name: str
+    rank: int = 0
+
+
+class FakeCursor:
+    def __init__(self, items: List[Dict]):
+        self._items = items
+
+    def skip(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._items)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return [dict(item) for item in self._items]
+
+
+class CountingCollection:
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.calls = 0
+
+    def find(self, *args, **kwargs):
+        self.calls += 1
+        return FakeCursor(self.items)
+
+    async def find_one(self, query, *args, **kwargs):
+        self.calls += 1
+        return next((dict(i) for i in self.items if i["_id"] == query.get("_id")), None)
+
+    async def count_documents(self, *args, **kwargs):
+        self.calls += 1
+        return len(self.items)
+
+    async def insert_one(self, document):
+        self.items.append(document)
+        return type("Result", (), {"inserted_id": document["_id"]})()
+
+
+def _categories() -> List[Dict]:
+    return [
+        {"_id": "a", "name": "Tools", "rank": 3},
+        {"_id": "b", "name": "Garden", "rank": 1},
+        {"_id": "c", "name": "Toys", "rank": 2},
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _reset_replicas():
+    clear_replicas()
+    yield
+    clear_replicas()
+
+
+async def _started(items: List[Dict], **kwargs):
+    collection = CountingCollection(items)
+    replica = configure_replica(ProductCategory, collection=collection, **kwargs)
+    await replica.start()
+    collection.calls = 0
+    return replica, collection
+
+
+# ── Matching ──────────────────────────────────────────────────────────────────
+
+def test_match_document_operators():
+    doc = {"_id": ObjectId(), "name": "Tools", "rank": 3, "tags": ["x", "y"], "meta": {"a": 1}}
+
+    assert match_document(doc, {"name": {"$regex": "too", "$options": "i"}})
+    assert match_document(doc, {"tags": "x", "meta.a": 1})
+    assert match_document(doc, {"rank": {"$gte": 2, "$lt": 4}})
+    assert match_document(doc, {"$or": [{"name": "x"}, {"rank": {"$in": [3, 5]}}]})
+    assert match_document(doc, {"missing": None, "name": {"$exists": True}})
+    assert match_document(doc, {"name": re.compile("^T")})
+    assert not match_document(doc, {"rank": {"$gt": "1"}})
+    assert not match_document(doc, {"rank": True})
+    assert not match_document(doc, {"tags": {"$nin": ["y"]}})
+    with pytest.raises(UnsupportedQueryError):
+        match_document(doc, {"$where": "this.rank > 1"})
+
+
+def test_sort_and_project():
+    docs = [{"_id": 1, "a": 2, "b": "x"}, {"_id": 2, "a": 1, "b": "y"}, {"_id": 3, "b": "x"}]
+
+    assert [d["_id"] for d in sort_documents(docs, [("b", 1), ("a", -1)])] == [1, 3, 2]
+    assert [d["_id"] for d in sort_documents(docs, [("a", 1)])] == [3, 2, 1]
+    assert project_document(docs[0], {"a": 1}) == {"_id": 1, "a": 2}
+    assert project_document(docs[0], {"a": 0, "_id": 0}) == {"b": "x"}
+
+
+# ── Repository reads ──────────────────────────────────────────────────────────
+
+async def test_reads_are_served_from_memory():
+    replica, collection = await _started(_categories(), indexes=["name"])
+    repo = BaseReadWriteRepository(ProductCategory, collection=collection)
+
+    items = await repo.list(
+        BasePaging(page=1, page_size=2),
+        {"name": {"$regex": "^t", "$options": "i"}},
+        BaseSort(sort_by="rank", sort_order="desc"),
+    )
+    assert [i.name for i in items] == ["Tools", "Toys"]
+    assert [i.name for i in await repo.get_many_by_ids(["c", "a", "z"])] == ["Tools", "Toys"]
+    assert (await repo.get_by_id({"name": "Garden"})).rank == 1
+    assert await repo.exists({"name": {"$in": ["Toys", "Nope"]}})
+    assert (await repo.info({"rank": {"$gt": 1}})).items_count == 2
+    keys = await repo.list_keys(["name"], sort_query=BaseSort(sort_by="name", sort_order="asc"))
+    assert keys == [{"_id": "b", "name": "Garden"}, {"_id": "a", "name": "Tools"}, {"_id": "c", "name": "Toys"}]
+
+    assert collection.calls == 0
+
+
+async def test_results_are_copies():
+    replica, collection = await _started(_categories())
+    repo = BaseReadWriteRepository(ProductCategory, collection=collection)
+
+    keys = await repo.list_keys(["name"])
+    keys[0]["_id"] = "changed"
+
+    assert (await repo.list_keys(["name"]))[0]["_id"] == "a"
+
+
+async def test_unsupported_query_falls_back_to_mongo():
+    replica, collection = await _started(_categories())
+    repo = BaseReadWriteRepository(ProductCategory, collection=collection)
+
+    assert await repo.exists({"$where": "this.rank > 1"})
+    assert collection.calls == 1
+
+
+async def test_write_makes_replica_stale_until_reloaded():
+    replica, collection = await _started(_categories())
+    repo = BaseReadWriteRepository(ProductCategory, collection=collection)
+
+    await repo.create(ProductCategory(id="d", name="Books", rank=4))
+    # Reads go to MongoDB until the reload has completed.
+    assert not replica.ready
+    assert (await repo.info()).items_count == 4
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert replica.ready
+    calls = collection.calls
+    assert (await repo.info()).items_count == 4
+    assert collection.calls == calls
+
+
+async def test_change_events_are_applied():
+    items = _categories()
+    replica, collection = await _started(items, indexes=["name"])
+
+    await replica.apply_change({"operationType": "delete", "documentKey": {"_id": "a"}})
+    await replica.apply_change({
+        "operationType": "insert",
+        "documentKey": {"_id": "d"},
+        "fullDocument": {"_id": "d", "name": "Books", "rank": 4},
+    })
+    items[1]["name"] = "Patio"
+    await replica.apply_change({"operationType": "update", "documentKey": {"_id": "b"}})
+
+    assert replica.count({"name": "Tools"}) == 0
+    assert replica.find({"name": "Books"})[0]["rank"] == 4
+    assert replica.find({"name": "Patio"})[0]["_id"] == "b"
+    assert replica.count({"name": "Garden"}) == 0
+
+
+async def test_snapshot_makes_restart_ready_without_waiting(tmp_path):
+    path = str(tmp_path / "categories.bson")
+    replica, _ = await _started(_categories(), snapshot_path=path)
+    await replica.stop()
+
+    slow = CountingCollection(_categories())
+    release = asyncio.Event()
+    original_find = slow.find
+
+    def blocked_find(*args, **kwargs):
+        cursor = original_find(*args, **kwargs)
+        to_list = cursor.to_list
+
+        async def wait_then_list(length=None):
+            await release.wait()
+            return await to_list(length)
+
+        cursor.to_list = wait_then_list
+        return cursor
+
+    slow.find = blocked_find
+    restarted = configure_replica(ProductCategory, collection=slow, snapshot_path=path)
+    await restarted.start()
+
+    assert restarted.ready
+    assert restarted.count() == 3
+    release.set()
+    await restarted.stop()
+
+
+async def test_large_collections_are_not_replicated():
+    replica, collection = await _started(_categories(), max_documents=2)
+
+    assert not replica.ready
@@ -0,0 +1,171 @@
+"""
+Tests for request coalescing of identical concurrent reads.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from pydaadop.cache import SingleFlight
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.base.base_read_write_repository import BaseReadWriteRepository
+from pydaadop.utils.http.deadline_manager import DeadlineExceeded, deadline
+
+
+class Station(BaseMongoModel):
+    name: str
+
+
+class SlowCollection:
+    """Collection whose reads block until released, counting started operations."""
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def find_one(self, *args, **kwargs):
+        self.calls += 1
+        self.options = kwargs
+        await self.release.wait()
+        return dict(self.items[0])
+
+    async def count_documents(self, *args, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return len(self.items)
+
+    async def update_one(self, *args, **kwargs):
+        return None
+
+
+# ── SingleFlight ──────────────────────────────────────────────────────────────
+
+async def test_concurrent_calls_share_one_operation():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return [{"n": 1}]
+
+    tasks = [asyncio.create_task(flight.do("M", "k", load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert started == 1
+    assert flight.coalesced == 9
+    assert all(r == [{"n": 1}] for r in results)
+    # Joining callers get their own copy
+    assert len({id(r) for r in results}) == 10
+
+
+async def test_errors_propagate_to_all_callers():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise RuntimeError("boom")
+
+    tasks = [asyncio.create_task(flight.do("M", "k", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_caller_does_not_cancel_shared_operation():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flight.do("M", "k", load))
+    second = asyncio.create_task(flight.do("M", "k", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 42
+
+
+async def test_forget_starts_new_operation():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    started = 0
+
+    async def load():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return started
+
+    first = asyncio.create_task(flight.do("M", "k", load))
+    await asyncio.sleep(0)
+    flight.forget("M")
+    second = asyncio.create_task(flight.do("M", "k", load))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, second)
+    assert started == 2
+
+
+# ── Repository integration ────────────────────────────────────────────────────
+
+async def test_repository_coalesces_identical_reads_without_cache():
+    collection = SlowCollection([{"_id": "1", "name": "Central"}])
+    repo = BaseReadRepository(Station, collection=collection)
+
+    tasks = [asyncio.create_task(repo.get_by_id({"name": "Central"})) for _ in range(5)]
+    other = asyncio.create_task(repo.info({"name": "Central"}))
+    await asyncio.sleep(0)
+    collection.release.set()
+    items = await asyncio.gather(*tasks)
+    await other
+
+    assert collection.calls == 2
+    assert all(item.name == "Central" for item in items)
+
+
+async def test_write_stops_sharing_earlier_reads():
+    collection = SlowCollection([{"_id": "1", "name": "Central"}])
+    repo = BaseReadWriteRepository(Station, collection=collection)
+
+    before = asyncio.create_task(repo.exists({"name": "Central"}))
+    await asyncio.sleep(0)
+    await repo._invalidate_cache()
+    after = asyncio.create_task(repo.exists({"name": "Central"}))
+    await asyncio.sleep(0)
+    collection.release.set()
+    await asyncio.gather(before, after)
+    assert collection.calls == 2
+
+
+async def test_each_caller_keeps_its_own_deadline():
+    collection = SlowCollection([{"_id": "1", "name": "Central"}])
+    repo = BaseReadRepository(Station, collection=collection)
+
+    async def read(budget_ms):
+        with deadline(budget_ms):
+            return await repo.get_by_id({"name": "Central"})
+
+    short = asyncio.create_task(read(10))
+    long = asyncio.create_task(read(60000))
+    await asyncio.sleep(0.05)
+    collection.release.set()
+
+    with pytest.raises(DeadlineExceeded):
+        await short
+    assert (await long).name == "Central"
+    assert collection.calls == 1
+    # The shared operation does not carry the short budget to the server.
+    assert "max_time_ms" not in collection.options
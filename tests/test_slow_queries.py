@@ -0,0 +1,127 @@
+"""
+Tests for the slow query monitor.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.diagnostics import SlowQueryMonitor, current_route
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.routes.diagnostics import DiagnosticsRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+
+EXPLAIN = {
+    "queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+    "executionStats": {"nReturned": 2, "totalDocsExamined": 5000, "totalKeysExamined": 0, "executionTimeMillis": 140},
+}
+
+
+class ExplainDatabase:
+    def __init__(self, calls: List):
+        self.calls = calls
+
+    async def command(self, command):
+        self.calls.append(command)
+        return EXPLAIN
+
+
+class ExplainClient:
+    def __init__(self):
+        self.calls: List = []
+
+    def __getitem__(self, name):
+        return ExplainDatabase(self.calls)
+
+
+def find_command(request_id: int, duration_ms: float):
+    command = {"find": "Order", "filter": {"status": "open", "total": {"$gt": 5}}, "sort": {"created": -1}, "lsid": {"id": 1}, "$db": "shop"}
+    started = SimpleNamespace(command_name="find", command=command, database_name="shop", connection_id=("h", 1), request_id=request_id)
+    done = SimpleNamespace(
+        command_name="find",
+        connection_id=("h", 1),
+        request_id=request_id,
+        duration_micros=int(duration_ms * 1000),
+        reply={"cursor": {"firstBatch": [{}, {}]}},
+    )
+    return started, done
+
+
+async def test_slow_commands_are_logged_and_explained(caplog):
+    monitor = SlowQueryMonitor(threshold_ms=100, sample_rate=1.0)
+    client = ExplainClient()
+    monitor.attach(client)
+
+    with caplog.at_level(logging.WARNING):
+        for request_id, duration in ((1, 20), (2, 150), (3, 300)):
+            started, done = find_command(request_id, duration)
+            token = current_route.set("GET /order/")
+            monitor.started(started)
+            current_route.reset(token)
+            monitor.succeeded(done)
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    entries = monitor.entries()
+    assert [entry.duration_ms for entry in entries] == [300, 150]
+    assert entries[1].shape == {"status": "$eq", "total": "$gt"}
+    assert entries[1].route == "GET /order/" and entries[1].returned == 2
+    # Only one explain per shape and interval, without driver fields.
+    assert len(client.calls) == 1
+    assert client.calls[0] == {
+        "explain": {"find": "Order", "filter": {"status": "open", "total": {"$gt": 5}}, "sort": {"created": -1}},
+        "verbosity": "executionStats",
+    }
+    assert entries[1].explain["docs_examined"] == 5000 and entries[1].explain["collection_scan"]
+    assert "examined 5000 documents" in caplog.text
+    assert "open" not in str(entries[0].to_dict())
+
+
+def test_ring_buffer_is_bounded_and_failures_recorded():
+    monitor = SlowQueryMonitor(threshold_ms=0, max_entries=2)
+
+    for request_id in range(3):
+        started, done = find_command(request_id, 5)
+        monitor.started(started)
+        monitor.succeeded(done)
+    started, _ = find_command(9, 5)
+    monitor.started(started)
+    monitor.failed(SimpleNamespace(connection_id=("h", 1), request_id=9, duration_micros=5000, failure={"errmsg": "timeout"}))
+
+    assert len(monitor.entries()) == 2
+    assert monitor.entries()[0].error == "timeout"
+
+
+def test_routes_set_current_route_and_serve_buffer():
+    class Order(BaseMongoModel):
+        status: str
+
+    seen = []
+
+    class RecordingService(BaseReadService):
+        async def list(self, *args, **kwargs):
+            seen.append(current_route.get())
+            return []
+
+    service = RecordingService.__new__(RecordingService)
+    service.model = Order
+    monitor = SlowQueryMonitor(threshold_ms=0)
+    started, done = find_command(1, 5)
+    monitor.started(started)
+    monitor.succeeded(done)
+    app = FastAPI()
+    app.include_router(BaseReadRouter(Order, service=service).router)
+    app.include_router(DiagnosticsRouter(monitor=monitor).router)
+    client = TestClient(app)
+
+    client.get("/order/")
+    body = client.get("/_debug/slow-queries", params={"collection": "Order"}).json()
+
+    assert seen == ["GET /order/"]
+    assert body["queries"][0]["shape"] == {"status": "$eq", "total": "$gt"}
@@ -0,0 +1,123 @@
+"""
+Tests for typeahead suggestions.
+"""
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.cache.query_cache import clear_query_caches
+from pydaadop.models.base import BaseMongoModel, declared_indexes
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.base_suggest import SUGGEST_COLLATION, prefix_filter
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.base.base_read_write_repository import BaseReadWriteRepository
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+
+
+class City(BaseMongoModel):
+    name: str
+    country: str
+
+    @staticmethod
+    def suggest_fields() -> List[str]:
+        return ["name", "country"]
+
+
+class SuggestCursor:
+    def __init__(self, collection, filter_query, projection):
+        self.collection = collection
+        self.call = {"filter": filter_query, "projection": projection}
+        collection.calls.append(self.call)
+
+    def comment(self, tag):
+        return self
+
+    def collation(self, collation):
+        self.call["collation"] = collation
+        return self
+
+    def sort(self, spec):
+        self.call["sort"] = spec
+        return self
+
+    def limit(self, n):
+        self.call["limit"] = n
+        return self
+
+    def __aiter__(self):
+        self.iterator = iter(self.collection.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class SuggestCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def find(self, filter_query, projection):
+        return SuggestCursor(self, filter_query, projection)
+
+    async def delete_one(self, filter_query):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    clear_query_caches()
+    yield
+    clear_query_caches()
+
+
+def test_suggest_fields_get_case_insensitive_indexes_and_query_model():
+    definition = declared_indexes(City)[-1]
+    suggest_model = BaseQuery.create_suggest(City)
+
+    assert definition.name == "suggest_City_country" and definition.collation == SUGGEST_COLLATION
+    assert suggest_model(prefix="be").field == "name"
+    with pytest.raises(ValueError):
+        suggest_model(prefix="be", field="population")
+    assert prefix_filter("name", "Be") == {"name": {"$gte": "Be", "$lt": "Be\uffff"}}
+
+
+async def test_suggestions_use_the_index_range_and_are_cached():
+    collection = SuggestCollection([{"_id": "c1", "name": "Berlin"}])
+    repo = BaseReadWriteRepository(City, collection=collection)
+
+    first = await repo.suggest("name", "Be", limit=5)
+    second = await repo.suggest("name", "bE", limit=5)
+    await repo.delete({"_id": "c2"})
+    await repo.suggest("name", "be", limit=5)
+
+    assert first == second == [{"_id": "c1", "name": "Berlin"}]
+    assert len(collection.calls) == 2
+    assert collection.calls[0] == {
+        "filter": prefix_filter("name", "Be"),
+        "projection": {"name": 1},
+        "collation": SUGGEST_COLLATION,
+        "sort": [("name", 1)],
+        "limit": 5,
+    }
+
+
+def test_suggest_route_returns_projected_values():
+    service = BaseReadService.__new__(BaseReadService)
+    service.model = City
+    service.repository = BaseReadRepository(City, collection=SuggestCollection([{"_id": "c1", "country": "Belgium"}]))
+    app = FastAPI()
+    app.include_router(BaseReadRouter(City, service=service).router)
+    client = TestClient(app)
+
+    response = client.get("/city/suggest/", params={"field": "country", "prefix": "bel", "limit": 3})
+
+    assert response.json() == [{"id": "c1", "country": "Belgium"}]
+    assert client.get("/city/suggest/", params={"prefix": ""}).status_code == 422
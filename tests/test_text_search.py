@@ -0,0 +1,92 @@
+"""
+Tests for the index-backed full-text search mode.
+"""
+from typing import Dict, List
+
+import pytest
+
+from pydaadop.models.base import BaseMongoModel, IndexDefinition, declared_indexes
+from pydaadop.queries.base.base_search import BaseSearch
+from pydaadop.queries.base.query_plan import QueryPlan
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.base.query_policy import assess_with_indexes
+
+
+class Article(BaseMongoModel):
+    title: str
+    body: str
+
+    @staticmethod
+    def search_weights() -> Dict[str, int]:
+        return {"title": 10, "body": 1}
+
+
+class Note(BaseMongoModel):
+    text: str
+
+
+class SortingCursor:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def sort(self, spec):
+        self.collection.sorts.append(spec)
+        return self
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class SortingCollection:
+    def __init__(self):
+        self.filters: List = []
+        self.sorts: List = []
+
+    def find(self, filter_query, *args):
+        self.filters.append(filter_query)
+        return SortingCursor(self)
+
+
+def test_search_uses_text_operator_for_opted_in_models():
+    plan = QueryPlan.for_model(Article)
+
+    assert plan.search(BaseSearch(search='blue, "-wall" -paint')) == {"$text": {"$search": "blue wall paint"}}
+    assert plan.search(BaseSearch(search=' " ')) == {}
+    assert "$regex" in str(QueryPlan.for_model(Note).search(BaseSearch(search="blue")))
+
+
+def test_text_index_is_declared_with_weights():
+    definitions = declared_indexes(Article)
+
+    assert definitions[-1] == IndexDefinition.text("title", "body", weights={"title": 10, "body": 1}, name="search_Article")
+    assert definitions[-1].server_keys() == [("_fts", "text"), ("_ftsx", 1)]
+
+    class Twice(Article):
+        @staticmethod
+        def index_definitions() -> List[IndexDefinition]:
+            return [IndexDefinition.text("body")]
+
+    with pytest.raises(ValueError):
+        declared_indexes(Twice)
+
+
+async def test_text_results_are_ranked_by_relevance(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    collection = SortingCollection()
+    repo = BaseReadRepository(Article, collection=collection)
+
+    await repo.list(filter_query={"title": "a"}, search_query={"$text": {"$search": "blue"}})
+
+    assert collection.filters == [{"title": "a", "$text": {"$search": "blue"}}]
+    assert collection.sorts == [[("score", {"$meta": "textScore"}), ("_id", 1)]]
+    assessment = assess_with_indexes([[("_id", 1)]], collection.filters[0], collection.sorts[0], limited=True)
+    assert assessment.index_backed
@@ -0,0 +1,122 @@
+"""
+Tests for the trigram index of substring filters.
+"""
+from types import SimpleNamespace
+from typing import List
+
+from pydaadop.models.base import BaseMongoModel, declared_indexes
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.query_plan import QueryPlan
+from pydaadop.queries.base.trigram_index import backfill_trigrams, trigrams
+from pydaadop.repositories.base.base_read_repository import BaseReadRepository
+from pydaadop.repositories.many.many_read_write_repository import ManyReadWriteRepository
+
+
+class Customer(BaseMongoModel):
+    name: str
+    city: str = ""
+
+    @staticmethod
+    def trigram_fields() -> List[str]:
+        return ["name"]
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def __aiter__(self):
+        self.iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class WriteCollection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.calls = []
+
+    def find(self, *args):
+        self.calls.append(("find", args))
+        return Cursor(self.documents)
+
+    async def find_one(self, filter_query, **kwargs):
+        self.calls.append(("find_one", kwargs))
+        return None
+
+    async def insert_one(self, document):
+        self.calls.append(("insert_one", document))
+        return SimpleNamespace(inserted_id=document.get("_id", document.get("id")))
+
+    async def update_one(self, filter_query, update):
+        self.calls.append(("update_one", update))
+
+    async def bulk_write(self, operations, **kwargs):
+        self.calls.append(("bulk_write", [operation._doc for operation in operations]))
+        return SimpleNamespace(modified_count=len(operations))
+
+
+def test_trigrams_are_lowercase_and_distinct():
+    assert trigrams("Alal a") == ["ala", "lal", "al ", "l a"]
+    assert trigrams("Al") == []
+
+
+def test_contains_filters_on_marked_fields_are_prefiltered():
+    plan = QueryPlan.for_model(Customer, BaseQuery.create_filter([Customer]))
+    filter_model = plan.filter_plan.filter_model
+
+    assert plan.filter(filter_model(name=" Alice ", city="Bonn")) == {
+        "name": {"$regex": "Alice", "$options": "i"},
+        "_trigrams.name": {"$all": ["ali", "lic", "ice"]},
+        "city": {"$regex": "Bonn", "$options": "i"},
+    }
+    assert plan.filter(filter_model(name="Al")) == {"name": {"$regex": "Al", "$options": "i"}}
+    assert plan.filter(filter_model(name="Alice,Bob")) == {"name": {"$in": ["Alice", "Bob"]}}
+
+
+def test_trigram_fields_get_a_multikey_index():
+    definition = declared_indexes(Customer)[-1]
+
+    assert definition.name == "trigram_Customer_name"
+    assert definition.server_keys() == [("_trigrams.name", 1)]
+
+
+async def test_write_paths_maintain_trigrams(monkeypatch):
+    monkeypatch.setattr(BaseReadRepository, "single_flight", None)
+    collection = WriteCollection()
+    repo = ManyReadWriteRepository(Customer, collection=collection)
+
+    await repo.create(Customer(id="c1", name="Ann"))
+    await repo.update({"_id": "c1"}, Customer(name="Anne"))
+    await repo.update_field_many([{"_id": "c1"}], {"name": "Bo", "city": "Köln"})
+    await repo.update_many([Customer(id="c2", name="Eve")])
+
+    calls = dict((name, value) for name, value in collection.calls if name != "find_one")
+    assert collection.calls[0][1]["_trigrams"] == {"name": ["ann"]}
+    assert calls["update_one"]["$set"]["_trigrams"] == {"name": ["ann", "nne"]}
+    assert ("find_one", {"projection": {"_trigrams": 0}}) in collection.calls
+    assert collection.calls[-2][1][0]["$set"]["_trigrams.name"] == []
+    assert calls["bulk_write"][0]["$set"]["_trigrams"] == {"name": ["eve"]}
+
+
+async def test_backfill_adds_missing_trigrams():
+    collection = WriteCollection([{"_id": 1, "name": "Otto"}, {"_id": 2}])
+
+    assert await backfill_trigrams(Customer, collection, batch_size=1) == 2
+
+    assert collection.calls[0] == ("find", ({"$or": [{"_trigrams.name": {"$exists": False}}]}, {"name": 1}))
+    assert [call[1][0] for call in collection.calls[1:]] == [
+        {"$set": {"_trigrams.name": ["ott", "tto"]}},
+        {"$set": {"_trigrams.name": []}},
+    ]
@@ -0,0 +1,116 @@
+"""
+Tests for range queries typed by the model's field annotations.
+"""
+import datetime
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from bson import Decimal128
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from pydaadop.models.base import BaseMongoModel
+from pydaadop.queries.base.base_query import BaseQuery
+from pydaadop.queries.base.base_range import BaseRange
+from pydaadop.queries.base.base_where import BaseWhere
+from pydaadop.queries.base.query_plan import QueryPlan
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+
+
+class Order(BaseMongoModel):
+    number: int
+    total: float
+    tax: Optional[Decimal] = None
+    placed: Optional[datetime.datetime] = None
+    due: Optional[datetime.date] = None
+    customer: str = ""
+
+
+@pytest.fixture
+def plan():
+    return QueryPlan.for_model(Order)
+
+
+def test_bounds_are_coerced_to_the_field_type(plan):
+    assert plan.range(BaseRange(range_by="total", gte_value="-1.5", lte_value="20")) == {
+        "total": {"$gte": -1.5, "$lte": 20.0}
+    }
+    assert plan.range(BaseRange(range_by="number", lte_value="-3")) == {"number": {"$lte": -3}}
+    assert plan.range(BaseRange(range_by="placed", gte_value="2024-01-02")) == {
+        "placed": {"$gte": "2024-01-02T00:00:00"}
+    }
+    assert plan.range(BaseRange(range_by="customer", gte_value="10")) == {"customer": {"$gte": "10"}}
+    assert plan.range(BaseRange(range_by="total")) == {}
+
+
+def test_several_clauses_are_combined(plan):
+    query = BaseRange(range_by="number", gte_value="1", ranges="due:2024-01-01..2024-02-01, total:..9.5")
+
+    assert plan.range(query) == {
+        "number": {"$gte": 1},
+        "due": {"$gte": "2024-01-01", "$lte": "2024-02-01"},
+        "total": {"$lte": 9.5},
+    }
+    assert plan.range(BaseRange(ranges="total:1..,total:..5"))["$and"] == [{"total": {"$lte": 5.0}}]
+
+
+def test_decimal_ranges_need_native_storage(plan):
+    class NativeOrder(Order):
+        @staticmethod
+        def native_storage() -> bool:
+            return True
+
+    # Decimals are stored as strings, which would order "10.5" before "9.0".
+    with pytest.raises(HTTPException) as info:
+        plan.range(BaseRange(range_by="tax", gte_value="9.0"))
+    assert info.value.status_code == 400 and "native_storage" in info.value.detail
+    with pytest.raises(HTTPException):
+        plan.where(BaseWhere(where="tax > 9.0"))
+    assert plan.where(BaseWhere(where="tax = 9.0")) == {"tax": "9.0"}
+    assert QueryPlan.for_model(NativeOrder).range(BaseRange(range_by="tax", gte_value="9.0")) == {
+        "tax": {"$gte": Decimal128("9.0")}
+    }
+
+
+@pytest.mark.parametrize("query", [
+    BaseRange(range_by="number", gte_value="1.5"),
+    BaseRange(range_by="placed", gte_value="yesterday"),
+    BaseRange(ranges="total"),
+    BaseRange(ranges="weight:1..2"),
+    BaseRange(ranges=",".join(["total:1.."] * 11)),
+])
+def test_invalid_ranges_are_rejected(plan, query):
+    with pytest.raises(HTTPException) as info:
+        plan.range(query)
+
+    assert info.value.status_code == 400
+
+
+def test_extract_range_is_typed_with_a_model():
+    query = BaseRange(range_by="total", gte_value="2.5")
+
+    assert BaseQuery.extract_range(query, Order) == {"total": {"$gte": 2.5}}
+    assert BaseQuery.extract_range(query) == {"total": {"$gte": "2.5"}}
+
+
+def test_route_passes_typed_ranges_to_the_service():
+    calls = []
+
+    class RecordingService(BaseReadService):
+        async def list(self, **kwargs):
+            calls.append(kwargs["range_query"])
+            return []
+
+    service = RecordingService.__new__(RecordingService)
+    service.model = Order
+    app = FastAPI()
+    app.include_router(BaseReadRouter(Order, service=service).router)
+    client = TestClient(app)
+
+    response = client.get("/order/", params={"range_by": "total", "gte_value": "0.5", "ranges": "number:..7"})
+
+    assert response.status_code == 200
+    assert calls == [{"total": {"$gte": 0.5}, "number": {"$lte": 7}}]
+    assert client.get("/order/", params={"ranges": "number:x.."}).status_code == 400
@@ -0,0 +1,126 @@
+"""
+Tests for the where= filter expression language.
+"""
+from __future__ import annotations
+
+import datetime
+from enum import Enum
+from typing import List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pydaadop.models.base.base_mongo_model import BaseMongoModel
+from pydaadop.queries.base.where_expression import WhereCompiler, WhereSyntaxError, merge_filters
+from pydaadop.routes.base.base_read_route import BaseReadRouter
+from pydaadop.services.base.base_read_service import BaseReadService
+
+
+class Status(Enum):
+    NEW = "new"
+    DONE = "done"
+
+
+class Ticket(BaseMongoModel):
+    title: str
+    priority: int
+    score: float = 0.0
+    status: Optional[Status] = None
+    urgent: bool = False
+    tags: List[str] = []
+    due: Optional[datetime.datetime] = None
+
+
+@pytest.fixture(scope="module")
+def compiler() -> WhereCompiler:
+    return WhereCompiler(Ticket)
+
+
+def test_comparisons_are_coerced_to_field_types(compiler):
+    assert compiler.compile("priority = 3") == {"priority": 3}
+    assert compiler.compile("score != 1") == {"score": {"$ne": 1.0}}
+    assert compiler.compile("urgent = true") == {"urgent": True}
+    assert compiler.compile("title = 42") == {"title": "42"}
+    assert compiler.compile("status = 'done'") == {"status": "done"}
+    assert compiler.compile("due < 2024-01-02") == {"due": {"$lt": datetime.datetime(2024, 1, 2)}}
+    assert compiler.compile("tags = urgent") == {"tags": "urgent"}
+    assert compiler.compile("id = abc") == {"_id": "abc"}
+
+
+def test_ranges_on_one_field_are_merged(compiler):
+    assert compiler.compile("priority >= 2 and priority < 5 and score > 0.5") == {
+        "priority": {"$gte": 2, "$lt": 5},
+        "score": {"$gt": 0.5},
+    }
+
+
+def test_boolean_structure(compiler):
+    assert compiler.compile("(priority = 1 or priority = 2) or urgent = true") == {
+        "$or": [{"priority": 1}, {"priority": 2}, {"urgent": True}]
+    }
+    assert compiler.compile("priority = 1 and (urgent = true or score > 1)") == {
+        "priority": 1,
+        "$or": [{"urgent": True}, {"score": {"$gt": 1.0}}],
+    }
+    assert compiler.compile("priority = 1 and priority = 2") == {
+        "priority": 1,
+        "$and": [{"priority": 2}],
+    }
+
+
+def test_in_exists_and_prefix(compiler):
+    assert compiler.compile('status in ("new", done)') == {"status": {"$in": ["new", "done"]}}
+    assert compiler.compile("priority not in (1, 2)") == {"priority": {"$nin": [1, 2]}}
+    assert compiler.compile("due exists and status not exists") == {
+        "due": {"$exists": True},
+        "status": {"$exists": False},
+    }
+    assert compiler.compile("title startswith 'a.b'") == {"title": {"$regex": r"^a\.b"}}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "unknown = 1",
+        "priority = high",
+        "status = 'closed'",
+        "priority >",
+        "priority = 1 and",
+        "(priority = 1",
+        "priority = 1)",
+        "priority ~ 1",
+        " or ".join(["priority = 1"] * 60),
+    ],
+)
+def test_invalid_expressions(compiler, expression):
+    with pytest.raises(WhereSyntaxError):
+        compiler.compile(expression)
+
+
+def test_merge_filters_keeps_colliding_conditions():
+    assert merge_filters({"a": 1}, None, {"b": 2}) == {"a": 1, "b": 2}
+    assert merge_filters({"a": 1, "$and": [{"x": 1}]}, {"a": 2, "$and": [{"y": 1}]}) == {
+        "a": 1,
+        "$and": [{"x": 1}, {"a": 2}, {"y": 1}],
+    }
+
+
+def test_where_parameter_on_list_route():
+    service = BaseReadService.__new__(BaseReadService)
+    service.model = Ticket
+    repo = MagicMock()
+    repo.list = AsyncMock(return_value=[])
+    service.repository = repo
+    app = FastAPI()
+    app.include_router(BaseReadRouter(Ticket, service=service).router)
+    client = TestClient(app)
+
+    response = client.get("/ticket/", params={"where": "priority >= 2 and urgent = true"})
+    bad = client.get("/ticket/", params={"where": "priority >= two"})
+
+    assert response.status_code == 200
+    filter_query = repo.list.call_args.args[1]
+    assert filter_query == {"priority": {"$gte": 2}, "urgent": True}
+    assert bad.status_code == 400